@@ -0,0 +1,314 @@
+"""
+AC unification with several AC symbols and free function
+symbols, by combining the unifiers of pure subproblems.
+"""
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from symcollab.algebra import Equation, FuncTerm, Function, rebuild, SubstituteTerm, Term, Variable
+from symcollab.Unification.ac_unif import FreshVariables, stickel_method, vars_from_equations
+from symcollab.Unification.common import delete_trivial
+from symcollab.Unification.unif import unif as syntactic_unification
+
+__all__ = ['ac_unify_combined']
+
+# The theory of a term is the AC symbol at its root,
+# or None when the root is a free function symbol.
+Theory = Optional[Function]
+
+class _Branch:
+    """
+    A branch of the combination. Variables are kept in equivalence
+    classes in a union-find structure and each class is bound to at
+    most one pure term, along with its theory. The pure equations
+    left to solve are kept for each theory.
+    """
+    def __init__(self, ac_symbols: Sequence[Function], original: Set[Variable], fresh: FreshVariables):
+        self.ac_symbols = ac_symbols
+        self.original = original
+        self.fresh = fresh
+        self.parent: Dict[Variable, Variable] = dict()
+        self.size: Dict[Variable, int] = dict()
+        self.name: Dict[Variable, Variable] = dict()
+        self.term: Dict[Variable, Term] = dict()
+        self.pending: Dict[Theory, List[Equation]] = dict()
+
+    def copy(self) -> '_Branch':
+        branch = _Branch(self.ac_symbols, self.original, self.fresh)
+        branch.parent = dict(self.parent)
+        branch.size = dict(self.size)
+        branch.name = dict(self.name)
+        branch.term = dict(self.term)
+        branch.pending = {theory: list(eqs) for theory, eqs in self.pending.items() if len(eqs) > 0}
+        return branch
+
+    def theory(self, t: FuncTerm) -> Theory:
+        return t.function if t.function in self.ac_symbols else None
+
+    def find(self, x: Variable) -> Variable:
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+            self.name[x] = x
+            return x
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def purify(self, t: Term) -> Term:
+        """Abstracts the subterms of other theories by fresh variables bound to them."""
+        if isinstance(t, Variable):
+            return t
+        theory = self.theory(t)
+        def abstract(s: Term) -> Optional[Term]:
+            if s is t or not isinstance(s, FuncTerm) or self.theory(s) == theory:
+                return None
+            v = self.fresh()
+            self.bind(v, self.purify(s))
+            return v
+        return rebuild(t, abstract)
+
+    def add(self, theory: Theory, s: Term, t: Term):
+        self.pending.setdefault(theory, []).append(Equation(s, t))
+
+    def bind(self, x: Variable, t: FuncTerm) -> bool:
+        """Binds the class of a variable to a pure term, False if it can't be."""
+        root = self.find(x)
+        existing = self.term.get(root)
+        if existing is None:
+            self.term[root] = t
+            return True
+        # Theories that don't collapse never equate terms of different theories
+        if self.theory(existing) != self.theory(t):
+            return False
+        if existing != t:
+            self.add(self.theory(t), existing, t)
+        return True
+
+    def union(self, x: Variable, y: Variable) -> bool:
+        """Merges the classes of two variables, False if they can't be."""
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return True
+        if self.size[x] > self.size[y]:
+            x, y = y, x
+        self.parent[x] = y
+        self.size[y] += self.size[x]
+        if self.name[y] not in self.original:
+            self.name[y] = self.name[x]
+        t = self.term.pop(x, None)
+        return t is None or self.bind(y, t)
+
+    def equate(self, s: Term, t: Term) -> bool:
+        """Adds an equation between two terms, False if it has no solution."""
+        if isinstance(s, Variable) and isinstance(t, Variable):
+            return self.union(s, t)
+        if isinstance(t, Variable):
+            s, t = t, s
+        if isinstance(s, Variable):
+            return self.bind(s, self.purify(t))
+        if self.theory(s) != self.theory(t):
+            return False
+        self.add(self.theory(s), self.purify(s), self.purify(t))
+        return True
+
+    def cyclic(self) -> bool:
+        """Whether the class of a variable occurs in its own term."""
+        state: Dict[Variable, bool] = dict()
+        for start in self.term:
+            if start in state:
+                continue
+            state[start] = False
+            stack = [(start, iter(self.term[start].variables))]
+            while stack:
+                root, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    state[root] = True
+                    stack.pop()
+                    continue
+                child = self.find(child)
+                if child not in self.term or state.get(child):
+                    continue
+                if child in state:
+                    return True
+                state[child] = False
+                stack.append((child, iter(self.term[child].variables)))
+        return False
+
+    def solutions(self, theory: Theory) -> Iterator[SubstituteTerm]:
+        """The unifiers of the pending equations of a theory."""
+        renaming = lambda t: rebuild(
+            t,
+            lambda s: self.name[self.find(s)] if isinstance(s, Variable) else None,
+            lambda s: not s.ground
+        )
+        equations = delete_trivial({
+            Equation(renaming(e.left_side), renaming(e.right_side))
+            for e in self.pending.pop(theory)
+        })
+        if len(equations) == 0:
+            yield SubstituteTerm()
+        elif theory is None:
+            sigma = syntactic_unification(equations)
+            if sigma:
+                yield sigma
+        else:
+            # Variables bound in other theories stand for atoms
+            atoms = frozenset(
+                x for x in vars_from_equations(equations)
+                if self.find(x) in self.term and self.theory(self.term[self.find(x)]) != theory
+            )
+            yield from stickel_method(equations, theory, atoms, self.fresh)
+
+    def resolve(self, x: Variable, resolved: Dict[Variable, Term]) -> Term:
+        """The value of a variable once every class is replaced by its term."""
+        root = self.find(x)
+        if root not in resolved:
+            if root in self.term:
+                resolved[root] = rebuild(
+                    self.term[root],
+                    lambda s: self.resolve(s, resolved) if isinstance(s, Variable) else None,
+                    lambda s: not s.ground
+                )
+            else:
+                resolved[root] = self.name[root]
+        return resolved[root]
+
+def _combine(branch: _Branch) -> Iterator[SubstituteTerm]:
+    """Solves the pending equations one theory at a time, depth-first."""
+    # Free symbols first, as they have a single most general unifier
+    theory = next((t for t in (None,) + tuple(branch.ac_symbols) if branch.pending.get(t)), False)
+    if theory is False:
+        resolved: Dict[Variable, Term] = dict()
+        sigma = SubstituteTerm()
+        for x in sorted(branch.original, key=str):
+            t = branch.resolve(x, resolved)
+            if t != x:
+                sigma.add(x, t)
+        yield sigma
+        return
+    for sigma in branch.solutions(theory):
+        child = branch.copy()
+        if all(child.equate(x, t) for x, t in sorted(sigma.subs, key=str)) and not child.cyclic():
+            yield from _combine(child)
+
+def _components(U: Iterable[Equation]) -> List[List[Equation]]:
+    """Splits equations into groups that don't share variables."""
+    components: List[List[Equation]] = list()
+    component_of: Dict[Variable, int] = dict()
+    for e in U:
+        found = sorted({component_of[x] for x in vars_from_equations({e}) if x in component_of})
+        if len(found) == 0:
+            components.append([e])
+            index = len(components) - 1
+        else:
+            index = found[0]
+            components[index].append(e)
+            for other in reversed(found[1:]):
+                components[index].extend(components[other])
+                components[other] = []
+        for x in vars_from_equations(components[index]):
+            component_of[x] = index
+    return [c for c in components if len(c) > 0]
+
+def _solve_component(U: List[Equation], ac_symbols: Tuple[Function, ...],
+                     fresh: FreshVariables) -> Iterator[SubstituteTerm]:
+    branch = _Branch(ac_symbols, vars_from_equations(U), fresh)
+    if all(branch.equate(e.left_side, e.right_side) for e in U) and not branch.cyclic():
+        yield from _combine(branch)
+
+def _component_unifiers(U: List[Equation], ac_symbols: Tuple[Function, ...],
+                        fresh: FreshVariables) -> List[SubstituteTerm]:
+    return list(_solve_component(U, ac_symbols, fresh))
+
+def _product(solvers: List[Callable[[], Iterator[SubstituteTerm]]]) -> Iterator[SubstituteTerm]:
+    """
+    Lazily combines the unifiers of independent problems. The unifiers
+    of all but the first problem are generated again for each unifier
+    of the problems before them instead of being kept.
+    """
+    if len(solvers) == 0:
+        yield SubstituteTerm()
+        return
+    for sigma in solvers[0]():
+        for theta in _product(solvers[1:]):
+            combined = SubstituteTerm()
+            combined.subs = sigma.subs | theta.subs
+            yield combined
+
+# Baader, Franz and Klaus U. Schulz. Unification in the Union of Disjoint
+# Equational Theories: Combining Decision Procedures. JSC, 1996.
+# Boudet, Alexandre. Combining Unification Algorithms. JSC, 1993.
+def ac_unify_combined(U: Set[Equation], ac_symbols: Iterable[Function],
+                      workers: Optional[int] = None) -> Iterator[SubstituteTerm]:
+    """
+    Lazily generates a complete set of unifiers of a set of
+    equations, where each of the ac_symbols is associative and
+    commutative and every other function symbol is free.
+
+    Parameters
+    ----------
+    U : Set[Equation]
+      The equations to unify.
+    ac_symbols : Iterable[Function]
+      The associative and commutative function symbols.
+    workers : int, optional
+      When greater than one, the groups of equations that don't
+      share variables are solved across a pool of that many processes.
+      Their unifiers are then all kept to be combined.
+
+    Notes
+    -----
+    Subterms whose root belongs to another theory are abstracted by
+    fresh variables, so that every equation is pure: either over a
+    single AC symbol or over the free symbols. The pure problems are
+    solved one theory at a time, by syntactic unification or Stickel's
+    method, and the unifiers are merged into equivalence classes of
+    variables. Since neither theory collapses, a class bound to terms
+    of two theories has no solution, while two terms of a same theory
+    become a new equation of that theory. Variables bound in another
+    theory are treated as atoms by Stickel's method.
+
+    The search is depth-first and the unifiers of independent groups
+    of equations are generated again rather than kept, so memory stays
+    bounded however many unifiers there are. Every group takes its
+    fresh variables from its own share of a single supply.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> g = Function("g", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> for sigma in ac_unify_combined({Equation(f(x, g(x, y)), f(a, g(a, b)))}, [f, g]):
+    ...     print(sigma)
+    {
+    x ↦ a,
+    y ↦ b
+    }
+    """
+    ac_symbols = tuple(ac_symbols)
+    U = sorted(U, key=str)
+    components = _components(U)
+    existing = vars_from_equations(U)
+    n = len(components)
+
+    if workers is not None and workers > 1 and n > 1:
+        from symcollab.Unification.batch import unify_many
+        problems = [
+            (c, ac_symbols, FreshVariables(existing, start=k, step=n))
+            for k, c in enumerate(components)
+        ]
+        unifiers = [u for _, u in unify_many(problems, _component_unifiers, workers)]
+        solvers = [lambda u=u: iter(u) for u in unifiers]
+    else:
+        solvers = [
+            lambda c=c, k=k: _solve_component(c, ac_symbols, FreshVariables(existing, start=k, step=n))
+            for k, c in enumerate(components)
+        ]
+    yield from _product(solvers)
@@ -4,62 +4,26 @@
 
 ####################################################
 To-Do:
--- [IN PROGRESS] Add free function symbols
 -- Add ACU, ACUI, and AG  unification
--- Allow more than one AC symbol
--- Test the solver and AC solutions
+
+Free function symbols and more than one AC symbol
+are handled by combination in ac_combination.
 """
 from collections import Counter
 from copy import deepcopy
-from itertools import product, combinations
-from typing import Set, Dict, Tuple, List, Optional
-
-import functools
+from typing import FrozenSet, Set, Dict, Iterator, Tuple, List, Optional, Sequence
 
-from sympy.solvers.diophantine.diophantine import diop_linear
-from sympy.core.sorting import default_sort_key
-from sympy import symbols
-import sympy
-
-from symcollab.algebra import Equation, get_vars, Variable, SubstituteTerm, Constant, Term, Function
+from symcollab.algebra import (
+    Equation, get_vars, Variable, SubstituteTerm, Constant, Term, Function, FuncTerm, preorder
+)
 from symcollab.Unification.common import (
     delete_trivial, occurs_check, function_clash
 )
+from symcollab.Unification.diophantine import hilbert_basis
 from symcollab.Unification.unif import unif as syntactic_unification
 from symcollab.Unification.registry import Unification_Algorithms
 
 
-def infinite_sequences(vector_len):
-    """
-    Generate positive instantiations of a vector of a specfied length.
-
-    Ex: infinite_sequences(3)
-    [0, 0, 1], [0, 1, 0], [0, 1, 1], [1, 0, 0]. [1, 0, 1], [1, 1, 0], [1, 1, 1], ...
-    """
-    first_elem = [0 for _ in range(vector_len)]
-    yield first_elem
-    result = [first_elem]
-
-    # All the possible ways to increment a vector
-    # Skip first one since it's [0, 0, 0]
-    incr_vectors = list(product(*(range(2) for _ in range(vector_len))))[1:]
-
-    last_result = result
-
-    while True:
-        next_result = []
-        for last_inst, incr_vector in product(last_result, incr_vectors):
-            # Sum both vectors
-            possible_vector = list(map(sum, zip(last_inst, incr_vector)))
-
-            if possible_vector not in result:
-                yield possible_vector
-                next_result.append(possible_vector)
-
-        result.extend(next_result)
-        last_result = next_result
-
-
 def flatten_term(t: Term, ac_symbol: Function) -> List[Term]:
     """
     Takes a term that's rooted with an ac_symbol and flattens
@@ -78,17 +42,9 @@ def flatten_term(t: Term, ac_symbol: Function) -> List[Term]:
     >>> flatten_term(f(f(x, g(x)), g(g(f(x,x)))), f)
     [x, g(x), g(g(f(x, x)))]
     """
-    if isinstance(t, (Constant, Variable)):
-        return [t]
-    
-    if t.function != ac_symbol:
-        return [t]
-    
-    l : List[Term] = []
-    for ti in t.arguments:
-        l = l + flatten_term(ti, ac_symbol)
-    
-    return l
+    def is_ac_rooted(ti: Term) -> bool:
+        return isinstance(ti, FuncTerm) and ti.function == ac_symbol
+    return [ti for ti in preorder(t, is_ac_rooted) if not is_ac_rooted(ti)]
 
 
 def flatten_equation(eq: Equation, ac_symbol: Function) -> Tuple[List[Term], List[Term]]:
@@ -137,76 +93,70 @@ def n_fresh_variables(existing_vars: Set[Variable], n: int, prefix: str = "z") -
         new_vars.append(v)
     return new_vars
 
-
-def valid_subsets(basis_table):
+class FreshVariables:
     """
-    From a basis table solution, find the subset
-    of vectors needed to satisfy the following constraints
-
-    (1) All entries are non-negative with respect to the basis vector
-    (2) The sum of every column is greater than zero
+    A supply of fresh variables shared by the subproblems of a
+    unification problem. The variables are named prefix, prefix_1,
+    prefix_2, ... skipping the existing variables, and only the
+    names from start onwards, taking every step-th one, are given out.
+    Supplies with different starts and the same step never overlap.
     """
-    for num_rows in range(len(basis_table)):
-        for c in combinations(basis_table, num_rows):
-            if all(sum(col) > 0 for col in zip(*c)):
-                yield c
-
-
-
-def generate_basis_table(basis_vector):
+    def __init__(self, existing_vars: Set[Variable], prefix: str = "z",
+                 start: int = 0, step: int = 1):
+        self.existing_symbols = {v.symbol for v in existing_vars}
+        self.prefix = prefix
+        self.index = start
+        self.step = step
+
+    def __call__(self) -> Variable:
+        while True:
+            symbol = self.prefix if self.index == 0 else f"{self.prefix}_{self.index}"
+            self.index += self.step
+            if symbol not in self.existing_symbols:
+                return Variable(symbol)
+
+def valid_subsets(basis_table, exact_columns: Sequence[int] = ()) -> Iterator[Tuple[int, ...]]:
     """
-    From a basis vector solution of a diophantine
-    equation, generate a basis table 
-    that satisfy the following constraints.
+    From a basis table solution, find the subsets
+    of vectors needed to satisfy the following constraints
 
     (1) All entries are non-negative with respect to the basis vector
     (2) The sum of every column is greater than zero
+    (3) The sum of every exact column is one
 
-    This is implemented as a generator, so you can generate infinite
-    basis tables.
+    Subsets are given as the indices of their rows, in lexicographic
+    order. A subset is not extended further once a column can't be
+    covered by the rows left or an exact column sums past one.
     """
-    free_symbols = list(functools.reduce(lambda c, n: c.union(n), (x.free_symbols for x in basis_vector)))
-    possible_instantiations = infinite_sequences(len(free_symbols))
-    next(possible_instantiations) # Throw away all zero instantation
-    memory = []
-    basis_table = []
-    while True:
-        finish_generating = False
-        while not finish_generating:
-            # Instantiate free variables until a valid vector is found
-            # Valid is defined as every entry being non-negative with respect to the basis vector.
-            valid = False
-            while not valid:
-                vector = []
-                inst = next(possible_instantiations)
-                for entry in basis_vector:
-                    for var_name, count in zip(free_symbols, inst):
-                        entry = entry.subs(var_name, count)
-                    vector.append(int(entry))
-                # Check validity
-                valid = all((entry >= 0 for entry in vector))
-
-            # Add row to the table
-            basis_table.append(vector)
-
-            # Check to see if table is finished
-            # A table is finished if the sum of every column is greater than 0
-            finish_generating = all(sum(col) > 0 for col in zip(*basis_table))
-        
-        # Yield valid subsets which includes the last row generated
-        # Rationale: Avoid repeat yields
-        # for num_rows in range(len(basis_table[:-1])):
-        #     for c in combinations(basis_table[:-1], num_rows):
-        #         c = [basis_table[-1]] + list(c)
-        #         if all(sum(col) > 0 for col in zip(*c)):
-        #             yield c
-        for num_rows in range(1, len(basis_table)):
-            for c in combinations(basis_table, num_rows):
-                if all(sum(col) > 0 for col in zip(*c)):
-                    set_c = { frozenset(l) for l in c }
-                    if set_c not in memory:
-                        yield c
-                        memory.append(set_c)
+    if len(basis_table) == 0:
+        return
+    width = len(basis_table[0])
+    # Whether each column is covered by the rows from an index onwards
+    coverable = [[False] * width]
+    for row in reversed(basis_table):
+        coverable.append([c or entry > 0 for c, entry in zip(coverable[-1], row)])
+    coverable.reverse()
+
+    sums = [0] * width
+    chosen: List[int] = []
+    def extend(start: int) -> Iterator[Tuple[int, ...]]:
+        if not all(s > 0 or coverable[start][c] for c, s in enumerate(sums)):
+            return
+        for i in range(start, len(basis_table)):
+            row = basis_table[i]
+            if any(sums[c] + row[c] > 1 for c in exact_columns):
+                continue
+            chosen.append(i)
+            for c, entry in enumerate(row):
+                sums[c] += entry
+            if all(s > 0 for s in sums):
+                yield tuple(chosen)
+            yield from extend(i + 1)
+            for c, entry in enumerate(row):
+                sums[c] -= entry
+            chosen.pop()
+    yield from extend(0)
+
 
 def vars_from_equations(U: Set[Equation]):
     """
@@ -220,119 +170,88 @@ def vars_from_equations(U: Set[Equation]):
         ALL_VARS = ALL_VARS.union(LS).union(RS)
     return ALL_VARS
 
-def stickel_method(U: Set[Equation], ac_symbol: Function) -> SubstituteTerm:
+def stickel_method(U: Set[Equation], ac_symbol: Function,
+                   atoms: FrozenSet[Variable] = frozenset(),
+                   fresh: Optional[FreshVariables] = None) -> Iterator[SubstituteTerm]:
     """
-    Convert a set of term equations into a single
-    linear homogeneous diophantine equation
+    Convert a set of term equations into a system of
+    linear homogeneous diophantine equations
     and solve it using stickel's method.
-    
-    The current diophantine solver uses Z3.
+
+    The basis tables are subsets of the minimal
+    solutions of the diophantine system. Like terms
+    that aren't variables, the atoms are only ever
+    mapped to a single fresh variable. New variables
+    are taken from fresh when it is given.
     """
+    # Equations are taken in a fixed order so that
+    # the unifiers are found in the same order
+    U = sorted(U, key=str)
+
     # Gather all variables for fresh var calculation
-    ALL_VARS = vars_from_equations(U)
+    if fresh is None:
+        fresh = FreshVariables(vars_from_equations(U))
     original_from_generalized : Dict[Variable, Term] = dict()
+    generalized_from_original : Dict[Term, Variable] = dict()
 
     def generalize_term(t: Term) -> Variable:
         """
         Returns a generalized variable for every
         term that's not a variable.
         """
-        vt = t
         if isinstance(t, Variable):
             original_from_generalized[t] = t
-        else:
-            vt = None
-            for gen_var, og_term in original_from_generalized.items():
-                if t == og_term:
-                    vt = gen_var
-                    break
-            if vt is None:
-                vt = fresh_variable(ALL_VARS)
-                ALL_VARS.add(vt)
-                original_from_generalized[vt] = t
+            return t
+        vt = generalized_from_original.get(t)
+        if vt is None:
+            vt = fresh()
+            original_from_generalized[vt] = t
+            generalized_from_original[t] = vt
         return vt
 
-    var_count = Counter()
-    # Go through each equation
+    # The multiplicity of each variable in each equation
+    var_counts: List[Counter] = list()
     for e in U:
         LS, RS = flatten_equation(e, ac_symbol)
-        # print("LS", LS)
-        # print("RS", RS)
 
         # Generalize left and right sides
-        LS_VARS = [generalize_term(t) for t in LS]
-        RS_VARS = [generalize_term(t) for t in RS]
-
-        # Calculate multiplicity
-        VARS_IN_EQ = set(LS_VARS).union(set(RS_VARS))
-        for x in VARS_IN_EQ:
-            num = LS_VARS.count(x) - RS_VARS.count(x)
-            var_count[x] += num
-
-    # Create the equation with variable coeficients
-    # being the counts above
-    sympy_expression = 0
-    var_map: Dict[sympy.core.Symbol, Variable] = dict()
-    for x, count in var_count.items():
-        # Construct Z3 variable
-        sympy_var = symbols(x.symbol + "_0", integer=True, positive=True)
-        var_map[sympy_var] = x
-
-        # Construct part of expression
-        sympy_expression += count * sympy_var
-
-
-    # Determine the ordering of the diophantine solver output
-    sympy_ordering = list(sympy_expression.expand(force=True).free_symbols)
-    sympy_ordering.sort(key=default_sort_key)
-
-    # Solve diophantine equation
-    # print(original_from_generalized)
-    # print(sympy_expression)
-    basis_vector = diop_linear(sympy_expression)
-    basis_tables = generate_basis_table(basis_vector)
-
-    sigma = False
-    while not sigma:
-        # Generate the basis table
-        basis_table = next(basis_tables)
-        # print(basis_table)
-
-        # Create variables representing each row
-        row_vars = n_fresh_variables(ALL_VARS, len(basis_table))
-        ALL_VARS = ALL_VARS.union(set(row_vars))
+        var_count = Counter(generalize_term(t) for t in LS)
+        var_count.subtract(generalize_term(t) for t in RS)
+        var_counts.append(var_count)
+
+    # Solve the diophantine system with one
+    # equation per term equation and one column per variable
+    columns = list(original_from_generalized.keys())
+    basis = hilbert_basis([[var_count[x] for x in columns] for var_count in var_counts])
+
+    # A generalized term or an atom must be the value of a single row
+    exact_columns = [
+        c for c, x in enumerate(columns)
+        if not isinstance(original_from_generalized[x], Variable) or x in atoms
+    ]
 
+    # Create variables representing each row
+    row_vars = [fresh() for _ in basis]
+
+    for subset in valid_subsets(basis, exact_columns):
         # Craft intermediate substitution from basis table
-        sub_basis: Dict[Variable, Term] = dict()
-        for column, sympy_var in enumerate(sympy_ordering):
+        new_eqs = set()
+        for column, x in enumerate(columns):
             term = None
-            for i, row in enumerate(basis_table):
-                if row[column] == 0:
-                    continue
+            for i in subset:
                 row_var = row_vars[i]
-                for _ in range(row[column]):
+                for _ in range(basis[i][column]):
                     if term is None:
                         term = row_var
                     else: # z_2 + z_4
                         term = ac_symbol(term, row_var)
-            sub_basis[var_map[sympy_var]] = term
+            new_eqs.add(Equation(term, original_from_generalized[x]))
 
-        # [TODO] [IN PROGRESS] Unify variables in the generalized terms with
+        # Unify variables in the generalized terms with
         # their counterparts in the original terms.
-        # print(sub_basis)
-        new_eqs = set()
-        for gen_var, basis_var in sub_basis.items():
-            rhs = original_from_generalized[gen_var]
-            new_eqs.add(Equation(
-                basis_var,
-                rhs
-            ))
         sigma = syntactic_unification(new_eqs)
-
-
-    # Currently returning one posisble unifier but we can keep generating
-    # using the basis vector
-    return {sigma}
+        if sigma:
+            yield sigma
 
 def get_functions(t: Term) -> Set[Function]:
     """Return all function signatures found in a term once each"""
@@ -346,24 +265,49 @@ def get_functions(t: Term) -> Set[Function]:
     return signatures
 
 
-#Assumes currently that we have a single AC-symbol
-#need to update to allow other function symbols and cons
-@Unification_Algorithms.register('AC')
-def ac_unify(U: Set[Equation], ac_symbol: Function):
+def ac_unify_iter(U: Set[Equation], ac_symbol: Function) -> Iterator[SubstituteTerm]:
+    """
+    Lazily generates a complete set of AC unifiers of a
+    set of equations, always in the same order.
 
-    # Return no unifiers for a set of empty equations
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> z = Variable("z")
+    >>> unifiers = ac_unify_iter({Equation(f(x, y), f(z, z))}, f)
+    >>> print(next(unifiers))
+    {
+    x ↦ f(f(z_1, z_1), y),
+    z ↦ f(z_1, y),
+    z_2 ↦ y
+    }
+    """
     if len(U) == 0:
-        return False # TODO: return set()
+        return
 
     U = delete_trivial(U)
+    if len(U) == 0:
+        yield SubstituteTerm()
+        return
 
-    if occurs_check(U):
-        return False # TODO: return set()
-
-    if function_clash(U):
-        return False # TODO: return set()
+    if occurs_check(U) or function_clash(U):
+        return
 
     # Send the problem to the diophantine solver
-    delta = stickel_method(U, ac_symbol)
+    yield from stickel_method(U, ac_symbol)
 
-    return set(delta)
+#Assumes currently that we have a single AC-symbol
+#need to update to allow other function symbols and cons
+@Unification_Algorithms.register('AC')
+def ac_unify(U: Set[Equation], ac_symbol: Function):
+    """
+    Returns the first AC unifier found by ac_unify_iter,
+    or False when there is none.
+    """
+    sigma = next(ac_unify_iter(U, ac_symbol), None)
+    if sigma is None:
+        return False # TODO: return set()
+    return {sigma}
@@ -0,0 +1,113 @@
+"""
+Solve many unification problems at once, optionally
+across a pool of worker processes.
+"""
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+from .cache import _find, _key, _run
+
+__all__ = ['unify_many']
+
+def _solve_chunk(algorithm: Callable, chunk: List[tuple]) -> List[Any]:
+    return [_run(algorithm, problem) for problem in chunk]
+
+def unify_many(problems: Iterable[Any], algorithm: Union[str, Callable] = '',
+               workers: Optional[int] = None, ordered: bool = True,
+               until: Optional[Callable[[Any], bool]] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Solves a batch of unification problems, yielding
+    the index of each problem along with its result.
+
+    Parameters
+    ----------
+    problems : Iterable
+      The problems to solve. A tuple is given as the arguments of
+      the algorithm, any other value as its only argument.
+    algorithm : str or Callable
+      The algorithm, given directly or by its name in Unification_Algorithms.
+      Algorithms that are classes, such as XOR_rooted_security, are
+      constructed from each problem and solved. Syntactic unification by default.
+    workers : int, optional
+      When greater than one, the problems are solved across a pool of that
+      many processes. The algorithm must then be importable by name.
+    ordered : bool
+      Whether results are yielded in the order of the problems,
+      or as soon as they are solved.
+    until : Callable, optional
+      Stops once a result satisfies this predicate, after yielding it.
+
+    Notes
+    -----
+    Identical problems, including sets of equations given in different
+    orders, are only solved once and their result is yielded for each
+    of their indices. Problems are sent to the workers in chunks, so the
+    symbols and variables they share are only transferred once per chunk.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> problems = [{Equation(f(x, a), f(b, b))}, {Equation(f(x, a), f(b, a))}, {Equation(x, a)}]
+    >>> for i, sigma in unify_many(problems, until=bool):
+    ...     print(i, sigma)
+    0 False
+    1 {x ↦ b}
+    """
+    algorithm = _find(algorithm)
+    # The indices of each distinct problem, in the order they first appear
+    groups: Dict[Hashable, List[int]] = dict()
+    unique: List[tuple] = list()
+    for i, problem in enumerate(problems):
+        if not isinstance(problem, tuple):
+            problem = (problem,)
+        key = _key(problem)
+        if key not in groups:
+            groups[key] = list()
+            unique.append(problem)
+        groups[key].append(i)
+    group_of: Dict[int, int] = {
+        i: j for j, indices in enumerate(groups.values()) for i in indices
+    }
+    indices_of = list(groups.values())
+
+    if workers is None or workers <= 1 or len(unique) <= 1:
+        results: Dict[int, Any] = dict()
+        for i in range(len(group_of)):
+            j = group_of[i]
+            if j not in results:
+                results[j] = _run(algorithm, unique[j])
+            yield i, results[j]
+            if until is not None and until(results[j]):
+                return
+        return
+
+    from concurrent.futures import as_completed, ProcessPoolExecutor
+    chunksize = max(1, len(unique) // (4 * workers))
+    pool = ProcessPoolExecutor(workers)
+    futures: Dict[Any, int] = dict()
+    try:
+        for start in range(0, len(unique), chunksize):
+            futures[pool.submit(_solve_chunk, algorithm, unique[start:start + chunksize])] = start
+        if ordered:
+            starts = {start: future for future, start in futures.items()}
+            for i in range(len(group_of)):
+                j = group_of[i]
+                start = j - j % chunksize
+                result = starts[start].result()[j - start]
+                yield i, result
+                if until is not None and until(result):
+                    return
+        else:
+            for future in as_completed(futures):
+                start = futures[future]
+                for offset, result in enumerate(future.result()):
+                    for i in indices_of[start + offset]:
+                        yield i, result
+                        if until is not None and until(result):
+                            return
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
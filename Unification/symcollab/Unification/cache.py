@@ -0,0 +1,287 @@
+"""
+A cache of unification results shared by problems that
+only differ in the names of their variables or the order
+of their equations.
+"""
+from collections import OrderedDict
+from functools import wraps
+from os import PathLike
+import os
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Union
+from symcollab.algebra import Equation, FuncTerm, preorder, rebuild, SubstituteTerm, Variable
+from symcollab.algebra.serialize import TermReader, TermWriter
+from symcollab.xor.structure import Equations
+from .registry import Unification_Algorithms
+
+__all__ = ['UnificationCache']
+
+# Algorithms that compare the symbols of variables,
+# so their canonical names must keep the same order
+_SYMBOL_ORDERED = {
+    'symcollab.Unification.constrained.p_unif.p_unif',
+    'symcollab.Unification.constrained.xor_rooted_unif.XOR_rooted_security',
+}
+
+def _collect_variables(value: Any, variables: Set[Variable]):
+    """Adds the variables occurring anywhere in a problem."""
+    if isinstance(value, (Variable, FuncTerm)):
+        variables.update(value.variables)
+    elif isinstance(value, Equation):
+        variables.update(value.left_side.variables, value.right_side.variables)
+    elif isinstance(value, SubstituteTerm):
+        for v, t in value.subs:
+            variables.add(v)
+            variables.update(t.variables)
+    elif isinstance(value, Equations):
+        _collect_variables(value.contents, variables)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            _collect_variables(v, variables)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _collect_variables(k, variables)
+            _collect_variables(v, variables)
+
+def _rename(value: Any, renaming: Dict[Variable, Variable]) -> Any:
+    """
+    Applies a renaming of variables throughout a problem or result,
+    building new containers of the same types along the way.
+    """
+    if isinstance(value, (Variable, FuncTerm)):
+        return rebuild(
+            value,
+            lambda t: renaming.get(t, t) if isinstance(t, Variable) else None,
+            lambda t: not t.ground
+        )
+    if isinstance(value, Equation):
+        return Equation(_rename(value.left_side, renaming), _rename(value.right_side, renaming))
+    if isinstance(value, SubstituteTerm):
+        sigma = SubstituteTerm()
+        sigma.subs = {(_rename(v, renaming), _rename(t, renaming)) for v, t in value.subs}
+        return sigma
+    if isinstance(value, Equations):
+        return Equations(_rename(value.contents, renaming))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return type(value)(_rename(v, renaming) for v in value)
+    if isinstance(value, dict):
+        return {_rename(k, renaming): _rename(v, renaming) for k, v in value.items()}
+    return value
+
+def _key(value: Any) -> Hashable:
+    """
+    A hashable form of a renamed problem, where the
+    order of equations and other unordered values is fixed.
+    """
+    if isinstance(value, (Variable, FuncTerm, Equation)):
+        return value
+    if isinstance(value, Equations):
+        return ("Equations", tuple(sorted(value.contents, key=str)))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted((_key(v) for v in value), key=str)))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_key(v) for v in value))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((_key(k), _key(v)) for k, v in value.items()), key=str)))
+    return value
+
+def _shape(value: Any) -> str:
+    """A form of a problem that doesn't depend on the names of its variables."""
+    if isinstance(value, (Variable, FuncTerm)):
+        return str(rebuild(
+            value,
+            lambda t: Variable("_", t.sort) if isinstance(t, Variable) else None,
+            lambda t: not t.ground
+        ))
+    if isinstance(value, Equation):
+        return _shape(value.left_side) + " = " + _shape(value.right_side)
+    if isinstance(value, Equations):
+        return "Equations" + _shape(set(value.contents))
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(_shape(v) for v in value)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_shape(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(sorted(_shape(k) + ": " + _shape(v) for k, v in value.items())) + "}"
+    return str(value)
+
+def _canonical_order(value: Any) -> List[Any]:
+    """
+    The parts of a problem in an order that doesn't depend on the
+    names of its variables, except between parts of the same shape.
+    """
+    if isinstance(value, Equations):
+        value = set(value.contents)
+    elif isinstance(value, dict):
+        value = set(value.items())
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=lambda v: (_shape(v), str(v)))
+    return list(value)
+
+def _occurrences(value: Any, order: Dict[Variable, None]):
+    """Adds the variables of a problem in the order they first occur."""
+    if isinstance(value, (Variable, FuncTerm)):
+        for t in preorder(value, lambda t: not t.ground):
+            if isinstance(t, Variable):
+                order.setdefault(t, None)
+    elif isinstance(value, Equation):
+        _occurrences(value.left_side, order)
+        _occurrences(value.right_side, order)
+    elif isinstance(value, (Equations, list, tuple, set, frozenset, dict)):
+        for v in _canonical_order(value):
+            _occurrences(v, order)
+
+def _name(algorithm: Callable) -> str:
+    return algorithm.__module__ + "." + algorithm.__qualname__
+
+def _find(algorithm: Union[str, Callable]) -> Callable:
+    if not isinstance(algorithm, str):
+        return algorithm
+    found = Unification_Algorithms.find(algorithm)
+    if found is None:
+        raise ValueError(f"No unification algorithm is registered as '{algorithm}'")
+    return found
+
+def _run(algorithm: Callable, problem: tuple) -> Any:
+    """Solves a problem, constructing the algorithm first when it is a class."""
+    if isinstance(algorithm, type):
+        return algorithm(*problem).solve()
+    return algorithm(*problem)
+
+
+class UnificationCache:
+    """
+    Caches the results of unification algorithms up to
+    renaming of variables and the order of equations.
+
+    Problems are canonicalized by renaming their variables to
+    fixed names, in the order they first occur once the equations
+    and other unordered parts of the problem are sorted by their
+    shape. p_unif and XOR_rooted_security compare the symbols of
+    variables, so for them the order between symbols is kept instead.
+    The algorithm is run on the canonical problem and the variables
+    of its results are renamed back into the caller's variables.
+    Any other variable introduced by the algorithm keeps its name,
+    unless it clashes with a variable of the caller or another
+    introduced variable.
+
+    Parameters
+    ----------
+    maxsize : int
+      The maximum number of results to remember, least
+      recently used results are forgotten first.
+    path : str or PathLike, optional
+      A file the results are loaded from, if it exists,
+      and written to by save.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.Unification.unif import unif
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> u = Variable("u")
+    >>> v = Variable("v")
+    >>> a = Constant("a")
+    >>> cache = UnificationCache()
+    >>> cached_unif = cache.wrap(unif)
+    >>> print(cached_unif({Equation(f(x, y), f(a, x))}))
+    {
+    x ↦ a,
+    y ↦ a
+    }
+    >>> print(cached_unif({Equation(f(u, v), f(a, u))}))
+    {
+    u ↦ a,
+    v ↦ a
+    }
+    >>> cache.hits, cache.misses
+    (1, 1)
+    """
+    def __init__(self, maxsize: int = 4096, path: Optional[Union[str, PathLike]] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._results: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        if path is not None and os.path.exists(path):
+            with TermReader.open(path) as reader:
+                for key, result in reader:
+                    self._remember(key, result)
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """Forgets every result."""
+        self._results.clear()
+
+    def save(self):
+        """Writes every result to the file of the cache."""
+        if self.path is None:
+            raise ValueError("The cache has no file to save to")
+        partial = str(self.path) + ".partial"
+        with TermWriter(open(partial, "wb")) as writer:
+            for key, result in self._results.items():
+                writer.write((key, result))
+        os.replace(partial, self.path)
+
+    def _remember(self, key: Hashable, result: Any):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def solve(self, algorithm: Union[str, Callable], *problem: Any) -> Any:
+        """
+        Solves a problem with a unification algorithm, given directly
+        or by its name in Unification_Algorithms. Algorithms that are
+        classes, such as XOR_rooted_security, are constructed from the
+        problem and solved.
+        """
+        algorithm = _find(algorithm)
+        variables: Set[Variable] = set()
+        _collect_variables(problem, variables)
+        if _name(algorithm) in _SYMBOL_ORDERED:
+            ordered = sorted(variables, key=lambda v: (v.symbol, str(v.sort)))
+        else:
+            occurring: Dict[Variable, None] = dict()
+            _occurrences(problem, occurring)
+            ordered = list(occurring)
+        width = len(str(len(ordered)))
+        canonical = {
+            v: Variable(f"_{i:0{width}d}", v.sort)
+            for i, v in enumerate(ordered)
+        }
+        canonical_problem = _rename(problem, canonical)
+        key = (_name(algorithm), _key(canonical_problem))
+
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            result = self._results[key]
+        else:
+            self.misses += 1
+            result = _run(algorithm, canonical_problem)
+            self._remember(key, result)
+
+        # Rename back, keeping the other variables apart from the caller's
+        back: Dict[Variable, Variable] = {c: v for v, c in canonical.items()}
+        introduced: Set[Variable] = set()
+        _collect_variables(result, introduced)
+        taken = set(variables)
+        for v in sorted(introduced - back.keys(), key=lambda v: (v.symbol, str(v.sort))):
+            symbol = v.symbol
+            while Variable(symbol, v.sort) in taken:
+                symbol += "'"
+            back[v] = Variable(symbol, v.sort)
+            taken.add(back[v])
+        return _rename(result, back)
+
+    def wrap(self, algorithm: Union[str, Callable]) -> Callable:
+        """Returns a function solving problems with the algorithm through the cache."""
+        algorithm = _find(algorithm)
+        @wraps(algorithm)
+        def cached(*problem: Any) -> Any:
+            return self.solve(algorithm, *problem)
+        return cached
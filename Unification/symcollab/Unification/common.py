@@ -87,7 +87,7 @@ def occurs_check_variable(equations: Set[Equation], v: Variable) -> bool:
 		c_equations, c_path = Q.pop(0)
 
 		last_term = c_path[-1]
-		last_term_vars = get_vars(last_term)
+		last_term_vars = get_vars(last_term, unique=True)
 
 		if v in last_term_vars and v != last_term:
 			return True
@@ -190,7 +190,7 @@ def eliminate(
 
     for equation in equations:
         if isinstance(equation.left_side, Variable) and \
-            equation.left_side not in get_vars(equation.right_side):
+            equation.left_side not in get_vars(equation.right_side, unique=True):
             matched_equation = equation
             break
 
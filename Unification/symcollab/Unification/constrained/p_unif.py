@@ -10,6 +10,8 @@ class P_unif_problem:
         self.equations = eqs                #a set of equations
         self.constraints = constraints      #a dictionary
         self.disequations = diseqs          #disequations
+        #index the terms each variable is constrained to
+        self.constraint_index = {v: DiscriminationTree(terms) for v, terms in constraints.items()}
 
 def computable(func):
     #Check if func is computable by the attacker
@@ -67,8 +69,7 @@ def findsubsets(s, n):
 
 def is_good_mapping(v, t, p_unif_problem):
     #check if "v |-> t" is a good mapping for p_unif_problem
-    constraints = p_unif_problem.constraints
-    terms = constraints[v]
+    terms = p_unif_problem.constraint_index[v]
     if(t in terms):
         return True
     elif(isinstance(t, Constant)):
@@ -349,34 +350,25 @@ def p_unif(eqs, constraints):
         p_unifiers = p_unifiers + new_p_unifiers
     return p_unifiers
 
-'''
 def get_open_positions(t):
     #t is a term.
-    #It returns a list of open positions, which are lists.
-    if(isinstance(t, Constant)):
-        return [[]]
-    elif(isinstance(t, Variable)):
-        return [[]]
-    else:
-        if(computable(t.function)):
-            result = [[]]
-            for index in range(0, len(t.arguments)):
-                sub_result = get_open_positions(t.arguments[index])
-                for sub_r in sub_result:
-                    sub_r.insert(0, index)
-                result = result + sub_result
-            return result
-        else:
-            return [[]]
+    #It returns a list of open positions, the positions reachable
+    #through functions that are computable by the attacker.
+    result = []
+    stack = [(Position(), t)]
+    while stack:
+        pos, s = stack.pop()
+        result.append(pos)
+        if(isinstance(s, FuncTerm) and not isinstance(s, Constant) and computable(s.function)):
+            for index in range(len(s.arguments), 0, -1):
+                stack.append((pos.child(index), s.arguments[index - 1]))
+    return result
 
 def subterm_at_position(t, p):
     #returns a subterm of t at position p
-    if(len(p) == 0):
-        return t
-    else:
-        p1, *p2 = p
-        return subterm_at_position(t.arguments[p1], p2)
+    return subterm_at(t, p)
 
+'''
 def smallest_variable(lst):
     #pick the smallest variable from a list of variables
     if(len(lst) == 0):
@@ -1,4 +1,4 @@
-from symcollab.algebra import Function
+from symcollab.algebra import Function, fold
 from symcollab.Unification.bool_unif import *
 
 
@@ -20,21 +20,29 @@ def over_lapping_f_depth(term1, term2):
     else:
         return False
 
-def convert_to_BTerm(t):
-    #Convert a normal term to a term that contains boolean variables
+def _BTerm_children(t):
+    #The terms that get converted into the arguments of a BTerm
+    if (is_xor_term(t)):
+        return xor_to_list(t)
+    if (isinstance(t, FuncTerm)):
+        return t.arguments
+    return ()
+
+def _convert_node_to_BTerm(t, new_arguments):
     if (isinstance(t, Constant)):
         return Constant_BTerm(t.symbol)
     if (isinstance(t, Variable)):
         return Var_BTerm(t.symbol)
     if (is_xor_term(t)):
-        arguments = xor_to_list(t)
-        new_arguments = list(map(convert_to_BTerm, arguments))
         return Xor_BTerm(new_arguments)
     if (isinstance(t, FuncTerm) and not is_xor_term(t)):
-        new_arguments = list(map(convert_to_BTerm, t.arguments))
         return BFuncTerm(BFunction(t.function.symbol, t.function.arity), new_arguments)
     print("error in convert_to_BTerm")
 
+def convert_to_BTerm(t):
+    #Convert a normal term to a term that contains boolean variables
+    return fold(t, _convert_node_to_BTerm, _BTerm_children)
+
 def convert_to_Term(t):
     #t is a BTerm
     type = t.get_type()
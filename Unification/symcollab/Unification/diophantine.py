@@ -0,0 +1,68 @@
+"""
+Minimal solutions of systems of linear homogeneous
+Diophantine equations over the natural numbers.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+__all__ = ['hilbert_basis']
+
+Vector = Tuple[int, ...]
+
+def _dominates(smaller: Vector, larger: Vector) -> bool:
+    """Every component of smaller is at most the one of larger."""
+    return all(s <= l for s, l in zip(smaller, larger))
+
+# Contejean, Evelyne and Hervé Devie. An Efficient Incremental Algorithm for
+# Solving Systems of Linear Diophantine Equations. Information and Computation, 1994.
+def hilbert_basis(system: Sequence[Sequence[int]]) -> List[Vector]:
+    """
+    Computes the minimal non-zero solutions over the natural
+    numbers of a system of equations A x = 0, given as the rows
+    of coefficients of A. Every solution is a sum of these.
+
+    Notes
+    -----
+    Candidates start from the unit vectors and grow one component
+    at a time. A candidate p is only increased at a component j
+    when the defect A p and the column A e_j point in opposite
+    directions, that is when their scalar product is negative, which
+    brings p closer to a solution. Candidates that are solutions, or
+    greater than a solution already found, are no longer increased.
+    Candidates of a same size are found together, so solutions are
+    found in increasing size and each is minimal.
+
+    Examples
+    --------
+    >>> hilbert_basis([[1, 1, -2]])
+    [(2, 0, 1), (1, 1, 1), (0, 2, 1)]
+    >>> hilbert_basis([[1, -1, 0], [0, 1, -1]])
+    [(1, 1, 1)]
+    """
+    if len(system) == 0:
+        return list()
+    n = len(system[0])
+    columns: List[Vector] = [tuple(row[j] for row in system) for j in range(n)]
+    units: List[Vector] = [tuple(int(i == j) for i in range(n)) for j in range(n)]
+
+    basis: List[Vector] = list()
+    # Each candidate of the current size along with its defect A p
+    candidates: Dict[Vector, Vector] = {units[j]: columns[j] for j in range(n)}
+    while len(candidates) > 0:
+        found = sorted(
+            (p for p, defect in candidates.items() if not any(defect)),
+            reverse=True
+        )
+        basis.extend(found)
+        following: Dict[Vector, Vector] = dict()
+        for p, defect in candidates.items():
+            if not any(defect):
+                continue
+            for j, column in enumerate(columns):
+                if sum(d * c for d, c in zip(defect, column)) >= 0:
+                    continue
+                q = p[:j] + (p[j] + 1,) + p[j + 1:]
+                if q in following or any(_dominates(b, q) for b in basis):
+                    continue
+                following[q] = tuple(d + c for d, c in zip(defect, column))
+        candidates = following
+    return basis
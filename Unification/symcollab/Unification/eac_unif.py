@@ -16,7 +16,7 @@ from symcollab.algebra import (
 	Equation, get_vars, Function, FuncTerm,
 	SubstituteTerm, Variable
 )
-from symcollab.Unification.ac_unif import ac_unify
+from symcollab.Unification.ac_unif import ac_unify_iter
 from symcollab.Unification.flat import flat
 from .registry import Unification_Algorithms
 
@@ -66,9 +66,9 @@ def eac_unif(U: Set[Equation]):
 				for e in sol:
 					if isinstance(e.right_side, FuncTerm) and str(e.right_side.function) == "f":
 						f_terms.add(e)
-				delta = SubstituteTerm()
-				#call ac-unif
-				delta=ac_unify(f_terms)
+				#call ac-unif, the unifiers are generated
+				#as they are taken from delta
+				delta=ac_unify_iter(f_terms, Function("f", 2))
 				U4.append([sol, delta])
 	print("EAC Unification is complete")
 	return U4
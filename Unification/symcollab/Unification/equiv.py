@@ -1,10 +1,11 @@
 from copy import deepcopy
-from typing import Set
+from typing import Iterable, Optional, Set
 from symcollab.algebra import (
 	Equation, Variable, FuncTerm,
 	SubstituteTerm
 )
 from symcollab.Unification.unif import unif as syntactic_unification
+from symcollab.Unification.batch import unify_many
 
 def sub_to_equation(sigma: SubstituteTerm) -> Set[Equation]:
 	"""Converts a substitution to a set of equations"""
@@ -20,8 +21,27 @@ def syntactic_equal(sigma1: SubstituteTerm, sigma2: SubstituteTerm) -> bool:
 	"""
 	S1 = sub_to_equation(sigma1)
 	S2 = sub_to_equation(sigma2)
-	S3 = S1.union(S2)
+	return _equations_equal(S1.union(S2))
 
+def syntactic_equal_any(sigma: SubstituteTerm, others: Iterable[SubstituteTerm],
+						workers: Optional[int] = None) -> bool:
+	"""
+	Returns whether or not a substitution is equivalent modulo
+	variable renaming to any of the others, stopping at the first.
+	The comparisons are spread across a pool of processes when
+	workers is greater than one.
+	"""
+	S1 = sub_to_equation(sigma)
+	if workers is not None and workers > 1:
+		problems = (S1.union(sub_to_equation(other)) for other in others)
+		return any(
+			equal for _, equal in
+			unify_many(problems, _equations_equal, workers, ordered=False, until=bool)
+		)
+	return any(_equations_equal(S1.union(sub_to_equation(other))) for other in others)
+
+def _equations_equal(S3: Set[Equation]) -> bool:
+	"""The equations of two substitutions are equivalent modulo variable renaming."""
 	unif = syntactic_unification(S3)
 	if unif == False:
 		return False
@@ -1,31 +1,147 @@
 #!/usr/bin/env python3
 """
-Slow Syntactic Unification
+Syntactic Unification
 """
 
-from symcollab.algebra import Equation, SubstituteTerm
-from typing import Set
-from symcollab.Unification.common import (
-    occurs_check, function_clash, eliminate,
-    orient, decompose, delete_trivial
-)
+from typing import Dict, List, Optional, Set, Tuple
+from symcollab.algebra import Equation, FuncTerm, rebuild, SubstituteTerm, Term, Variable
 from symcollab.Unification.registry import Unification_Algorithms
 
-# Franz Baader and Wayne Snyder. Unification Theory. Handbook of Automated Reasoning, 2001.
+class _Classes:
+    """
+    Equivalence classes of terms kept in a union-find structure
+    with union by size and path compression. Each class remembers
+    a non-variable term it contains, if any, and a variable to
+    stand for it otherwise.
+    """
+    def __init__(self):
+        self.parent: Dict[Term, Term] = dict()
+        self.size: Dict[Term, int] = dict()
+        self.schema: Dict[Term, Optional[FuncTerm]] = dict()
+        self.variable: Dict[Term, Optional[Variable]] = dict()
+
+    def find(self, t: Term) -> Term:
+        if t not in self.parent:
+            self.parent[t] = t
+            self.size[t] = 1
+            self.schema[t] = t if isinstance(t, FuncTerm) else None
+            self.variable[t] = t if isinstance(t, Variable) else None
+            return t
+        root = t
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[t] != root:
+            self.parent[t], t = root, self.parent[t]
+        return root
+
+    def union(self, left: Term, right: Term, schema: Optional[FuncTerm]):
+        """
+        Merges two classes given by their roots. A variable of the
+        right class stands for the merged class when there is one.
+        """
+        variable = self.variable[right] if self.variable[right] is not None else self.variable[left]
+        if self.size[left] > self.size[right]:
+            left, right = right, left
+        self.parent[left] = right
+        self.size[right] += self.size[left]
+        self.schema[right] = schema
+        self.variable[right] = variable
+
+def _clash(s: FuncTerm, t: FuncTerm) -> bool:
+    return s.function != t.function or len(s.arguments) != len(t.arguments)
+
+# Martelli, Alberto and Ugo Montanari. An Efficient Unification Algorithm. TOPLAS, 1982.
+# Huet, Gérard. Résolution d'équations dans des langages d'ordre 1, 2, ..., ω. 1976.
 @Unification_Algorithms.register('')
 def unif(equations: Set[Equation]) -> Set[SubstituteTerm]:
     """
     Perform syntactic unification on a set of equations
     and return a unifier as a set of
+
+    Notes
+    -----
+    Equal terms are merged into classes, so each class behaves as
+    a multi-equation whose non-variable terms are decomposed only
+    once. Cycles are looked for once every equation is solved, while
+    resolving the classes into the most general unifier.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> a = Constant("a")
+    >>> print(unif({Equation(f(x, y), f(y, a))}))
+    {
+    x ↦ a,
+    y ↦ a
+    }
+    >>> unif({Equation(f(x, y), f(y, f(x, a)))})
+    False
     """
+    classes = _Classes()
+    variables: Set[Variable] = set()
+    stack: List[Tuple[Term, Term]] = list()
+    for equation in equations:
+        variables.update(equation.left_side.variables, equation.right_side.variables)
+        stack.append((equation.left_side, equation.right_side))
+
+    # Merge the classes of the terms that must be equal
+    while len(stack) > 0:
+        s, t = stack.pop()
+        s = classes.find(s)
+        t = classes.find(t)
+        if s == t:
+            continue
+        s_schema = classes.schema[s]
+        t_schema = classes.schema[t]
+        if s_schema is not None and t_schema is not None:
+            if _clash(s_schema, t_schema):
+                return False # TODO: return set()
+            stack.extend(zip(s_schema.arguments, t_schema.arguments))
+        classes.union(s, t, s_schema if s_schema is not None else t_schema)
+
+    # Resolve each class depending on a variable, failing on cycles
+    resolved: Dict[Term, Term] = dict()
+    visiting: Set[Term] = set()
+    for v in variables:
+        todo = [classes.find(v)]
+        while len(todo) > 0:
+            root = todo[-1]
+            if root in resolved:
+                todo.pop()
+                continue
+            schema = classes.schema[root]
+            if schema is None:
+                resolved[root] = classes.variable[root]
+                todo.pop()
+                continue
+            pending = [
+                r for r in map(classes.find, schema.variables)
+                if r not in resolved
+            ]
+            if len(pending) > 0 and root not in visiting:
+                visiting.add(root)
+                for r in pending:
+                    if r in visiting:
+                        return False # TODO: return set()
+                    todo.append(r)
+                continue
+            if len(pending) > 0:
+                # Only its own descendants are unresolved, so it's on a cycle
+                return False # TODO: return set()
+            visiting.discard(root)
+            resolved[root] = rebuild(
+                schema,
+                lambda u: resolved[classes.find(u)] if isinstance(u, Variable) else None,
+                lambda u: not u.ground
+            )
+            todo.pop()
+
     sigma = SubstituteTerm()
-    while len(equations) > 0:
-        if occurs_check(equations):
-            return False # TODO: return set()
-        if function_clash(equations):
-            return False # TODO: return set() 
-        equations, sigma = eliminate(equations, sigma)
-        equations = orient(equations)
-        equations = decompose(equations)
-        equations = delete_trivial(equations)
+    sigma.subs = {
+        (v, resolved[classes.find(v)]) for v in variables
+        if resolved[classes.find(v)] != v
+    }
     return sigma # TODO: return {sigma}
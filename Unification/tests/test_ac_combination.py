@@ -0,0 +1,83 @@
+from symcollab.algebra import *
+from symcollab.Unification.ac_combination import ac_unify_combined
+import unittest
+
+def canonical(t, ac_symbols):
+    """A string equal for terms equal modulo AC of the ac_symbols."""
+    if isinstance(t, Variable) or len(t.arguments) == 0:
+        return str(t)
+    if t.function in ac_symbols:
+        arguments = list()
+        stack = [t]
+        while stack:
+            s = stack.pop()
+            if isinstance(s, FuncTerm) and s.function == t.function:
+                stack.extend(s.arguments)
+            else:
+                arguments.append(canonical(s, ac_symbols))
+        return f"{t.function}[{', '.join(sorted(arguments))}]"
+    return f"{t.function}({', '.join(canonical(s, ac_symbols) for s in t.arguments)})"
+
+class TestACCombination(unittest.TestCase):
+    def setUp(self):
+        self.f = Function("f", 2)
+        self.g = Function("g", 2)
+
+    def assertUnifiers(self, U, count, workers=None):
+        ac_symbols = [self.f, self.g]
+        unifiers = list(ac_unify_combined(U, ac_symbols, workers))
+        self.assertEqual(len(unifiers), count)
+        for sigma in unifiers:
+            for e in U:
+                self.assertEqual(
+                    canonical(e.left_side * sigma, ac_symbols),
+                    canonical(e.right_side * sigma, ac_symbols)
+                )
+        return unifiers
+
+    def test_free_symbols(self):
+        f, g = self.f, self.g
+        h = Function("h", 1)
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        b = Constant("b")
+        self.assertUnifiers({Equation(f(x, h(y)), f(a, z))}, 2)
+        self.assertUnifiers({Equation(f(x, y), f(h(x), z))}, 2)
+        sigma, = self.assertUnifiers({Equation(f(h(x), a), f(a, h(g(y, b))))}, 1)
+        self.assertEqual(sigma.subs, {(x, g(y, b))})
+        self.assertUnifiers({Equation(x, h(x))}, 0)
+        self.assertUnifiers({Equation(f(x, a), f(h(y), b))}, 0)
+
+    def test_several_ac_symbols(self):
+        f, g = self.f, self.g
+        u = Variable("u")
+        w = Variable("w")
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        b = Constant("b")
+        self.assertUnifiers({Equation(f(x, g(x, y)), f(z, g(a, b)))}, 4)
+        self.assertUnifiers({Equation(f(x, g(y, z)), f(g(a, u), w))}, 6)
+        self.assertUnifiers({Equation(f(x, x), g(y, z))}, 0)
+        # Terms of one theory bound to variables of another
+        self.assertUnifiers({Equation(f(x, y), f(z, z)), Equation(z, g(a, b))}, 1)
+
+    def test_independent(self):
+        f, g = self.f, self.g
+        u = Variable("u")
+        w = Variable("w")
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        U = {Equation(f(x, y), f(z, a)), Equation(g(u, u), g(w, a))}
+        unifiers = self.assertUnifiers(U, 4 * 2)
+        parallel = self.assertUnifiers(U, 4 * 2, workers=2)
+        self.assertEqual([str(sigma) for sigma in unifiers], [str(sigma) for sigma in parallel])
+        self.assertUnifiers({Equation(f(x, y), f(z, a)), Equation(g(u, w), g(w, u))}, 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from symcollab.algebra import *
+from symcollab.Unification.ac_unif import ac_unify, ac_unify_iter, valid_subsets
+from itertools import islice
+import unittest
+
+def flatten(t, f):
+    if isinstance(t, FuncTerm) and t.function == f:
+        return [s for u in t.arguments for s in flatten(u, f)]
+    return [t]
+
+class TestACUnif(unittest.TestCase):
+    def test_ac_unify(self):
+        f = Function("f", 2)
+        w = Variable("w")
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        b = Constant("b")
+        problems = [
+            {Equation(f(w, f(x, f(y, z))), f(x, f(x, w)))},
+            {Equation(f(x, f(y, z)), f(w, w))},
+            {Equation(f(x, a), f(y, z))},
+        ]
+        for U in problems:
+            unifiers = ac_unify(U, f)
+            self.assertEqual(len(unifiers), 1)
+            sigma = next(iter(unifiers))
+            for e in U:
+                self.assertEqual(
+                    sorted(map(str, flatten(e.left_side * sigma, f))),
+                    sorted(map(str, flatten(e.right_side * sigma, f)))
+                )
+        self.assertFalse(ac_unify({Equation(f(x, a), f(b, b))}, f))
+
+    def test_ac_unify_iter(self):
+        f = Function("f", 2)
+        w = Variable("w")
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        w1 = Variable("w1")
+        x1 = Variable("x1")
+        # Sizes of the minimal complete sets from Boudet and Contejean
+        problems = [
+            (Equation(f(x, f(y, z)), f(x1, x1)), 45),
+            (Equation(f(w, f(w, f(y, z))), f(w1, x1)), 61),
+            (Equation(f(w, f(w, f(w, y))), f(w1, f(w1, x1))), 47),
+        ]
+        for e, size in problems:
+            unifiers = list(ac_unify_iter({e}, f))
+            self.assertEqual(len(unifiers), size)
+            for sigma in unifiers:
+                self.assertEqual(
+                    sorted(map(str, flatten(e.left_side * sigma, f))),
+                    sorted(map(str, flatten(e.right_side * sigma, f)))
+                )
+            # Unifiers are always found in the same order
+            self.assertEqual(
+                [str(sigma) for sigma in islice(ac_unify_iter({e}, f), 10)],
+                [str(sigma) for sigma in unifiers[:10]]
+            )
+        self.assertEqual(len(list(ac_unify_iter({Equation(x, x)}, f))), 1)
+
+    def test_valid_subsets(self):
+        basis = [(1, 1, 0), (0, 1, 1), (1, 0, 1), (0, 0, 2)]
+        self.assertEqual(
+            list(valid_subsets(basis)),
+            [(0, 1), (0, 1, 2), (0, 1, 2, 3), (0, 1, 3), (0, 2), (0, 2, 3),
+             (0, 3), (1, 2), (1, 2, 3)]
+        )
+        self.assertEqual(list(valid_subsets(basis, [2])), [(0, 1), (0, 2)])
+
+if __name__ == "__main__":
+    unittest.main()
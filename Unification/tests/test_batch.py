@@ -0,0 +1,70 @@
+from symcollab.algebra import *
+from symcollab.Unification.batch import unify_many
+from symcollab.Unification.equiv import syntactic_equal_any
+from symcollab.Unification.unif import unif
+import unittest
+
+calls = 0
+
+def bindings(results):
+    return [r if r is False else r.subs for r in results]
+
+def counting_unif(equations):
+    global calls
+    calls += 1
+    return unif(equations)
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        self.problems = [
+            {Equation(f(x, y), f(a, g(x)))},
+            {Equation(f(x, a), f(b, b))},
+            {Equation(x, g(y)), Equation(y, a)},
+            {Equation(y, a), Equation(x, g(y))},
+            {Equation(x, g(x))},
+            {Equation(f(x, y), f(a, g(x)))},
+        ]
+
+    def test_sequential(self):
+        global calls
+        calls = 0
+        results = list(unify_many(self.problems, counting_unif))
+        self.assertEqual([i for i, _ in results], list(range(len(self.problems))))
+        self.assertEqual(bindings(r for _, r in results), bindings(unif(p) for p in self.problems))
+        # Identical problems are only solved once
+        self.assertEqual(calls, 4)
+
+    def test_until(self):
+        results = list(unify_many(self.problems, '', until=lambda r: r is False))
+        self.assertEqual([i for i, _ in results], [0, 1])
+
+    def test_workers(self):
+        expected = bindings(unif(p) for p in self.problems)
+        results = list(unify_many(self.problems, unif, workers=2))
+        self.assertEqual(bindings(r for _, r in results), expected)
+        results = sorted(unify_many(self.problems, unif, workers=2, ordered=False))
+        self.assertEqual([i for i, _ in results], list(range(len(self.problems))))
+        self.assertEqual(bindings(r for _, r in results), expected)
+
+    def test_syntactic_equal_any(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        sigma = SubstituteTerm()
+        sigma.add(x, f(a, y))
+        tau = SubstituteTerm()
+        tau.add(x, f(b, y))
+        self.assertFalse(syntactic_equal_any(sigma, [tau]))
+        self.assertTrue(syntactic_equal_any(sigma, [tau, sigma]))
+        self.assertTrue(syntactic_equal_any(sigma, [tau, sigma], workers=2))
+
+if __name__ == "__main__":
+    unittest.main()
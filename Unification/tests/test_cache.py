@@ -0,0 +1,95 @@
+from symcollab.algebra import *
+from symcollab.Unification.cache import UnificationCache
+from symcollab.Unification.unif import unif
+from symcollab.Unification.constrained.p_unif import p_unif
+from symcollab.xor import xor
+from symcollab.xor.structure import Equations
+import os
+import tempfile
+import unittest
+
+def introduce(equations):
+    """Binds the first variable to a term of variables the problem may not have."""
+    f = Function("f", 2)
+    sigma = SubstituteTerm()
+    sigma.add(Variable("_0"), f(Variable("z"), Variable("z'")))
+    return sigma
+
+class TestCache(unittest.TestCase):
+    def test_renaming(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        u = Variable("u")
+        v = Variable("v")
+        a = Constant("a")
+        cache = UnificationCache()
+        problem = {Equation(f(x, y), f(g(y), a)), Equation(y, a)}
+        self.assertEqual(cache.solve(unif, problem).subs, unif(problem).subs)
+        # Same problem with other names and order
+        renamed = {Equation(v, a), Equation(f(u, v), f(g(v), a))}
+        self.assertEqual(cache.solve('', renamed).subs, unif(renamed).subs)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # Names are given in the order variables occur, not by their symbols
+        swapped = {Equation(f(y, x), f(g(x), a)), Equation(x, a)}
+        self.assertEqual(cache.solve(unif, swapped).subs, unif(swapped).subs)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertFalse(cache.solve(unif, {Equation(x, g(x))}))
+
+    def test_numbered_variables(self):
+        f = Function("f", 2)
+        a = Constant("a")
+        x_1, x_2, x_9, x_10 = (Variable(f"x_{i}") for i in (1, 2, 9, 10))
+        cache = UnificationCache()
+        sigma = cache.solve(unif, {Equation(f(x_1, x_2), f(a, x_1))})
+        self.assertEqual(sigma.subs, {(x_1, a), (x_2, a)})
+        tau = cache.solve(unif, {Equation(f(x_9, x_10), f(a, x_9))})
+        self.assertEqual(tau.subs, {(x_9, a), (x_10, a)})
+        self.assertEqual(cache.hits, 1)
+
+    def test_introduced_variables(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        z = Variable("z")
+        cache = UnificationCache()
+        sigma = cache.solve(introduce, {Equation(x, z)})
+        # Both introduced variables are kept apart from z and from each other
+        self.assertEqual(sigma.subs, {(x, f(Variable("z'"), Variable("z''")))})
+
+    def test_lru(self):
+        g = Function("g", 1)
+        x = Variable("x")
+        constants = [Constant(f"c{i}") for i in range(5)]
+        cache = UnificationCache(maxsize=3)
+        for c in constants:
+            cache.solve(unif, {Equation(g(x), g(c))})
+        self.assertEqual(len(cache), 3)
+        cache.solve(unif, {Equation(g(x), g(constants[0]))})
+        self.assertEqual(cache.hits, 0)
+        cache.solve(unif, {Equation(g(x), g(constants[4]))})
+        self.assertEqual(cache.hits, 1)
+
+    def test_persistence(self):
+        f = Function("f", 1)
+        x = Variable("x_1")
+        y = Variable("y_3")
+        IV = Constant("r")
+        constraints = {x: [IV]}
+        problem = Equations([Equation(xor(f(x), IV), xor(f(IV), x))])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "unifiers.bin")
+            cache = UnificationCache(path=path)
+            expected = cache.solve(p_unif, problem, constraints)
+            cache.save()
+            loaded = UnificationCache(path=path)
+            self.assertEqual(len(loaded), 1)
+            renamed = Equations([Equation(xor(f(y), IV), xor(f(IV), y))])
+            unifiers = loaded.solve(p_unif, renamed, {y: [IV]})
+            self.assertEqual(loaded.hits, 1)
+            self.assertEqual(len(unifiers), len(expected))
+            for sigma, tau in zip(unifiers, expected):
+                self.assertEqual(str(sigma), str(tau).replace("x_1", "y_3"))
+
+if __name__ == "__main__":
+    unittest.main()
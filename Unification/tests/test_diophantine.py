@@ -0,0 +1,33 @@
+from symcollab.Unification.diophantine import hilbert_basis
+from itertools import product
+import unittest
+
+def minimal_solutions(system, bound):
+    """The minimal solutions with components up to bound, by enumeration."""
+    n = len(system[0])
+    solutions = [
+        v for v in product(range(bound + 1), repeat=n)
+        if any(v) and all(sum(c * x for c, x in zip(row, v)) == 0 for row in system)
+    ]
+    return sorted(
+        v for v in solutions
+        if not any(w != v and all(a <= b for a, b in zip(w, v)) for w in solutions)
+    )
+
+class TestDiophantine(unittest.TestCase):
+    def test_hilbert_basis(self):
+        systems = [
+            [[1, 1, 1, -1, -1, -1]],
+            [[2, 1, -3]],
+            [[1, 1, 1, -2]],
+            [[3, 1, -1, -2]],
+            [[1, 0, -1], [0, 1, -1]],
+            [[1, 2, -1, 0], [0, 1, -1, -1]],
+        ]
+        for system in systems:
+            self.assertEqual(sorted(hilbert_basis(system)), minimal_solutions(system, 4))
+        # Variables with no coefficient are free
+        self.assertEqual(hilbert_basis([[1, -1, 0]]), [(0, 0, 1), (1, 1, 0)])
+
+if __name__ == "__main__":
+    unittest.main()
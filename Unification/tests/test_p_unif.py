@@ -0,0 +1,36 @@
+from symcollab.algebra import *
+from symcollab.Unification.constrained.p_unif import get_open_positions, subterm_at_position
+from symcollab.xor import xor
+import unittest
+
+class TestPUnif(unittest.TestCase):
+    def test_open_positions(self):
+        f = Function("f", 1)
+        h = Function("h", 2)
+        x = Variable("x")
+        a = Constant("a")
+        b = Constant("b")
+        # Positions under computable symbols are open, counted from 1
+        t = h(f(h(x, a)), xor(a, b))
+        self.assertEqual(
+            get_open_positions(t),
+            [(), (1,), (2,), (2, 1), (2, 2)]
+        )
+        # Nothing below a symbol the attacker can't compute is open
+        self.assertEqual(get_open_positions(f(h(x, a))), [()])
+        self.assertEqual(get_open_positions(x), [()])
+
+    def test_subterm_at_position(self):
+        f = Function("f", 1)
+        h = Function("h", 2)
+        x = Variable("x")
+        a = Constant("a")
+        t = h(f(h(x, a)), a)
+        self.assertEqual(subterm_at_position(t, Position()), t)
+        self.assertEqual(subterm_at_position(t, (1,)), f(h(x, a)))
+        self.assertEqual(subterm_at_position(t, Position((1, 1, 2))), a)
+        for pos in get_open_positions(t):
+            self.assertIsNotNone(subterm_at_position(t, pos))
+
+if __name__ == "__main__":
+    unittest.main()
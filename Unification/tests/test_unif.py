@@ -0,0 +1,50 @@
+from symcollab.algebra import *
+from symcollab.Unification.unif import unif
+from symcollab.Unification.registry import Unification_Algorithms
+import unittest
+
+class TestUnif(unittest.TestCase):
+    def test_unifiers(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        sigma = unif({Equation(f(x, g(y)), f(g(z), x))})
+        self.assertEqual(sigma.subs, {(x, g(z)), (y, z)})
+        sigma = unif({Equation(f(x, y), f(y, z)), Equation(z, a)})
+        self.assertEqual(sigma.subs, {(x, a), (y, a), (z, a)})
+        self.assertEqual(unif({Equation(x, x)}).subs, set())
+        self.assertIs(Unification_Algorithms.find(''), unif)
+
+    def test_failures(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        self.assertFalse(unif({Equation(f(x, a), f(y, b))}))
+        self.assertFalse(unif({Equation(g(x), f(x, x))}))
+        # Cycles, directly and through other variables
+        self.assertFalse(unif({Equation(x, g(x))}))
+        self.assertFalse(unif({Equation(x, g(y)), Equation(y, f(a, x))}))
+
+    def test_deep(self):
+        g = Function("g", 1)
+        f = Function("f", 2)
+        n = 3000
+        xs = [Variable(f"x{i}") for i in range(n + 1)]
+        a = Constant("a")
+        equations = {Equation(xs[i], g(xs[i - 1])) for i in range(1, n + 1)}
+        equations.add(Equation(xs[0], a))
+        sigma = unif(equations)
+        self.assertEqual((xs[n] * sigma).depth, n)
+        # Identifying both ends of the chain closes a cycle
+        equations.remove(Equation(xs[0], a))
+        equations.add(Equation(xs[0], f(xs[n], a)))
+        self.assertFalse(unif(equations))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,3 +7,4 @@ from .callable_registry import *
 from .term import *
 from .substitute import *
 from .parser import *
+from .index import *
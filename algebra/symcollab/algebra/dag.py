@@ -4,11 +4,7 @@ representation of a term. This is mainly included
 for applications that require better performance
 characteristics than the recursive definition.
 """
-from typing import Dict, Tuple, Union
-from copy import deepcopy
-from networkx.drawing.nx_pydot import graphviz_layout
-import matplotlib.pyplot as plt # type: ignore
-import networkx as nx # type: ignore
+from typing import Dict, Iterator, List, Tuple, Union
 from .term import Term, FuncTerm, Function, Variable
 
 __all__ = ['TermDAG', 'termDAGSubstitute']
@@ -29,51 +25,92 @@ class TermDAG:
     is the outermost function/variable/constant. For each argument
     that a function has, it will point an array from that function
     to the argument.
+
+    Each subterm is stored once as a node, numbered in the order it
+    is first reached from the top. The children and parents of every
+    node are kept as lists of node indices, so that parent and leaf
+    queries don't require searching the graph. The networkx graph
+    used for plotting and the traversals is only built on demand.
     """
     def __init__(self, term: Term):
-        # Our DAG is an ordered graph because the edges are directional
-        # It is considered a MultiGraph due to our structured sharing.
-        # It is a digraph since the edges are directed
-        # One of the consequences is that finding the parent of a node is ambiguous
-        self.dag = nx.OrderedMultiDiGraph()
         self.term = term
+        self.nodes: List[Term] = [term]
+        self.index: Dict[Term, int] = {term: 0}
+        # Indices of the distinct parents of every node
+        self.parent_indices: List[List[int]] = [[]]
         self.edge_labels: Dict[Tuple[Term, Term], str] = {}
         self.node_labels: Dict[Term, Union[Variable, Function]] = {}
-        self.dag.add_node(term)
-        # If the term we're starting out from is just a variable or constant,
-        # then we just make a single node graph.
-        # Otherwise, we'll need to start recursing down the arguments and add edges to each one...
-        if isinstance(term, FuncTerm):
-            self.node_labels[term] = term.function
-            # Go through each of the arguments and add it to the graph
-            for index, t in enumerate(term.arguments):
-                self._appendTermDAG(term, t, edge_label=str(index))
-        else:
-            self.node_labels[term] = term
+        self._graph = None
 
-    def _appendTermDAG(self, last_term: Term, term: Term, edge_label=""):
-        # Annotate edges with argument number
-        # If there is already a label, then append the new label
-        if (last_term, term) in self.edge_labels and \
-            self.edge_labels[(last_term, term)] != edge_label:
+        # Visit the arguments of each new node from left to right,
+        # with an explicit stack so deep terms can be represented.
+        stack: List[Tuple[int, Iterator[Tuple[int, Term]]]] = [(0, self._expand(0))]
+        while stack:
+            node, arguments = stack[-1]
+            argument = next(arguments, None)
+            if argument is None:
+                stack.pop()
+                continue
+            position, t = argument
+            child = self.index.get(t)
+            if child is None:
+                child = self._add_node(t)
+                stack.append((child, self._expand(child)))
+            self._add_edge(node, child, str(position))
 
-            self.edge_labels[(last_term, term)] = \
-                self.edge_labels[(last_term, term)] + ", " + edge_label
+        # Argument indices of every node, repeated arguments included
+        self.children: List[Tuple[int, ...]] = [
+            tuple(self.index[arg] for arg in t.arguments) if isinstance(t, FuncTerm) else ()
+            for t in self.nodes
+        ]
+        self._leaves: List[int] = [i for i, c in enumerate(self.children) if len(c) == 0]
 
-        else:
-            self.edge_labels[(last_term, term)] = edge_label
+    def _add_node(self, t: Term) -> int:
+        i = len(self.nodes)
+        self.nodes.append(t)
+        self.index[t] = i
+        self.parent_indices.append([])
+        return i
 
-        self.dag.add_edge(last_term, term)
-        if isinstance(term, FuncTerm):
-            # Go through each of the function arguments and add a directed edge to it
-            for index, t in enumerate(term.arguments):
-                self._appendTermDAG(term, t, edge_label=str(index))
-            self.node_labels[term] = term.function
+    def _expand(self, node: int) -> Iterator[Tuple[int, Term]]:
+        """Labels the node and returns an iterator over its arguments."""
+        t = self.nodes[node]
+        if isinstance(t, FuncTerm):
+            self.node_labels[t] = t.function
+            return enumerate(t.arguments)
+        self.node_labels[t] = t
+        return iter(())
+
+    def _add_edge(self, parent: int, child: int, edge_label: str):
+        parent_term = self.nodes[parent]
+        child_term = self.nodes[child]
+        # Annotate edges with argument number
+        # If there is already a label, then append the new label
+        label = self.edge_labels.get((parent_term, child_term))
+        if label is not None and label != edge_label:
+            self.edge_labels[(parent_term, child_term)] = label + ", " + edge_label
         else:
-            self.node_labels[term] = term
+            self.edge_labels[(parent_term, child_term)] = edge_label
+        if parent not in self.parent_indices[child]:
+            self.parent_indices[child].append(parent)
+
+    @property
+    def dag(self):
+        """The networkx multigraph of the TermDAG."""
+        if self._graph is None:
+            import networkx as nx # type: ignore
+            self._graph = nx.MultiDiGraph()
+            self._graph.add_nodes_from(self.nodes)
+            for parent, children in enumerate(self.children):
+                for child in children:
+                    self._graph.add_edge(self.nodes[parent], self.nodes[child])
+        return self._graph
 
     def show(self):
         """Plot the directed acyclic graph of the TermDAG"""
+        import matplotlib.pyplot as plt # type: ignore
+        import networkx as nx # type: ignore
+        from networkx.drawing.nx_pydot import graphviz_layout
         fig = plt.figure()
         # To see the layout rooted appropriately, you need to have
         # graphviz installed on your system
@@ -86,7 +123,7 @@ class TermDAG:
                 font_weight='bold',
                 node_size=600,
                 font_size=30,
-                node_color=['#a8c74d'] + ['#1f78b4' for i in range(len(self.dag.nodes) - 1)]
+                node_color=['#a8c74d'] + ['#1f78b4' for i in range(len(self.nodes) - 1)]
         )
         # Add both the node labels and edge labels
         nx.draw_networkx_labels(self.dag, pos, labels=self.node_labels)
@@ -96,23 +133,27 @@ class TermDAG:
 
     def df_edge_traversal(self):
         """Depth-first traversal of the edges"""
-        return nx.dfs_edges(self.dag, source=list(self.dag.nodes)[0])
+        import networkx as nx # type: ignore
+        return nx.dfs_edges(self.dag, source=self.term)
     def df_node_traversal(self):
         """Depth-first traversal of the nodes"""
-        return nx.dfs_tree(self.dag, source=list(self.dag.nodes)[0])
+        import networkx as nx # type: ignore
+        return nx.dfs_tree(self.dag, source=self.term)
     def bs_edge_traversal(self):
         """Breadth-first traversal of the edges"""
-        return nx.bfs_edges(self.dag, source=list(self.dag.nodes)[0])
+        import networkx as nx # type: ignore
+        return nx.bfs_edges(self.dag, source=self.term)
     def bs_node_traversal(self):
         """Breadth-frist traversal of the nodes"""
-        return nx.bfs_tree(self.dag, source=list(self.dag.nodes)[0])
+        import networkx as nx # type: ignore
+        return nx.bfs_tree(self.dag, source=self.term)
 
     def parents(self, term):
         """Parents of a term in the TermDAG"""
-        if term in self.dag:
-            return self.dag.predecessors(term)
-        else:
+        node = self.index.get(term)
+        if node is None:
             return []
+        return [self.nodes[i] for i in self.parent_indices[node]]
     def leaves(self):
         """Leaves of a TermDAG"""
-        return filter(lambda x: self.dag.out_degree(x) == 0, self.dag.nodes())
+        return [self.nodes[i] for i in self._leaves]
@@ -0,0 +1,256 @@
+"""
+This module provides a flat encoding of terms that
+is backed by NumPy arrays.
+
+A batch of terms is stored as one pre-order sequence
+of symbol ids, together with the size of the subterm
+rooted at every node and the offset of every term.
+Bulk operations such as equality, hashing, subterm
+search and variable collection then become scans over
+the arrays instead of walks over the term objects.
+"""
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import numpy as np
+from .term import Function, Term, Variable, preorder
+
+__all__ = ['SymbolTable', 'TermArray']
+
+# Multiplier of the polynomial hash over symbol ids
+_HASH_BASE = np.uint64(1099511628211)
+
+class SymbolTable:
+    """
+    Assigns an integer id to every symbol of a term.
+
+    Variables and constants are symbols on their own, while the
+    other terms are identified by their class and function.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.algebra.encoding import SymbolTable
+    >>> f = Function("f", 1)
+    >>> x = Variable("x")
+    >>> table = SymbolTable()
+    >>> table.symbol_id(f(x)), table.symbol_id(x), table.symbol_id(f(f(x)))
+    (0, 1, 0)
+    """
+    def __init__(self):
+        self._ids: Dict[Any, int] = dict()
+        # Either the leaf itself or the (class, function) of the symbol
+        self._entries: List[Union[Term, Tuple[type, Function]]] = list()
+        self._arities: List[int] = list()
+
+    @staticmethod
+    def _key(term: Term):
+        if isinstance(term, Variable) or len(term.arguments) == 0:
+            return term
+        return (type(term), term.function)
+
+    def symbol_id(self, term: Term) -> int:
+        """Returns the id of the root symbol of a term, adding it if new."""
+        key = SymbolTable._key(term)
+        sid = self._ids.get(key)
+        if sid is None:
+            sid = len(self._entries)
+            self._ids[key] = sid
+            self._entries.append(key)
+            self._arities.append(0 if isinstance(term, Variable) else len(term.arguments))
+        return sid
+
+    def lookup(self, term: Term) -> Optional[int]:
+        """Returns the id of the root symbol of a term if it is known."""
+        return self._ids.get(SymbolTable._key(term))
+
+    def encode(self, term: Term) -> Optional[np.ndarray]:
+        """
+        Returns the pre-order symbol ids of a term, or None
+        if the term contains a symbol that isn't known.
+        """
+        ids = array('i')
+        for t in preorder(term):
+            sid = self._ids.get(SymbolTable._key(t))
+            if sid is None:
+                return None
+            ids.append(sid)
+        return np.frombuffer(ids, dtype=np.int32)
+
+    def arities(self) -> np.ndarray:
+        """The arity of every symbol, indexed by id."""
+        return np.array(self._arities, dtype=np.int32)
+
+    def variable_mask(self) -> np.ndarray:
+        """Whether each symbol is a variable, indexed by id."""
+        return np.array([isinstance(e, Variable) for e in self._entries], dtype=bool)
+
+    def __getitem__(self, sid: int) -> Union[Term, Tuple[type, Function]]:
+        return self._entries[sid]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TermArray:
+    """
+    A batch of terms in a flat array encoding.
+
+    Parameters
+    ----------
+    symbols : np.ndarray
+        The symbol ids of every term in pre-order, one term after the other.
+    sizes : np.ndarray
+        The size of the subterm rooted at each node.
+    offsets : np.ndarray
+        Where each term starts in symbols, followed by the total length.
+    table : SymbolTable
+        The symbol table that the ids refer to.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.algebra.encoding import TermArray
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> terms = TermArray.from_terms([f(x, a), f(f(x, a), x), a])
+    >>> terms.count_occurence(f(x, a))
+    array([1, 1, 0])
+    >>> terms[1]
+    f(f(x, a), x)
+
+    Notes
+    -----
+    The arrays are plain contiguous buffers, so they can be handed
+    to other processes (for example through shared memory) along
+    with the symbol table without converting the terms back.
+    """
+    def __init__(self, symbols: np.ndarray, sizes: np.ndarray,
+                 offsets: np.ndarray, table: SymbolTable):
+        self.symbols = symbols
+        self.sizes = sizes
+        self.offsets = offsets
+        self.table = table
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[Term], table: Optional[SymbolTable] = None) -> 'TermArray':
+        """Encodes the terms, adding their symbols to the table."""
+        if table is None:
+            table = SymbolTable()
+        symbols = array('i')
+        sizes = array('i')
+        offsets = array('q', [0])
+        for term in terms:
+            for t in preorder(term):
+                symbols.append(table.symbol_id(t))
+                sizes.append(t.size)
+            offsets.append(len(symbols))
+        return cls(
+            np.frombuffer(symbols, dtype=np.int32),
+            np.frombuffer(sizes, dtype=np.int32),
+            np.frombuffer(offsets, dtype=np.int64),
+            table
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Term:
+        """Decodes the i-th term."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("TermArray index out of range")
+        arities = self.table._arities
+        stack: List[Term] = list()
+        # Reading the pre-order backwards leaves the arguments
+        # of a node on top of the stack, first argument last.
+        for sid in reversed(self.symbols[self.offsets[i]:self.offsets[i + 1]].tolist()):
+            entry = self.table[sid]
+            arity = arities[sid]
+            if arity == 0:
+                stack.append(entry)
+                continue
+            arguments = stack[:-arity - 1:-1]
+            del stack[-arity:]
+            term_class, function = entry
+            stack.append(term_class.intern(function, arguments))
+        return stack[0]
+
+    def __iter__(self) -> Iterator[Term]:
+        return (self[i] for i in range(len(self)))
+
+    def to_terms(self) -> List[Term]:
+        """Decodes every term."""
+        return list(self)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """The size of every term."""
+        return np.diff(self.offsets)
+
+    def _term_of(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the index of the term each node position belongs to."""
+        return np.searchsorted(self.offsets, positions, side='right') - 1
+
+    def hashes(self) -> np.ndarray:
+        """
+        Returns a structural hash of every term. Equal terms
+        encoded with the same table have the same hash.
+        """
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.uint64)
+        lengths = self.lengths
+        starts = self.offsets[:-1]
+        positions = np.arange(len(self.symbols)) - np.repeat(starts, lengths)
+        powers = np.ones(int(lengths.max()), dtype=np.uint64)
+        powers[1:] = _HASH_BASE
+        powers = np.multiply.accumulate(powers)
+        weighted = (self.symbols.astype(np.uint64) + np.uint64(1)) * powers[positions]
+        return np.add.reduceat(weighted, starts) ^ lengths.astype(np.uint64)
+
+    def _windows(self, starts: np.ndarray, length: int) -> np.ndarray:
+        """The symbol ids of the given length from each start position."""
+        return self.symbols[starts[:, None] + np.arange(length)]
+
+    def equals(self, term: Term) -> np.ndarray:
+        """Returns whether each term is equal to the given term."""
+        result = np.zeros(len(self), dtype=bool)
+        encoded = self.table.encode(term)
+        if encoded is None:
+            return result
+        candidates = np.nonzero(self.lengths == len(encoded))[0]
+        if len(candidates) > 0:
+            matches = (self._windows(self.offsets[candidates], len(encoded)) == encoded).all(axis=1)
+            result[candidates[matches]] = True
+        return result
+
+    def _occurrences(self, subterm: Term) -> np.ndarray:
+        """The node positions at which the subterm occurs."""
+        encoded = self.table.encode(subterm)
+        if encoded is None:
+            return np.zeros(0, dtype=np.int64)
+        positions = np.nonzero((self.symbols == encoded[0]) & (self.sizes == len(encoded)))[0]
+        if len(encoded) > 1 and len(positions) > 0:
+            matches = (self._windows(positions, len(encoded)) == encoded).all(axis=1)
+            positions = positions[matches]
+        return positions
+
+    def count_occurence(self, subterm: Term) -> np.ndarray:
+        """
+        Counts the number of occurences of the
+        subterm in each of the terms.
+        """
+        return np.bincount(self._term_of(self._occurrences(subterm)), minlength=len(self))
+
+    def occurs(self, subterm: Term) -> np.ndarray:
+        """Returns whether the subterm occurs within each of the terms."""
+        return self.count_occurence(subterm) > 0
+
+    def variables(self) -> List[Set[Variable]]:
+        """Returns the set of variables inside each of the terms."""
+        result: List[Set[Variable]] = [set() for _ in range(len(self))]
+        positions = np.nonzero(self.table.variable_mask()[self.symbols])[0]
+        for i, sid in zip(self._term_of(positions).tolist(), self.symbols[positions].tolist()):
+            result[i].add(self.table[sid])
+        return result
@@ -1,7 +1,7 @@
 """
 	A forest data structure that contains trees of terms 
-	spawned from a list of equations. Recursively 
-	builds trees from each unique term in the list
+	spawned from a list of equations. Builds a tree
+	breadth-first from each unique term in the list
 	of equations, without repeating any terms.
 
 	Parameters
@@ -14,13 +14,13 @@
 	Notes
 	-----
 	In some cases, a term could be expanded forever, 
-	thereforea max_height is required in order to 
+	therefore a max_height is required in order to 
 	guarantee termination.
 
 	Examples
 	--------
 	>>> from symcollab.algebra import *
-	>>> from symcollab.algebra import Term_Forest
+	>>> from symcollab.algebra.forest import Term_Forest
 	>>> f = Function("f", 1)
 	>>> g = Function("g", 1)
 	>>> x = Variable("x")
@@ -35,105 +35,172 @@
 	>>> forest = Term_Forest([eq1, eq2, eq3], 5)
 	>>> print(forest)
 	f(x)
-	|
-	+__y
-	   |
-	   +__g(z)
-	      |
-	      +__g(c)
+	└── y
+	    └── g(z)
+	        └── g(c)
+	height: 4
 	z
-	|
-	+__c
+	└── c
+	height: 2
+	<BLANKLINE>
 """
+from collections import deque
 from copy import deepcopy
 from functools import partial
-from typing import List
-from anytree import AnyNode, RenderTree
-from .term import Equation, Term, FuncTerm
+from typing import Callable, Dict, Iterator, List, Optional
+from .term import Equation, Term, FuncTerm, postorder
 
-__all__ = ['Term_Forest']
+__all__ = ['Term_Forest', 'Term_Node', 'expand_forest']
+
+class Term_Node:
+	"""
+	A node of a tree in a Term_Forest.
+
+	Nodes yielded by expand_forest only know their parent,
+	the children are filled in by the Term_Forest holding them.
+	"""
+	__slots__ = ('term', 'parent', 'children', 'depth')
+
+	def __init__(self, term: Term, parent: Optional['Term_Node'] = None):
+		self.term = term
+		self.parent = parent
+		self.children: List['Term_Node'] = list()
+		self.depth = 0 if parent is None else parent.depth + 1
+
+	@property
+	def is_root(self) -> bool:
+		return self.parent is None
+
+	def __repr__(self):
+		return "Term_Node(term=" + repr(self.term) + ")"
+
+# Maps each term of the seed to the terms it is equal to
+def _equal_terms(seed: List[Equation]) -> Dict[Term, List[Term]]:
+	equal: Dict[Term, List[Term]] = dict()
+	for eq in seed:
+		equal.setdefault(eq.left_side, list()).append(eq.right_side)
+		if eq.right_side != eq.left_side:
+			equal.setdefault(eq.right_side, list()).append(eq.left_side)
+	return equal
+
+def _rewriter(equal: Dict[Term, List[Term]]) -> Callable[[Term], List[Term]]:
+	"""
+	Returns a function generating every way to rewrite a term with
+	one equation. The rewrites of each subterm are cached, so they
+	are shared between every term of the forest containing it.
+	"""
+	cache: Dict[Term, List[Term]] = dict()
+
+	def rewrites(term: Term) -> List[Term]:
+		if term in cache:
+			return cache[term]
+		for t in postorder(term, lambda s: s not in cache):
+			if t in cache:
+				continue
+			children = list(equal.get(t, ()))
+			if isinstance(t, FuncTerm):
+				args = t.arguments
+				for arg in dict.fromkeys(args):
+					for _o in cache[arg]:
+						# replace the argument with the term it is equal to
+						new_args = [_o if a == arg else a for a in args]
+						children.append(type(t).intern(t.function, new_args))
+			cache[t] = children
+		return cache[term]
+
+	return rewrites
+
+def expand_forest(seed: List[Equation], max_height: int) -> Iterator[Term_Node]:
+	"""
+	Lazily grows the trees of a forest breadth-first.
+
+	Every unique term of the seed that isn't part of an
+	earlier tree is the root of a new tree. Each node is
+	yielded once it is created, so the forest can be
+	explored without materializing all of it.
+
+	Parameters
+	----------
+	seed : List[Equation]
+		The list of equations to build a forest out of
+	max_height : int
+		The maximum height of each tree in the forest
+
+	Examples
+	--------
+	>>> from symcollab.algebra import *
+	>>> from symcollab.algebra.forest import expand_forest
+	>>> f = Function("f", 1)
+	>>> x = Variable("x")
+	>>> c = Constant("c")
+	>>> nodes = expand_forest([Equation(x, c), Equation(f(c), c)], 4)
+	>>> [(node.term, node.depth) for node in nodes]
+	[(x, 0), (c, 1), (f(c), 2), (f(x), 3), (f(f(c)), 3)]
+	"""
+	equal = _equal_terms(seed)
+	rewrites = _rewriter(equal)
+	seen = set()
+	for term in equal:
+		if term in seen:
+			continue
+		seen.add(term)
+		root = Term_Node(term)
+		yield root
+		queue = deque([root])
+		while queue:
+			node = queue.popleft()
+			if node.depth + 1 >= max_height:
+				continue
+			for t in rewrites(node.term):
+				if t not in seen:
+					seen.add(t)
+					child = Term_Node(t, node)
+					yield child
+					queue.append(child)
+
+# Draws a tree one line per node, in the same style as anytree
+def _render(root: Term_Node, label: Callable[[Term_Node], str]) -> str:
+	lines = list()
+	stack = [(root, "", "")]
+	while stack:
+		node, pre, indent = stack.pop()
+		lines.append(pre + label(node))
+		last = len(node.children) - 1
+		for i in range(last, -1, -1):
+			if i == last:
+				stack.append((node.children[i], indent + "└── ", indent + "    "))
+			else:
+				stack.append((node.children[i], indent + "├── ", indent + "│   "))
+	return "\n".join(lines) + "\n"
 
 class Term_Forest:
 
 	def __init__(self, seed: List[Equation], max_height: int):
 		self.seed = seed
 		self.max_height = max_height
-		self.__history = list()
+		# Maps every term in the forest to its node
+		self.__history: Dict[Term, Term_Node] = dict()
 		self.forest = list()
-		self.__init_terms()
-		self.__tree_heights = [0] * len(self.terms)
+		self.terms = list(_equal_terms(seed))
+		self.__tree_heights: Dict[Term, int] = dict()
 		self.__build_forest()
-	
-	# Gets unique terms from the list of equations
-	def __init_terms(self):
-		self.terms = list()
-		for eq in self.seed:
-			if eq.left_side not in self.terms:
-				self.terms.append(eq.left_side)
-			if eq.right_side not in self.terms:
-				self.terms.append(eq.right_side)
 
-	# For every unique term, recursively build a tree
+	# Grow every tree breadth-first, without repeating any terms
 	def __build_forest(self):
-		self.__index = 0
-		for term in self.terms:
-			if term not in self.__history:
-				self.__history.append(term)
-				node = AnyNode(term=term)
+		for node in expand_forest(self.seed, self.max_height):
+			self.__history[node.term] = node
+			if node.is_root:
+				root = node
 				self.forest.append(node)
-				self.__build_tree(node)
-			self.__index += 1
-
-	# Recursively generate possible list of terms to add
-	# Will not add any terms that already exist in the forest
-	def __build_tree(self, node):
-		nt = node.term
-		children = self.__generate_terms(nt)
-		for t in children:
-			if t not in self.__history:
-				if self.__tree_heights[self.__index] < self.max_height:
-					self.__history.append(t)
-					n = AnyNode(term=t, parent=node)
-					if n.depth+1 > self.__tree_heights[self.__index]:
-						self.__tree_heights[self.__index] = n.depth + 1
-					self.__build_tree(n)
-				else:
-					self.__tree_heights[self.__index] = self.max_height
-
-	# Recursively generate every possible way to rewrite a term
-	def __generate_terms(self, nt: Term) -> List[Term]:
-		children = list()
-		for eq in self.seed:
-			left = eq.left_side
-			right = eq.right_side
-			other = None
-			if nt == left:
-				other = right
-			elif nt == right:
-				other = left
-			if other != None:
-				children.append(other)
-		if isinstance(nt, FuncTerm):
-			f = nt.function
-			args = nt.arguments
-			for t in args:
-				t_children = self.__generate_terms(t)
-				for _o in t_children:
-					# replace the argument t with the term it is equal to
-					new_args = [_o if i==t else i for i in args]
-					rw = FuncTerm(f, new_args)
-					children.append(rw)
-
-		return children
+			else:
+				node.parent.children.append(node)
+			self.__tree_heights[root.term] = node.depth + 1
 
 	# display each node in each tree in the forest
 	def __repr__(self):
 		forest_str = ""
-		index = 0
 		for n in self.forest:
-			index += 1
-			for pre, _, node in RenderTree(n):
-				forest_str += ("%s%s" % (pre, node)) + "\n"
+			forest_str += _render(n, repr)
 			forest_str += "height: " + str(self.get_height(n)) + "\n"
 
 		return forest_str
@@ -141,11 +208,8 @@ class Term_Forest:
 	# display each term in each tree in the forest
 	def __str__(self):
 		forest_str = ""
-		index = 0
 		for n in self.forest:
-			index += 1
-			for pre, _, node in RenderTree(n):
-				forest_str += ("%s%s" % (pre, node.term)) + "\n"
+			forest_str += _render(n, lambda node: str(node.term))
 			forest_str += "height: " + str(self.get_height(n)) + "\n"
 
 		return forest_str
@@ -196,12 +260,8 @@ class Term_Forest:
 		return hash(_str)
 
 	# given one of the root terms in the forest and return the height of that tree
-	def get_height(self, root: AnyNode) -> int:
-		index = 0
-		for t in self.terms:
-			if root.term == t:
-				return self.__tree_heights[index]
-			index += 1
+	def get_height(self, root: Term_Node) -> int:
+		return self.__tree_heights.get(root.term)
 
 	# returns 0 if both trees contain the same nodes
 	# returns -1 if the length of root1 is less than the length of root2
@@ -216,10 +276,13 @@ class Term_Forest:
 
 	# return a list of all of the nodes in a given tree
 	@staticmethod
-	def get_tree(root: AnyNode) -> List[Term]:
+	def get_tree(root: Term_Node) -> List[Term]:
 		tree = list()
-		for pre, _, node in RenderTree(root):
+		stack = [root]
+		while stack:
+			node = stack.pop()
 			tree.append(node.term)
+			stack.extend(reversed(node.children))
 		return tree
 
 	# Print out a description of the attributes of the forest 
@@ -232,5 +295,5 @@ class Term_Forest:
 			_terms.append(str(node.term))
 		description += str(_terms) + "\n\n"
 		description += "The forest contains " + str(len(self.__history)) + " unique terms:\n"
-		description += str(self.__history) + "\n"
+		description += str(list(self.__history)) + "\n"
 		return description
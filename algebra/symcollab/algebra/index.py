@@ -0,0 +1,194 @@
+"""
+This module provides a discrimination tree, an index over
+a collection of terms that retrieves the terms which may be
+generalizations, instances or unifiable with a query term
+without comparing the query against every stored term.
+
+Terms are stored along the path of their pre-order symbols,
+where every variable is collapsed into a single wildcard.
+Retrieval is therefore imperfect: the candidates returned
+are a superset of the actual answers, since repeated
+variables and sorts are not considered. Callers are
+expected to confirm each candidate with matching or
+unification.
+"""
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from .term import FuncTerm, Term, Variable, preorder
+
+__all__ = ['DiscriminationTree']
+
+# Label of the edges taken by variables
+_WILDCARD = ("*", 0)
+
+def _label(term: Term) -> Tuple[Any, int]:
+    """The edge label of the root symbol of a term, along with its arity."""
+    if isinstance(term, Variable):
+        return _WILDCARD
+    if isinstance(term, FuncTerm):
+        return (term.function, len(term.arguments))
+    # Terms of other structures are only ever compared as a whole
+    return (term, 0)
+
+class _Node:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children: Dict[Tuple[Any, int], '_Node'] = dict()
+        # Terms ending at this node, each with its values in insertion order
+        self.entries: Dict[Term, Dict[Hashable, None]] = dict()
+
+
+class DiscriminationTree:
+    """
+    An index of terms supporting retrieval of candidate
+    generalizations, instances and unifiable terms.
+
+    Every stored term carries one or more values, which are
+    what the retrieval methods return. By default the value
+    of a term is the term itself.
+
+    Parameters
+    ----------
+    terms : Iterable[Term], optional
+        Terms to insert, each with itself as the value.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> index = DiscriminationTree([f(x, a), f(a, y), f(b, b)])
+    >>> sorted(index.generalizations(f(a, a)), key=str)
+    [f(a, y), f(x, a)]
+    >>> list(index.instances(f(x, b)))
+    [f(b, b)]
+    >>> list(index.unifiable(f(x, b)))
+    [f(a, y), f(b, b)]
+    """
+    def __init__(self, terms: Optional[Iterable[Term]] = None):
+        self._root = _Node()
+        self._size = 0
+        if terms is not None:
+            for term in terms:
+                self.insert(term)
+
+    def insert(self, term: Term, value: Optional[Hashable] = None):
+        """Stores a value under a term."""
+        value = term if value is None else value
+        node = self._root
+        for t in preorder(term):
+            node = node.children.setdefault(_label(t), _Node())
+        values = node.entries.setdefault(term, dict())
+        if value not in values:
+            values[value] = None
+            self._size += 1
+
+    def delete(self, term: Term, value: Optional[Hashable] = None):
+        """
+        Removes a value stored under a term.
+        Raises a KeyError if it isn't in the index.
+        """
+        value = term if value is None else value
+        path: List[Tuple[_Node, Tuple[Any, int]]] = list()
+        node = self._root
+        for t in preorder(term):
+            label = _label(t)
+            path.append((node, label))
+            node = node.children.get(label)
+            if node is None:
+                raise KeyError(term)
+        values = node.entries.get(term)
+        if values is None or value not in values:
+            raise KeyError(term)
+        del values[value]
+        self._size -= 1
+        if len(values) == 0:
+            del node.entries[term]
+        # Prune the nodes that no longer lead anywhere
+        for parent, label in reversed(path):
+            if len(node.children) > 0 or len(node.entries) > 0:
+                break
+            del parent.children[label]
+            node = parent
+
+    def __contains__(self, term: Term) -> bool:
+        node = self._root
+        for t in preorder(term):
+            node = node.children.get(_label(t))
+            if node is None:
+                return False
+        return term in node.entries
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterates over every value in the index."""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for values in node.entries.values():
+                yield from values
+            stack.extend(reversed(list(node.children.values())))
+
+    @staticmethod
+    def _skip(node: _Node) -> Iterator[_Node]:
+        """The nodes reached from a node by skipping over one whole term."""
+        stack = [(node, 1)]
+        while stack:
+            n, pending = stack.pop()
+            if pending == 0:
+                yield n
+                continue
+            for label, child in n.children.items():
+                stack.append((child, pending - 1 + label[1]))
+
+    def _retrieve(self, term: Term, wildcard_in_index: bool,
+                  wildcard_in_query: bool) -> Iterator[Hashable]:
+        """
+        Walks the index along the query term. A wildcard in the index
+        can stand for a whole query subterm and a variable in the query
+        can stand for a whole indexed subterm, when enabled.
+        """
+        # The query subterms left to visit are kept as a linked list
+        # of (subterm, rest) pairs, so that branches can share them.
+        stack = [(self._root, (term, None))]
+        while stack:
+            node, pending = stack.pop()
+            if pending is None:
+                for values in node.entries.values():
+                    yield from values
+                continue
+            t, rest = pending
+            label = _label(t)
+            if label is _WILDCARD and wildcard_in_query:
+                stack.extend((n, rest) for n in DiscriminationTree._skip(node))
+                continue
+            if wildcard_in_index and label is not _WILDCARD:
+                child = node.children.get(_WILDCARD)
+                if child is not None:
+                    stack.append((child, rest))
+            child = node.children.get(label)
+            if child is not None:
+                if isinstance(t, FuncTerm):
+                    for arg in reversed(t.arguments):
+                        rest = (arg, rest)
+                stack.append((child, rest))
+
+    def generalizations(self, term: Term) -> Iterator[Hashable]:
+        """
+        Returns the values of the stored terms that may match the
+        given term, that is, which the term may be an instance of.
+        """
+        return self._retrieve(term, True, False)
+
+    def instances(self, term: Term) -> Iterator[Hashable]:
+        """Returns the values of the stored terms that the given term may match."""
+        return self._retrieve(term, False, True)
+
+    def unifiable(self, term: Term) -> Iterator[Hashable]:
+        """Returns the values of the stored terms that may unify with the given term."""
+        return self._retrieve(term, True, True)
@@ -3,11 +3,16 @@ This module is responsible for creating
 terms out of strings, given a set of
 known terms.
 """
-from typing import Optional, Union, Set, List
-from .term import Variable, Constant, Function, Term
+from os import PathLike
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from .term import Variable, Constant, Equation, Function, Term
 
 __all__ = ['Parser']
 
+# Punctuation or a symbol, whitespace in between is skipped
+_TOKEN = re.compile(r"[(),=]|[^\s(),=]+")
+
 class Parser:
     """
     A string parser library.
@@ -31,29 +36,34 @@ class Parser:
         self.variables: Set[Variable] = set()
         self.constants: Set[Constant] = set()
         self.functions: Set[Function] = set()
+        # Maps each symbol to its variable, constant or function
+        self._signature: Dict[str, Union[Variable, Constant, Function]] = dict()
 
     def add(self, term: Union[Variable, Constant, Function]):
         """Adds a term to the parser."""
         if isinstance(term, Variable):
-            if self._find_constant(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a constant in the Parser")
-            if self._find_function(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a function in the Parser")
+            self._check_symbol(term.symbol, Variable)
             self.variables.add(term)
         elif isinstance(term, Constant):
-            if self._find_variable(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a variable in the Parser")
-            if self._find_function(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a function in the Parser")
+            self._check_symbol(term.symbol, Constant)
             self.constants.add(term)
         elif isinstance(term, Function):
-            if self._find_constant(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a constant in the Parser")
-            if self._find_variable(term.symbol) is not None:
-                raise ValueError("Symbol is already defined as a variable in the Parser")
+            self._check_symbol(term.symbol, Function)
             self.functions.add(term)
         else:
             raise ValueError("Argument to Parser.add must be a Variable, Constant, or Function")
+        self._signature[term.symbol] = term
+
+    def _check_symbol(self, symbol: str, kind: type):
+        """Makes sure the symbol isn't already defined as another kind of term."""
+        existing = self._signature.get(symbol)
+        if existing is None or isinstance(existing, kind):
+            return
+        if isinstance(existing, Variable):
+            raise ValueError("Symbol is already defined as a variable in the Parser")
+        if isinstance(existing, Constant):
+            raise ValueError("Symbol is already defined as a constant in the Parser")
+        raise ValueError("Symbol is already defined as a function in the Parser")
 
     def remove(self, term: Union[Variable, Constant, Function]):
         """Remove a term from the parser."""
@@ -63,88 +73,133 @@ class Parser:
             self.constants -= {term}
         elif isinstance(term, Function):
             self.functions -= {term}
+        if self._signature.get(term.symbol) == term:
+            del self._signature[term.symbol]
 
     def parse(self, x: str) -> Union[Term, Function]:
         """Attempt to parse a string given the parser's existing signature."""
-        # First remove all whitespace since it's irrelevant
-        x = x.replace(' ', '')
-        start_i = x.find("(")
-        if start_i != -1:
-            end_i = self._find_last_char(")", x)
-            if end_i == -1:
-                raise ValueError("Parenthesis misbalance")
-
-            # We have a function!
-            function_name = x[:start_i]
-            function_handle = self._find_function(function_name)
-            if function_handle is None:
-                raise ValueError("Function " + function_name + " is not defined in the Parser")
-
-            argument_strings = self._parse_arguments(x[(start_i + 1):(end_i - 1)])
-
-            if len(argument_strings) != function_handle.arity:
-                raise ValueError("Arity Mismatch: Parsed String: " + str(len(argument_strings)) +
-                    ", Function " + function_handle.symbol + ": " + str(function_handle.arity))
-
-            args = [self.parse(arg_string) for arg_string in argument_strings]
-            return function_handle(*args)
-        else:
-            x_var = self._find_variable(x)
-            if x_var is not None:
-                return x_var
-            x_constant = self._find_constant(x)
-            if x_constant is not None:
-                return x_constant
-            x_function = self._find_function(x)
-            if x_function is not None:
-                return x_function
-            # If none of the above matched return an error
+        tokens = _TOKEN.findall(x)
+        term, i = self._parse_tokens(tokens, 0)
+        if i < len(tokens):
+            raise ValueError("Unexpected " + tokens[i] + " after the end of the term")
+        return term
+
+    def parse_equation(self, x: str) -> Equation:
+        """
+        Attempt to parse a string of the form l = r
+        given the parser's existing signature.
+
+        Examples
+        --------
+        >>> from symcollab.algebra import *
+        >>> f = Function("f", 1)
+        >>> x = Variable("x")
+        >>> a = Constant("a")
+        >>> p = Parser()
+        >>> p.add(f)
+        >>> p.add(x)
+        >>> p.add(a)
+        >>> p.parse_equation("f(x) = f(a)")
+        f(x) = f(a)
+        """
+        tokens = _TOKEN.findall(x)
+        left_side, i = self._parse_tokens(tokens, 0)
+        if i == len(tokens) or tokens[i] != "=":
+            raise ValueError("Expected = between the sides of the equation")
+        right_side, i = self._parse_tokens(tokens, i + 1)
+        if i < len(tokens):
+            raise ValueError("Unexpected " + tokens[i] + " after the end of the equation")
+        return Equation(left_side, right_side)
+
+    def parse_many(self, source: Union[str, PathLike, Iterable[str]]) -> Iterator[Union[Term, Function, Equation]]:
+        """
+        Parses newline-delimited terms or equations one at a time.
+
+        Parameters
+        ----------
+        source : Union[str, PathLike, Iterable[str]]
+            Either the path of a file or an iterable of lines such
+            as an open file. Blank lines and lines starting with #
+            are skipped.
+        """
+        if isinstance(source, (str, PathLike)):
+            with open(source, encoding="utf-8") as lines:
+                yield from self.parse_many(lines)
+            return
+        for line in source:
+            line = line.strip()
+            if len(line) == 0 or line.startswith("#"):
+                continue
+            if "=" in line:
+                yield self.parse_equation(line)
+            else:
+                yield self.parse(line)
+
+    def _parse_tokens(self, tokens: List[str], i: int) -> Tuple[Union[Term, Function], int]:
+        """
+        Parses a term starting at the i-th token and returns it with
+        the position of the token after it. Nested applications are
+        kept on an explicit stack so any depth of nesting can be parsed.
+        """
+        # Functions being applied along with their parsed arguments
+        stack: List[Tuple[Function, List[Term]]] = []
+        while True:
+            if i == len(tokens) or tokens[i] in "(),=":
+                raise ValueError("Expected a symbol" + (" before " + tokens[i] if i < len(tokens) else ""))
+            symbol = tokens[i]
+            i += 1
+            if i < len(tokens) and tokens[i] == "(":
+                function_handle = self._find_function(symbol)
+                if function_handle is None:
+                    raise ValueError("Function " + symbol + " is not defined in the Parser")
+                i += 1
+                if i < len(tokens) and tokens[i] == ")":
+                    term = self._apply(function_handle, [])
+                    i += 1
+                else:
+                    stack.append((function_handle, []))
+                    continue
+            else:
+                term = self._find_symbol(symbol)
+
+            # Close every application that ends after this argument
+            while len(stack) > 0:
+                function_handle, args = stack[-1]
+                args.append(term)
+                if i == len(tokens):
+                    raise ValueError("Parenthesis misbalance")
+                if tokens[i] == ",":
+                    i += 1
+                    break
+                if tokens[i] != ")":
+                    raise ValueError("Expected , or ) before " + tokens[i])
+                i += 1
+                stack.pop()
+                term = self._apply(function_handle, args)
+            else:
+                return term, i
+
+    @staticmethod
+    def _apply(function_handle: Function, args: List[Term]) -> Term:
+        if len(args) != function_handle.arity:
+            raise ValueError("Arity Mismatch: Parsed String: " + str(len(args)) +
+                ", Function " + function_handle.symbol + ": " + str(function_handle.arity))
+        return function_handle(*args)
+
+    def _find_symbol(self, x: str) -> Union[Variable, Constant, Function]:
+        x_symbol = self._signature.get(x)
+        if x_symbol is None:
             raise ValueError("Symbol " + x + " is undefined in the Parser")
-
-    def _find(self, x: str, container: List[Union[Function, Constant, Variable]]):
-        for c in container:
-            if x == c.symbol:
-                return c
-        return None
+        return x_symbol
 
     def _find_function(self, x: str) -> Optional[Function]:
-        return self._find(x, self.functions)
+        x_function = self._signature.get(x)
+        return x_function if isinstance(x_function, Function) else None
 
     def _find_constant(self, x: str) -> Optional[Constant]:
-        return self._find(x, self.constants)
+        x_constant = self._signature.get(x)
+        return x_constant if isinstance(x_constant, Constant) else None
 
     def _find_variable(self, x: str) -> Optional[Variable]:
-        return self._find(x, self.variables)
-
-    def _find_last_char(self, needle: str, haystack: str) -> int:
-        for i, c in enumerate(reversed(haystack)):
-            if c == needle:
-                return len(haystack) - i
-        return -1
-
-    # Splits the arguments up to a list of arguments
-    def _parse_arguments(self, arguments_string: str) -> List[str]:
-        args: List[str] = []
-        start_i = 0
-        num_parentheses = 0
-        for i, c in enumerate(arguments_string):
-            # If we saw an opening parenthesis,
-            # we need to ignore input until the end parenthesis is matched.
-            if num_parentheses > 0:
-                if c == ")":
-                    num_parentheses -= 1
-                elif c == "(":
-                    num_parentheses += 1
-            else:
-                if c == ",":
-                    args.append(arguments_string[start_i:i])
-                    start_i = i + 1
-                elif c == "(":
-                    num_parentheses += 1
-
-        if num_parentheses > 0:
-            raise ValueError("Parenthesis Mismatch")
-
-        # Add last argument
-        args.append(arguments_string[start_i:])
-        return args
+        x_variable = self._signature.get(x)
+        return x_variable if isinstance(x_variable, Variable) else None
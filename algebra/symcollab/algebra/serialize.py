@@ -0,0 +1,390 @@
+"""
+This module provides a compact binary format for storing
+terms, equations, substitutions and records containing them.
+
+A stream starts with a versioned header and is followed by
+records. Every symbol and every distinct subterm is defined
+once and later referred to by its index, so repeated subterms
+and symbols cost a few bytes each. Values can be appended to
+a stream one at a time and read back lazily.
+"""
+from dataclasses import fields, is_dataclass
+from io import BytesIO
+from os import PathLike, truncate
+import pickle
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+from .term import Equation, FuncTerm, Term, Variable, postorder
+from .substitute import SubstituteTerm
+
+__all__ = ['TermWriter', 'TermReader', 'dumps', 'loads']
+
+_MAGIC = b"SYMCOLLAB"
+_VERSION = 1
+
+# Top-level records
+_SYMBOL = b"S"
+_NODE = b"N"
+_CLASS = b"C"
+_VALUE = b"V"
+
+# Tags of encoded values
+_NONE = b"n"
+_TRUE = b"t"
+_FALSE = b"f"
+_INT = b"i"
+_FLOAT = b"r"
+_STR = b"s"
+_LIST = b"l"
+_TUPLE = b"p"
+_DICT = b"d"
+_TERM = b"T"
+_EQUATION = b"E"
+_SUBSTITUTION = b"U"
+_DATACLASS = b"D"
+_PICKLE = b"P"
+
+class _Truncated(ValueError):
+    """Raised when a stream ends in the middle of a record."""
+
+def _symbol_key(term: Term):
+    """Variables and constants are symbols on their own."""
+    if isinstance(term, Variable) or len(term.arguments) == 0:
+        return term
+    return (type(term), term.function)
+
+def _init_fields(cls: type):
+    """The fields of a dataclass that are passed to its constructor."""
+    return [field for field in fields(cls) if field.init]
+
+def _write_uint(buffer: bytearray, n: int):
+    """Writes a non-negative integer as a variable length quantity."""
+    while n >= 0x80:
+        buffer.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buffer.append(n)
+
+def _write_bytes(buffer: bytearray, b: bytes):
+    _write_uint(buffer, len(b))
+    buffer += b
+
+def _write_header(stream: BinaryIO):
+    header = bytearray(_MAGIC)
+    _write_uint(header, _VERSION)
+    stream.write(header)
+
+
+class TermWriter:
+    """
+    Writes values to a binary stream.
+
+    Terms, equations, substitutions, dataclasses such as
+    MOOCheckResult and the builtin containers of them are
+    written compactly. Other values are pickled.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        The stream to write to. A header is written
+        unless write_header is False.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> from symcollab.algebra.serialize import dumps, loads
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> loads(dumps(f(x, f(x, x))))
+    f(x, f(x, x))
+    """
+    def __init__(self, stream: BinaryIO, write_header: bool = True):
+        self.stream = stream
+        self._symbols: Dict[Any, int] = dict()
+        self._nodes: Dict[Tuple[type, Term], int] = dict()
+        self._classes: Dict[type, int] = dict()
+        if write_header:
+            _write_header(stream)
+
+    @classmethod
+    def append(cls, path: Union[str, PathLike]) -> 'TermWriter':
+        """
+        Opens a file for appending values, starting a new
+        stream if the file doesn't exist yet or is empty.
+        A partial record left at the end of the file, for
+        instance by an interrupted write, is dropped.
+        """
+        try:
+            with open(path, "rb") as existing:
+                reader = TermReader(existing)
+                # The end of the last complete record
+                end = existing.tell()
+                size = existing.seek(0, 2)
+                existing.seek(end)
+                try:
+                    for _ in reader._records():
+                        end = existing.tell()
+                except _Truncated:
+                    pass
+        except (FileNotFoundError, _Truncated):
+            # Either there is no file or not even a complete header
+            return cls(open(path, "wb"))
+        if end < size:
+            truncate(path, end)
+        writer = cls(open(path, "ab"), write_header=False)
+        writer._symbols = {s: i for i, s in enumerate(reader._symbols)}
+        writer._nodes = {(type(t), t): i for i, t in enumerate(reader._nodes)}
+        writer._classes = {c: i for i, c in enumerate(reader._classes)}
+        return writer
+
+    def write(self, value: Any):
+        """Writes a value along with the symbols and subterms it introduces."""
+        buffer = bytearray()
+        encoded = bytearray(_VALUE)
+        self._encode(value, buffer, encoded)
+        buffer += encoded
+        self.stream.write(buffer)
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _node(self, term: Term, definitions: bytearray) -> int:
+        """Returns the index of a term, defining it and its subterms if new."""
+        nodes = self._nodes
+        key = (type(term), term)
+        if key in nodes:
+            return nodes[key]
+        for t in postorder(term, lambda s: (type(s), s) not in nodes):
+            key = (type(t), t)
+            if key in nodes:
+                continue
+            symbol = self._symbol(t, definitions)
+            definitions += _NODE
+            _write_uint(definitions, symbol)
+            if isinstance(t, FuncTerm):
+                for arg in t.arguments:
+                    _write_uint(definitions, nodes[(type(arg), arg)])
+            nodes[key] = len(nodes)
+        return nodes[(type(term), term)]
+
+    def _symbol(self, term: Term, definitions: bytearray) -> int:
+        key = _symbol_key(term)
+        index = self._symbols.get(key)
+        if index is None:
+            index = len(self._symbols)
+            self._symbols[key] = index
+            definitions += _SYMBOL
+            _write_bytes(definitions, pickle.dumps(key))
+        return index
+
+    def _class(self, cls: type, definitions: bytearray) -> int:
+        index = self._classes.get(cls)
+        if index is None:
+            index = len(self._classes)
+            self._classes[cls] = index
+            definitions += _CLASS
+            _write_bytes(definitions, pickle.dumps(cls))
+        return index
+
+    def _encode(self, value: Any, definitions: bytearray, buffer: bytearray):
+        if value is None:
+            buffer += _NONE
+        elif value is True:
+            buffer += _TRUE
+        elif value is False:
+            buffer += _FALSE
+        elif isinstance(value, (Variable, FuncTerm)):
+            buffer += _TERM
+            _write_uint(buffer, self._node(value, definitions))
+        elif type(value) is int:
+            buffer += _INT
+            # Zigzag encoding keeps small negative numbers short
+            _write_uint(buffer, value << 1 if value >= 0 else ((-value) << 1) - 1)
+        elif type(value) is float:
+            buffer += _FLOAT
+            buffer += struct.pack("<d", value)
+        elif type(value) is str:
+            buffer += _STR
+            _write_bytes(buffer, value.encode("utf-8"))
+        elif isinstance(value, Equation):
+            buffer += _EQUATION
+            _write_uint(buffer, self._node(value.left_side, definitions))
+            _write_uint(buffer, self._node(value.right_side, definitions))
+        elif isinstance(value, SubstituteTerm):
+            buffer += _SUBSTITUTION
+            _write_uint(buffer, len(value))
+            for variable, term in value.subs:
+                _write_uint(buffer, self._node(variable, definitions))
+                _write_uint(buffer, self._node(term, definitions))
+        elif type(value) in (list, tuple):
+            buffer += _LIST if type(value) is list else _TUPLE
+            _write_uint(buffer, len(value))
+            for v in value:
+                self._encode(v, definitions, buffer)
+        elif type(value) is dict:
+            buffer += _DICT
+            _write_uint(buffer, len(value))
+            for k, v in value.items():
+                self._encode(k, definitions, buffer)
+                self._encode(v, definitions, buffer)
+        elif is_dataclass(value) and not isinstance(value, type):
+            buffer += _DATACLASS
+            _write_uint(buffer, self._class(type(value), definitions))
+            for field in _init_fields(type(value)):
+                self._encode(getattr(value, field.name), definitions, buffer)
+        else:
+            buffer += _PICKLE
+            _write_bytes(buffer, pickle.dumps(value))
+
+
+class TermReader:
+    """
+    Reads the values written by a TermWriter
+    from a binary stream one at a time.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        The stream to read from, starting at its header.
+    """
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        magic = stream.read(len(_MAGIC))
+        if magic == b"":
+            raise _Truncated("Truncated stream")
+        if magic != _MAGIC:
+            raise ValueError("Stream is not a serialized term stream")
+        self.version = self._read_uint()
+        if self.version > _VERSION:
+            raise ValueError(f"Unsupported stream version {self.version}")
+        self._symbols: List[Any] = list()
+        self._nodes: List[Term] = list()
+        self._classes: List[type] = list()
+
+    @classmethod
+    def open(cls, path: Union[str, PathLike]) -> 'TermReader':
+        """Opens a file for reading."""
+        return cls(open(path, "rb"))
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        for record, value in self._records():
+            if record == _VALUE:
+                yield value
+
+    def _records(self) -> Iterator[Tuple[bytes, Any]]:
+        """Reads the records one at a time, along with the value of value records."""
+        while True:
+            record = self.stream.read(1)
+            if record == b"":
+                return
+            if record == _VALUE:
+                yield record, self._decode()
+                continue
+            if record == _NODE:
+                self._read_node()
+            elif record == _SYMBOL:
+                self._symbols.append(pickle.loads(self._read_bytes()))
+            elif record == _CLASS:
+                self._classes.append(pickle.loads(self._read_bytes()))
+            else:
+                raise ValueError(f"Unknown record {record!r}")
+            yield record, None
+
+    def _read(self, n: int) -> bytes:
+        b = self.stream.read(n)
+        if len(b) < n:
+            raise _Truncated("Truncated stream")
+        return b
+
+    def _read_uint(self) -> int:
+        n = 0
+        shift = 0
+        while True:
+            byte = self._read(1)[0]
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def _read_bytes(self) -> bytes:
+        return self._read(self._read_uint())
+
+    def _read_node(self):
+        symbol = self._symbols[self._read_uint()]
+        if not isinstance(symbol, tuple):
+            self._nodes.append(symbol)
+            return
+        term_class, function = symbol
+        args = [self._nodes[self._read_uint()] for _ in range(function.arity)]
+        self._nodes.append(term_class.intern(function, args))
+
+    def _decode(self) -> Any:
+        tag = self._read(1)
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _TERM:
+            return self._nodes[self._read_uint()]
+        if tag == _INT:
+            n = self._read_uint()
+            return n >> 1 if n & 1 == 0 else -((n + 1) >> 1)
+        if tag == _FLOAT:
+            return struct.unpack("<d", self._read(8))[0]
+        if tag == _STR:
+            return self._read_bytes().decode("utf-8")
+        if tag == _EQUATION:
+            left_side = self._nodes[self._read_uint()]
+            right_side = self._nodes[self._read_uint()]
+            return Equation(left_side, right_side)
+        if tag == _SUBSTITUTION:
+            subs = set()
+            for _ in range(self._read_uint()):
+                variable = self._nodes[self._read_uint()]
+                subs.add((variable, self._nodes[self._read_uint()]))
+            sigma = SubstituteTerm()
+            sigma.subs = subs
+            return sigma
+        if tag in (_LIST, _TUPLE):
+            values = [self._decode() for _ in range(self._read_uint())]
+            return values if tag == _LIST else tuple(values)
+        if tag == _DICT:
+            result = dict()
+            for _ in range(self._read_uint()):
+                k = self._decode()
+                result[k] = self._decode()
+            return result
+        if tag == _DATACLASS:
+            cls = self._classes[self._read_uint()]
+            return cls(**{field.name: self._decode() for field in _init_fields(cls)})
+        if tag == _PICKLE:
+            return pickle.loads(self._read_bytes())
+        raise ValueError(f"Unknown value tag {tag!r}")
+
+
+def dumps(value: Any) -> bytes:
+    """Serializes a single value to bytes."""
+    stream = BytesIO()
+    TermWriter(stream).write(value)
+    return stream.getvalue()
+
+def loads(data: bytes) -> Any:
+    """Deserializes a single value from bytes."""
+    return next(iter(TermReader(BytesIO(data))))
@@ -3,11 +3,11 @@ This module is responsible for describing substitutions
 which are mappings between variables and terms, as well
 as the application of them.
 """
-from typing import List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 from copy import deepcopy
-from .term import Variable, Constant, FuncTerm, Term
+from .term import Variable, Constant, FuncTerm, Term, rebuild
 
-__all__ = ['SortMismatch', 'SubstituteTerm', 'unravel']
+__all__ = ['SortMismatch', 'SubstituteTerm', 'TriangularSubstitution', 'unravel']
 
 class SortMismatch(Exception):
     """Raise when there is a sort mismatch."""
@@ -28,6 +28,16 @@ def _variable_key(v: Variable):
             name_with_subscript[1] = 0
     return name_with_subscript
 
+def _format_bindings(subs: Set[Tuple[Variable, Term]]) -> str:
+    """Formats a set of bindings sorted by their variables."""
+    sorted_subs = sorted(subs, key=lambda k: _variable_key(k[0]))
+    str_repr = "{\n" if len(subs) > 1 else "{"
+    str_repr += ",\n".join(
+        [f"{variable} ↦ {term}" for variable, term in sorted_subs]
+    )
+    str_repr += "\n}" if len(subs) > 1 else "}"
+    return str_repr
+
 class SubstituteTerm:
     """
     Represents a substitution from variables to terms.
@@ -41,10 +51,33 @@ class SubstituteTerm:
     >>> sigma.add(x, a)
     >>> x * sigma
     a
+
+    Notes
+    -----
+    The bindings are kept in the set ``subs``. A dictionary from
+    each variable to its term is built on demand for lookups, so
+    ``subs`` should only be changed through ``add``, ``remove``,
+    ``replace`` or by assigning a new set.
     """
     def __init__(self):
         self.subs: Set[Tuple[Variable, Term]] = set()
 
+    @property
+    def subs(self) -> Set[Tuple[Variable, Term]]:
+        """The set of (variable, term) bindings."""
+        return self._subs
+
+    @subs.setter
+    def subs(self, subs: Set[Tuple[Variable, Term]]):
+        self._subs = subs
+        self._mapping: Optional[Dict[Variable, Term]] = None
+
+    def _get_mapping(self) -> Dict[Variable, Term]:
+        """Returns a dictionary from each variable to its term."""
+        if self._mapping is None:
+            self._mapping = dict(self._subs)
+        return self._mapping
+
     def add(self, variable: Variable, term: Term):
         """
         Adds a mapping from a variable to a term
@@ -76,22 +109,18 @@ class SubstituteTerm:
 
         # Check to see if what we're adding already exists
         # in the substitution set
-        for sub_var, sub_term in self.subs:
-            if sub_var == variable and term != sub_term:
-                raise ValueError(f"{variable} already exists in the substitution set")
+        mapping = self._get_mapping()
+        if variable in mapping and term != mapping[variable]:
+            raise ValueError(f"{variable} already exists in the substitution set")
 
         self.subs.add((variable, term))
+        mapping[variable] = term
 
     def remove(self, variable: Variable):
         """Removes a mapping from a variable"""
-        # The removal technique consists of creating a set
-        # that contains what you want to remove
-        # and then do set subtraction
-        to_remove = {}
-        for sub_var, sub_term in self.subs:
-            if sub_var == variable:
-                to_remove = {(sub_var, sub_term)}
-        self.subs = self.subs - to_remove
+        mapping = self._get_mapping()
+        if variable in mapping:
+            self.subs.discard((variable, mapping.pop(variable)))
 
     def replace(self, variable: Variable, term: Term):
         """Replaces a mapping from a variable with another term"""
@@ -103,6 +132,7 @@ class SubstituteTerm:
         # We don't have to call self.add as we already
         # ensured that the item is removed
         self.subs.add((variable, term))
+        self._get_mapping()[variable] = term
 
     def domain(self) -> List[Variable]:
         """
@@ -124,30 +154,19 @@ class SubstituteTerm:
         return len(self.subs)
 
     def __deepcopy__(self, memo):
+        # Terms are never modified in place, so the
+        # bindings themselves can be shared.
         subterm = SubstituteTerm()
-        for variable, term in self.subs:
-            subterm.add(
-                deepcopy(variable),
-                deepcopy(term)
-            )
-
+        subterm.subs = set(self.subs)
         return subterm
 
     def __str__(self):
-        sorted_subs = sorted(self.subs, key=lambda k: _variable_key(k[0]))
-        str_repr = "{\n" if len(self.subs) > 1 else "{"
-        str_repr += ",\n".join(
-            [f"{variable} ↦ {term}" for variable, term in sorted_subs]
-        )
-        str_repr += "\n}" if len(self.subs) > 1 else "}"
-        return str_repr
+        return _format_bindings(self.subs)
 
     def _applysub(self, term: Term) -> Term:
         """Apply a substitution to a term"""
         assert isinstance(term, (Constant, Variable, FuncTerm))
-        new_term = deepcopy(term)
-        new_term = self._termSubstituteHelper(new_term)
-        return new_term
+        return self._termSubstituteHelper(term)
 
     def __rmul__(self, term: Term) -> Term:
         return self._applysub(term)
@@ -170,27 +189,20 @@ class SubstituteTerm:
         if len(self.subs) == 0:
             return deepcopy(theta)
 
-        v, t = zip(*self.subs)
         # Apply theta to every term in its range
-        t = tuple(map(theta, t))
-        sigma1 = SubstituteTerm()
-        sigma1.subs = set(zip(v, t))
-
-        # Remove any binding x->t where x in Dom(sigma)
-        theta1 = deepcopy(theta)
-        theta_dom = theta1.domain()
-        for vt in v:
-            if vt in theta_dom:
-                theta1.remove(vt)
-
-        # Remove trival bindings
-        for vt, tt in zip(v, t):
-            if vt == tt:
-                sigma1.remove(vt)
-
-        # Union the two substitution sets
+        # and remove trivial bindings
+        subs = set()
+        for v, t in self.subs:
+            t = theta(t)
+            if v != t:
+                subs.add((v, t))
+
+        # Add the bindings x->t of theta where x not in Dom(sigma)
+        mapping = self._get_mapping()
+        subs.update(b for b in theta.subs if b[0] not in mapping)
+
         result = SubstituteTerm()
-        result.subs = sigma1.subs | theta1.subs
+        result.subs = subs
         return result
 
     def __call__(self, term: Term) -> Term:
@@ -199,35 +211,334 @@ class SubstituteTerm:
 
     def _termSubstituteHelper(self, term: Term) -> Term:
         # If there is nothing in the substitution set, return the same term
-        if len(self.subs) == 0:
+        mapping = self._get_mapping()
+        if len(mapping) == 0:
             return term
+        return _substitute(term, mapping)
 
-        # Recurse down if term is a FuncTerm
-        if isinstance(term, FuncTerm):
-            new_arguments = [
-                self._termSubstituteHelper(t)
-                for t in term.arguments
-            ]
-            term.arguments = new_arguments
-            return term
+def _substitute(term: Term, mapping: Dict[Variable, Term]) -> Term:
+    """
+    Replaces the variables of a term according to mapping.
+    Only the path to replaced variables is rebuilt, every
+    other subterm is shared with the original term.
+    """
+    # Skip terms that don't contain any variable being replaced
+    if mapping.keys().isdisjoint(term.variables):
+        return term
+    return rebuild(
+        term,
+        lambda t: mapping.get(t) if isinstance(t, Variable) else None,
+        lambda t: not mapping.keys().isdisjoint(t.variables)
+    )
+
+class _TriangularStore:
+    """
+    The bindings shared by triangular substitutions, each entry
+    along with the number of bindings there were when it was added.
+    """
+    __slots__ = ('bindings', 'parent', 'shortcut', 'resolved', 'dependents', 'length')
+
+    def __init__(self):
+        # The bindings as they were added
+        self.bindings: Dict[Variable, Tuple[Term, int]] = dict()
+        # Union-find parents for variable to variable bindings
+        self.parent: Dict[Variable, Tuple[Variable, int]] = dict()
+        # Parents replaced by their root through path compression
+        self.shortcut: Dict[Variable, Tuple[Variable, int]] = dict()
+        # Cache of fully resolved bound variables for the latest substitution
+        self.resolved: Dict[Variable, Term] = dict()
+        # The resolved variables whose term contains each unbound variable
+        self.dependents: Dict[Variable, Set[Variable]] = dict()
+        self.length = 0
+
+class TriangularSubstitution:
+    """
+    Represents a substitution in triangular form.
+
+    The bindings are stored as they are added, so a bound term
+    may contain variables that are bound later on. Chains of
+    variable to variable bindings are kept in a union-find
+    structure with path compression and every other binding is
+    resolved only when the substitution is applied. Resolved
+    variables are cached until a binding invalidates them.
 
-            # Note: Can't do the below because it simplifies with xor
-            # which breaks some of the crypto procedures.
-            # return term.function(*new_arguments)
+    Copies and compositions share their bindings with the
+    substitution they come from instead of copying them.
 
-        # If term is a variable in the substitution
-        # then return its substitute
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> z = Variable("z")
+    >>> a = Constant("a")
+    >>> sigma = TriangularSubstitution()
+    >>> sigma.add(x, f(y, y))
+    >>> sigma.add(y, z)
+    >>> sigma.add(z, a)
+    >>> x * sigma
+    f(a, a)
+    >>> print(sigma.to_substitute_term())
+    {
+    x ↦ f(a, a),
+    y ↦ a,
+    z ↦ a
+    }
+
+    Notes
+    -----
+    Composing ``sigma * theta`` only adds the bindings of theta,
+    which agrees with the composition of ``SubstituteTerm`` as
+    long as the range of theta doesn't contain variables bound
+    in sigma. This is the case when theta comes from eliminating
+    a variable that no longer occurs in the problem.
+
+    Every entry of the shared store records how many bindings
+    there were when it was added, and each substitution only sees
+    the entries below its own length. The substitution that made
+    the last binding appends to the store in place, while adding
+    to an older one first copies the entries it sees.
+    """
+    def __init__(self, sigma: Optional[SubstituteTerm] = None):
+        self._store = _TriangularStore()
+        # The number of bindings of the store we see
+        self._length = 0
+        # Cache of resolved variables once the store moved past us
+        self._own_resolved: Optional[Dict[Variable, Term]] = None
+        if sigma is not None:
+            for variable, term in sigma.subs:
+                self.add(variable, term)
+
+    @property
+    def subs(self) -> Set[Tuple[Variable, Term]]:
+        """The set of (variable, term) bindings in triangular form."""
+        return set(self._items())
+
+    def add(self, variable: Variable, term: Term):
+        """
+        Adds a mapping from a variable to a term.
+
+        Parameters
+        ----------
+        variable : Variable
+            The variable to replace
+        term : Term
+            The term to replace the variable with.
+            It may contain variables that are bound later on.
+        """
+        assert isinstance(variable, Variable)
+        assert isinstance(term, (Constant, FuncTerm, Variable))
+
+        if variable.sort != term.sort:
+            raise SortMismatch("Substitution must preserve sorts.")
+
+        existing = self._binding(variable)
+        if existing is not None:
+            if term != existing:
+                raise ValueError(f"{variable} already exists in the substitution set")
+            return
+
+        # Trivial bindings don't change anything
+        if variable == term:
+            return
+
+        if not self._latest():
+            self._fork()
+        store = self._store
+        index = store.length
+        store.bindings[variable] = (term, index)
         if isinstance(term, Variable):
-            for sub_var, sub_term in self.subs:
-                if term == sub_var:
-                    return deepcopy(sub_term)
+            root = self._find(term)
+            # A cycle of variables is left for _resolve to report
+            if root != variable:
+                store.parent[variable] = (root, index)
+        store.length += 1
+        self._length += 1
 
-        return term
+        # Forget resolutions that still contain the newly bound variable
+        for root in store.dependents.pop(variable, ()):
+            store.resolved.pop(root, None)
+
+    def domain(self) -> List[Variable]:
+        """Grabs the domain (the left side) of the substitutions."""
+        return [variable for variable, _ in self._items()]
+
+    def range(self) -> List[Term]:
+        """Grabs the range (the right side) of the bindings as they were added."""
+        return [term for _, term in self._items()]
+
+    def to_substitute_term(self) -> SubstituteTerm:
+        """Returns the equivalent idempotent substitution."""
+        subs = set()
+        for variable in self.domain():
+            term = self._resolve(variable)
+            if variable != term:
+                subs.add((variable, term))
+        sigma = SubstituteTerm()
+        sigma.subs = subs
+        return sigma
+
+    def _latest(self) -> bool:
+        """Whether we made the last binding of the store."""
+        return self._length == self._store.length
+
+    def _items(self):
+        length = self._length
+        return (
+            (variable, term)
+            for variable, (term, index) in self._store.bindings.items()
+            if index < length
+        )
+
+    def _binding(self, variable: Variable) -> Optional[Term]:
+        entry = self._store.bindings.get(variable)
+        if entry is None or entry[1] >= self._length:
+            return None
+        return entry[0]
+
+    def _fork(self):
+        """Copies the entries we see into a store of our own."""
+        length = self._length
+        old = self._store
+        store = _TriangularStore()
+        store.bindings = {v: e for v, e in old.bindings.items() if e[1] < length}
+        store.parent = {v: e for v, e in old.parent.items() if e[1] < length}
+        store.shortcut = {v: e for v, e in old.shortcut.items() if e[1] < length}
+        store.length = length
+        if self._own_resolved is not None:
+            store.resolved = self._own_resolved
+            for root, term in store.resolved.items():
+                for v in term.variables:
+                    store.dependents.setdefault(v, set()).add(root)
+            self._own_resolved = None
+        self._store = store
+
+    def _cache(self) -> Dict[Variable, Term]:
+        """The resolved variables for the bindings we see."""
+        if self._latest():
+            return self._store.resolved
+        if self._own_resolved is None:
+            self._own_resolved = dict()
+        return self._own_resolved
+
+    def _find(self, variable: Variable) -> Variable:
+        """Finds the representative of a variable's class."""
+        store = self._store
+        length = self._length
+        path: List[Tuple[Variable, int]] = list()
+        root = variable
+        while True:
+            entry = store.shortcut.get(root)
+            if entry is None or entry[1] >= length:
+                entry = store.parent.get(root)
+                if entry is None or entry[1] >= length:
+                    break
+            path.append((root, entry[1]))
+            root = entry[0]
+        # Path compression, each shortcut being as recent
+        # as the latest binding along the path it skips
+        latest = -1
+        for position in range(len(path) - 1, -1, -1):
+            v, index = path[position]
+            latest = max(latest, index)
+            if position < len(path) - 1:
+                store.shortcut[v] = (root, latest)
+        return root
+
+    def _bound(self, term: Term) -> bool:
+        """Returns whether the term contains a bound variable."""
+        if self._latest():
+            return not self._store.bindings.keys().isdisjoint(term.variables)
+        return any(self._binding(v) is not None for v in term.variables)
+
+    def _replace_variable(self, term: Term) -> Optional[Term]:
+        if not isinstance(term, Variable):
+            return None
+        root = self._find(term)
+        return self._cache().get(root, root)
+
+    def _resolve_bindings(self, term: Term):
+        """
+        Resolves every bound variable reachable from the term,
+        the variables a binding depends on being resolved first.
+        """
+        resolved = self._cache()
+        dependents = self._store.dependents if self._latest() else None
+        stack: List[Tuple[Variable, bool]] = [
+            (self._find(v), False) for v in term.variables if self._binding(v) is not None
+        ]
+        visiting: Set[Variable] = set()
+        while stack:
+            root, expanded = stack.pop()
+            binding = self._binding(root)
+            if expanded:
+                value = rebuild(binding, self._replace_variable, self._bound)
+                resolved[root] = value
+                if dependents is not None:
+                    for v in value.variables:
+                        dependents.setdefault(v, set()).add(root)
+                visiting.discard(root)
+                continue
+            if binding is None or root in resolved:
+                continue
+            if root in visiting:
+                raise ValueError(f"{root} occurs within its own binding")
+            visiting.add(root)
+            stack.append((root, True))
+            stack.extend((self._find(v), False) for v in binding.variables)
+
+    def _resolve(self, term: Term) -> Term:
+        if not self._bound(term):
+            return term
+        self._resolve_bindings(term)
+        return rebuild(term, self._replace_variable, self._bound)
+
+    def __len__(self):
+        return self._length
+
+    def __deepcopy__(self, memo):
+        sigma = TriangularSubstitution()
+        sigma._store = self._store
+        sigma._length = self._length
+        return sigma
 
-def unravel(t: Term, s: SubstituteTerm) -> Term:
-    """Apply a substitution until you can't"""
-    ts = t * s
-    while t != ts:
-        t = ts
-        ts = t * s
-    return t
+    def __str__(self):
+        return _format_bindings(self.subs)
+
+    def __rmul__(self, term: Term) -> Term:
+        return self(term)
+
+    def __mul__(self, theta):
+        """
+        Lazily combine two substitutions by adding the
+        bindings of theta outside of our domain.
+        """
+        if not isinstance(theta, (SubstituteTerm, TriangularSubstitution)):
+            raise ValueError(
+                "Expected a substitution to the right of *, \
+                perhaps you meant to apply substitution on a term? \
+                If so, swap the arguments."
+            )
+        sigma = deepcopy(self)
+        for variable, term in theta.subs:
+            if self._binding(variable) is None:
+                sigma.add(variable, term)
+        return sigma
+
+    def __call__(self, term: Term) -> Term:
+        """Apply substitution to term."""
+        assert isinstance(term, (Constant, Variable, FuncTerm))
+        return self._resolve(term)
+
+def unravel(t: Term, s: Union[SubstituteTerm, TriangularSubstitution]) -> Term:
+    """
+    Apply a substitution until you can't.
+
+    The bindings of s are resolved in triangular form, so
+    each of them is applied at most once. Raises a ValueError
+    if a variable of t is bound to a term containing itself.
+    """
+    if not isinstance(s, TriangularSubstitution):
+        s = TriangularSubstitution(s)
+    return s(t)
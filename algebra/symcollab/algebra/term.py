@@ -8,14 +8,16 @@ in algorithms that operate on terms.
 """
 from copy import deepcopy
 from functools import partial, reduce
-from typing import Union, List, Set, Optional, Any
-from typing_extensions import Literal
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from weakref import WeakValueDictionary
 
 __all__ = [
     'Sort', 'Function', 'Variable',
     'FuncTerm', 'Constant', 'get_vars',
     'get_constants', 'get_vars_or_constants', 'depth',
-    'count_occurence', 'Equation', 'Term']
+    'count_occurence', 'Equation', 'Term',
+    'preorder', 'postorder', 'fold', 'rebuild',
+    'Position', 'subterm_at', 'replace_at', 'positions']
 
 #
 ## Basic Types
@@ -131,7 +133,7 @@ class Function:
                 if arg.sort != domain_sort and not arg.sort.subset_of(domain_sort):
                     raise ValueError(error_message)
 
-        return FuncTerm(self, args)
+        return FuncTerm.intern(self, args)
 
     def __repr__(self):
         return self.symbol
@@ -160,6 +162,7 @@ class Variable:
     >>> Variable("x")
     x
     """
+    __slots__ = ('symbol', 'sort')
     def __init__(self, symbol: str, sort: Optional[Sort] = None):
         self.symbol = symbol
         self.sort = sort
@@ -171,6 +174,22 @@ class Variable:
         return isinstance(x, Variable) and self.symbol == x.symbol and self.sort == x.sort
     def __deepcopy__(self, memo):
         return Variable(self.symbol, deepcopy(self.sort))
+    @property
+    def variables(self) -> FrozenSet['Variable']:
+        """The set of variables inside the term."""
+        return frozenset((self,))
+    @property
+    def size(self) -> int:
+        """The number of symbols inside the term."""
+        return 1
+    @property
+    def depth(self) -> int:
+        """The depth of the term."""
+        return 0
+    @property
+    def ground(self) -> bool:
+        """Whether the term contains no variables."""
+        return False
 
 class FuncTerm:
     """
@@ -190,11 +209,49 @@ class FuncTerm:
     >>> a = Constant("a")
     >>> f(a)
     f(a)
+
+    Notes
+    -----
+    Terms created by calling a Function are hash-consed, meaning that
+    structurally equal terms share a single node. Terms should therefore
+    be treated as immutable. This allows the hash, size, depth and
+    variables of a term to be computed once and cached on the node.
     """
+    __slots__ = (
+        'function', '_arguments', '_hash', '_size',
+        '_depth', '_variables', '_positions', '__weakref__'
+    )
     def __init__(self, function: Function, args):
         assert len(args) == function.arity
         self.function = function
         self._arguments = tuple(args)
+        self._clear_cache()
+    def _clear_cache(self):
+        self._hash: Optional[int] = None
+        self._size: Optional[int] = None
+        self._depth: Optional[int] = None
+        self._variables: Optional[FrozenSet[Variable]] = None
+        self._positions: Optional[Tuple[Tuple['Position', 'Term'], ...]] = None
+    @classmethod
+    def intern(cls, function: Function, args) -> 'FuncTerm':
+        """
+        Returns the shared instance of the term function(*args).
+
+        Examples
+        --------
+        >>> from symcollab.algebra import *
+        >>> f = Function("f", 1)
+        >>> a = Constant("a")
+        >>> FuncTerm.intern(f, (a,)) is f(a)
+        True
+        """
+        args = tuple(args)
+        key = (cls, function, args)
+        term = _interned_terms.get(key)
+        if term is None:
+            term = cls(function, args)
+            _interned_terms[key] = term
+        return term
     @property
     def sort(self):
         return self.function.range_sort
@@ -204,9 +261,28 @@ class FuncTerm:
     @property
     def arguments(self):
         return self._arguments
-    @arguments.setter
-    def arguments(self, args):
-        self._arguments = tuple(args)
+    @property
+    def variables(self) -> FrozenSet[Variable]:
+        """The set of variables inside the term."""
+        if self._variables is None:
+            _fill_cache(self, '_variables', _compute_variables)
+        return self._variables
+    @property
+    def size(self) -> int:
+        """The number of symbols inside the term."""
+        if self._size is None:
+            _fill_cache(self, '_size', _compute_size)
+        return self._size
+    @property
+    def depth(self) -> int:
+        """The depth of the term."""
+        if self._depth is None:
+            _fill_cache(self, '_depth', _compute_depth)
+        return self._depth
+    @property
+    def ground(self) -> bool:
+        """Whether the term contains no variables."""
+        return len(self.variables) == 0
     def __repr__(self):
         if self.function.arity == 0:
             return self.function.symbol
@@ -217,21 +293,77 @@ class FuncTerm:
         return self.function.symbol + "(" + ", ".join(map(str, self.arguments)) + ")"
     # Hash needed for network library
     def __hash__(self):
-        return hash((self.function, tuple(self.arguments)))
+        if self._hash is None:
+            _fill_cache(self, '_hash', _compute_hash)
+        return self._hash
     def __eq__(self, x):
+        if self is x:
+            return True
         return isinstance(x, FuncTerm) and \
+            hash(self) == hash(x) and \
             self.function == x.function and \
                 self.arguments == x.arguments
     def __contains__(self, term):
-        inside = False
-        for arg in self.arguments:
-            inside = inside or (term == arg)
-            if isinstance(arg, FuncTerm) and arg.function.arity > 0:
-                inside = inside or (term in arg)
-        return inside
+        if isinstance(term, Variable):
+            return term in self.variables
+        if not isinstance(term, FuncTerm):
+            return False
+        # A proper subterm is strictly shallower and has no new variables
+        def may_contain(t: 'FuncTerm') -> bool:
+            return term.depth < t.depth and term.variables <= t.variables
+        subterms = preorder(self, may_contain)
+        next(subterms)
+        return any(term == t for t in subterms)
     def __deepcopy__(self, memo):
-        arguments = map(deepcopy, self.arguments)
-        return self.function(*arguments)
+        return fold(self, _copy_node)
+    def __reduce__(self):
+        # Cached hashes are not valid across processes
+        return (type(self).intern, (self.function, self._arguments))
+
+
+def _fill_cache(term: FuncTerm, attribute: str, compute: Callable[[FuncTerm], Any]):
+    """
+    Caches an attribute on the term and on every FuncTerm below
+    it that is missing it, with children computed before parents.
+    """
+    stack = [term]
+    while stack:
+        t = stack[-1]
+        if getattr(t, attribute) is not None:
+            stack.pop()
+            continue
+        pending = [
+            arg for arg in t._arguments
+            if isinstance(arg, FuncTerm) and getattr(arg, attribute) is None
+        ]
+        if pending:
+            stack.extend(pending)
+        else:
+            setattr(t, attribute, compute(t))
+            stack.pop()
+
+def _compute_variables(t: FuncTerm) -> FrozenSet[Variable]:
+    return frozenset().union(*(arg.variables for arg in t._arguments))
+
+def _compute_size(t: FuncTerm) -> int:
+    return 1 + sum(arg.size for arg in t._arguments)
+
+def _compute_depth(t: FuncTerm) -> int:
+    return 1 + max(arg.depth for arg in t._arguments) \
+        if len(t._arguments) > 0 else 0
+
+def _compute_hash(t: FuncTerm) -> int:
+    return hash((t.function, t._arguments))
+
+def _copy_node(t: FuncTerm, arguments: List['Term']) -> 'Term':
+    if isinstance(t, FuncTerm) and not isinstance(t, Constant):
+        return t.function(*arguments)
+    return deepcopy(t)
+
+
+# Maps (term class, function, arguments) to the shared FuncTerm
+_interned_terms: 'WeakValueDictionary[Tuple[type, Function, tuple], FuncTerm]' = \
+    WeakValueDictionary()
 
 
 class Constant(FuncTerm):
@@ -256,6 +388,7 @@ class Constant(FuncTerm):
     >>> a
     a
     """
+    __slots__ = ()
     def __init__(self, symbol: str, sort: Optional[Sort] = None):
         super().__init__(Function(symbol, 0, range_sort=sort), ())
     @property
@@ -264,26 +397,302 @@ class Constant(FuncTerm):
     @symbol.setter
     def symbol(self, s):
         self.function.symbol = s
+        self._clear_cache()
     def __deepcopy__(self, memo):
         return Constant(self.symbol, deepcopy(self.sort))
+    def __reduce__(self):
+        return (type(self), (self.symbol, self.sort))
 
 
 Term = Union[Variable, Constant, FuncTerm]
 
-def _get_type(t: Term, unique: Literal[False], classinfo):
-    """Recursively go through a term and pick out terms of type classinfo."""
-    if isinstance(t, classinfo):
-        return {t} if unique else [t]
+#
+## Traversal
+#
+# The traversals below use an explicit stack instead of recursion,
+# so they work on terms of any depth.
+
+def preorder(t: Term, descend: Optional[Callable[[FuncTerm], bool]] = None) -> Iterator[Term]:
+    """
+    Iterates over the subterms of a term, parents before children.
+
+    Parameters
+    ----------
+    t : Term
+        The term to traverse.
+    descend : Callable[[FuncTerm], bool]
+        If given, the arguments of a FuncTerm are only visited
+        when descend returns True for it.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> list(preorder(f(f(x, a), a)))
+    [f(f(x, a), a), f(x, a), x, a, a]
+    """
+    stack = [t]
+    while stack:
+        s = stack.pop()
+        yield s
+        if isinstance(s, FuncTerm) and (descend is None or descend(s)):
+            stack.extend(reversed(s.arguments))
+
+def postorder(t: Term, descend: Optional[Callable[[FuncTerm], bool]] = None) -> Iterator[Term]:
+    """
+    Iterates over the subterms of a term, children before parents.
+
+    Parameters
+    ----------
+    t : Term
+        The term to traverse.
+    descend : Callable[[FuncTerm], bool]
+        If given, the arguments of a FuncTerm are only visited
+        when descend returns True for it.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> list(postorder(f(f(x, a), a)))
+    [x, a, f(x, a), a, f(f(x, a), a)]
+    """
+    stack: List[Tuple[Term, bool]] = [(t, False)]
+    while stack:
+        s, expanded = stack.pop()
+        if expanded or not isinstance(s, FuncTerm) or \
+           (descend is not None and not descend(s)):
+            yield s
+            continue
+        stack.append((s, True))
+        stack.extend((arg, False) for arg in reversed(s.arguments))
+
+def fold(t: Term, combine: Callable[[Term, List[Any]], Any],
+         children: Optional[Callable[[Term], Any]] = None) -> Any:
+    """
+    Folds a term bottom-up.
+
+    Parameters
+    ----------
+    t : Term
+        The term to fold.
+    combine : Callable[[Term, List[Any]], Any]
+        Called on each subterm with the folded values of its children.
+    children : Callable[[Term], Any]
+        Returns the children of a subterm.
+        Defaults to the arguments of FuncTerms.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> fold(f(f(x, a), a), lambda s, sizes: 1 + sum(sizes))
+    5
+    """
+    if children is None:
+        children = _arguments
+    stack: List[Tuple[Term, Optional[tuple]]] = [(t, None)]
+    results: List[Any] = []
+    while stack:
+        s, kids = stack.pop()
+        if kids is None:
+            kids = tuple(children(s))
+            stack.append((s, kids))
+            stack.extend((k, None) for k in reversed(kids))
+            continue
+        start = len(results) - len(kids)
+        folded = results[start:]
+        del results[start:]
+        results.append(combine(s, folded))
+    return results[0]
+
+def _arguments(t: Term):
+    return t.arguments if isinstance(t, FuncTerm) else ()
+
+def rebuild(t: Term, replace: Callable[[Term], Optional[Term]],
+            descend: Optional[Callable[[FuncTerm], bool]] = None) -> Term:
+    """
+    Rebuilds a term bottom-up after replacing some of its subterms.
+
+    Parameters
+    ----------
+    t : Term
+        The term to rebuild.
+    replace : Callable[[Term], Optional[Term]]
+        Called on each subterm from the top. If it returns a term,
+        that term takes the place of the subterm and its arguments
+        are not visited.
+    descend : Callable[[FuncTerm], bool]
+        If given, the arguments of a FuncTerm are only visited
+        when descend returns True for it.
+
+    Notes
+    -----
+    Only the paths to replaced subterms are rebuilt, every
+    other subterm is shared with the original term.
 
-    l : List[Any] = []
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> rebuild(f(x, f(x, a)), lambda s: a if s == x else None)
+    f(a, f(a, a))
+    """
+    done: Dict[int, Term] = dict()
+    stack: List[Tuple[Term, bool]] = [(t, False)]
+    while stack:
+        s, expanded = stack.pop()
+        if expanded:
+            arguments = [done[id(arg)] for arg in s.arguments]
+            changed = any(new is not old for new, old in zip(arguments, s.arguments))
+            # Note: Can't use s.function(*arguments) because it
+            # simplifies with xor which breaks some of the crypto procedures.
+            done[id(s)] = type(s).intern(s.function, arguments) if changed else s
+            continue
+        if id(s) in done:
+            continue
+        replacement = replace(s)
+        if replacement is not None:
+            done[id(s)] = replacement
+        elif not isinstance(s, FuncTerm) or len(s.arguments) == 0 or \
+             (descend is not None and not descend(s)):
+            done[id(s)] = s
+        else:
+            stack.append((s, True))
+            stack.extend((arg, False) for arg in s.arguments)
+    return done[id(t)]
+
+#
+## Positions
+#
+
+class Position(tuple):
+    """
+    A position within a term, given as the sequence of
+    argument indices to follow from the root, starting at 1.
+    The empty position refers to the root itself.
+
+    Parameters
+    ----------
+    indices : Union[str, Iterable[int]]
+        The argument indices. A string of one digit
+        indices such as '121' is also accepted.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> c = Constant("c")
+    >>> subterm_at(f(f(a, f(b, c)), a), Position((1, 2, 1)))
+    b
+    """
+    __slots__ = ()
+    def __new__(cls, indices: Union[str, Iterable[int]] = ()):
+        if isinstance(indices, str):
+            indices = map(int, indices)
+        return tuple.__new__(cls, indices)
+    def __add__(self, other) -> 'Position':
+        return Position(tuple.__add__(self, tuple(other)))
+    def child(self, index: int) -> 'Position':
+        """The position of the index-th argument of the subterm here."""
+        return Position(tuple.__add__(self, (index,)))
+
+def _invalid_position(t: Term, pos: Tuple[int, ...]) -> ValueError:
+    return ValueError("Position " + str(tuple(pos)) + " is not valid for term " + str(t))
+
+def subterm_at(t: Term, pos: Tuple[int, ...]) -> Term:
+    """Returns the subterm at a position within a term."""
+    s = t
+    for index in pos:
+        if not isinstance(s, FuncTerm) or not 1 <= index <= len(s.arguments):
+            raise _invalid_position(t, pos)
+        s = s.arguments[index - 1]
+    return s
+
+def replace_at(t: Term, pos: Tuple[int, ...], subterm: Term) -> Term:
+    """
+    Returns the term with the subterm at a position replaced.
+
+    Only the terms along the position are rebuilt, every other
+    subterm is shared with the original term.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> replace_at(f(x, f(x, x)), Position((2, 1)), a)
+    f(x, f(a, x))
+    """
+    path: List[Term] = list()
+    s = t
+    for index in pos:
+        if not isinstance(s, FuncTerm) or not 1 <= index <= len(s.arguments):
+            raise _invalid_position(t, pos)
+        path.append(s)
+        s = s.arguments[index - 1]
+    for s, index in zip(reversed(path), reversed(pos)):
+        arguments = list(s.arguments)
+        arguments[index - 1] = subterm
+        subterm = type(s).intern(s.function, arguments)
+    return subterm
+
+def positions(t: Term) -> Tuple[Tuple[Position, Term], ...]:
+    """
+    Returns every position within a term along with the
+    subterm at it, parents before children.
+
+    The table is cached on the term, so repeated
+    calls on the same term are free.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import *
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> positions(f(x, a))
+    (((), f(x, a)), ((1,), x), ((2,), a))
+    """
+    if isinstance(t, FuncTerm) and t._positions is not None:
+        return t._positions
+    table: List[Tuple[Position, Term]] = list()
+    stack: List[Tuple[Position, Term]] = [(Position(), t)]
+    while stack:
+        pos, s = stack.pop()
+        table.append((pos, s))
+        if isinstance(s, FuncTerm):
+            stack.extend(
+                (pos.child(i), s.arguments[i - 1])
+                for i in range(len(s.arguments), 0, -1)
+            )
+    result = tuple(table)
     if isinstance(t, FuncTerm):
-        for i in t.arguments:
-            l = l + _get_type(i, False, classinfo)
+        t._positions = result
+    return result
 
+
+def _get_type(t: Term, unique: bool, classinfo):
+    """Go through a term and pick out terms of type classinfo."""
+    l : List[Any] = [
+        s for s in preorder(t, lambda s: not isinstance(s, classinfo))
+        if isinstance(s, classinfo)
+    ]
     return set(l) if unique else l
 
 
-def get_vars(t, unique=False) -> Union[List[Variable], Set[Variable]]:
+def get_vars(t, unique=False) -> Union[List[Variable], FrozenSet[Variable]]:
     """
     Get the variables inside a term
 
@@ -293,6 +702,7 @@ def get_vars(t, unique=False) -> Union[List[Variable], Set[Variable]]:
         The term to look for variables.
     unique : bool
         If true, then we only show each variable once.
+        The set returned is cached on the term and is immutable.
 
     Examples
     --------
@@ -303,7 +713,11 @@ def get_vars(t, unique=False) -> Union[List[Variable], Set[Variable]]:
     >>> get_vars(f(x, f(x, a)))
     [x, x]
     """
-    return _get_type(t, unique, Variable)
+    if unique:
+        return t.variables
+    if isinstance(t, FuncTerm) and t.ground:
+        return []
+    return _get_type(t, False, Variable)
 
 
 def get_constants(t, unique=False) -> Union[List[Constant], Set[Constant]]:
@@ -365,7 +779,7 @@ def depth(t: Term, depth_level: int = 0):
     t : Term
       The term to check the depth of.
     depth_level: int
-      Used internally to keep track of the recursion
+      Offset added to the depth of the term.
 
     Examples
     --------
@@ -376,13 +790,9 @@ def depth(t: Term, depth_level: int = 0):
     >>> depth(f(f(x,a), f(x,a)))
     2
     """
-    if isinstance(t, (Variable, Constant, Function)):
+    if isinstance(t, Function):
         return depth_level
-    # Assume FuncTerm
-    max_depth = 0
-    for ti in t.arguments:
-        max_depth = max(max_depth, depth(ti, depth_level + 1))
-    return max_depth
+    return depth_level + t.depth
 
 def count_occurence(subterm: Term, term: Term):
     """
@@ -398,14 +808,11 @@ def count_occurence(subterm: Term, term: Term):
     >>> count_occurence(h(x), f(h(x), f(x, h(x))))
     2
     """
-    if subterm == term:
-        return 1
-    if isinstance(term, (Variable, Constant)):
-        return 0
-    count = 0
-    for t in term.arguments:
-        count += count_occurence(subterm, t)
-    return count
+    # A larger term cannot occur within a subterm
+    def may_contain(t: FuncTerm) -> bool:
+        return t != subterm and subterm.size < t.size and \
+            subterm.variables <= t.variables
+    return sum(1 for t in preorder(term, may_contain) if t == subterm)
 
 #
 ## Equation
@@ -0,0 +1,23 @@
+from symcollab.algebra import *
+from symcollab.algebra.dag import TermDAG
+import unittest
+
+class TestDAG(unittest.TestCase):
+    def test(self):
+        f = Function("f", 2)
+        g = Function("g", 2)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(g(x, a), g(x, a))
+        d = TermDAG(t)
+        self.assertEqual(d.nodes, [t, g(x, a), x, a])
+        self.assertEqual(d.children[0], (1, 1))
+        self.assertEqual(d.parents(g(x, a)), [t])
+        self.assertEqual(d.parents(x), [g(x, a)])
+        self.assertEqual(d.parents(t), [])
+        self.assertEqual(d.parents(f(x, x)), [])
+        self.assertEqual(d.leaves(), [x, a])
+        self.assertEqual(d.edge_labels[(t, g(x, a))], "0, 1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+from symcollab.algebra import *
+from symcollab.algebra.encoding import TermArray
+import unittest
+
+class TestEncoding(unittest.TestCase):
+    def test(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        terms = [f(x, a), f(g(f(x, a)), y), a, g(f(x, a))]
+        encoded = TermArray.from_terms(terms)
+        self.assertEqual(len(encoded), 4)
+        self.assertEqual(encoded.to_terms(), terms)
+        self.assertIs(encoded[1], terms[1])
+        self.assertListEqual(list(encoded.lengths), [t.size for t in terms])
+        self.assertListEqual(list(encoded.count_occurence(f(x, a))), [1, 1, 0, 1])
+        self.assertListEqual(list(encoded.occurs(g(x))), [False] * 4)
+        self.assertListEqual(list(encoded.equals(g(f(x, a)))), [False, False, False, True])
+        self.assertListEqual(encoded.variables(), [{x}, {x, y}, set(), {x}])
+        hashes = TermArray.from_terms(terms + [f(x, a)], encoded.table).hashes()
+        self.assertEqual(hashes[0], hashes[4])
+        self.assertEqual(len(set(hashes[:4].tolist())), 4)
+
+if __name__ == "__main__":
+    unittest.main()
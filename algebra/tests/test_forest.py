@@ -0,0 +1,42 @@
+from symcollab.algebra import *
+from symcollab.algebra.forest import Term_Forest, expand_forest
+from itertools import islice
+import unittest
+
+class TestForest(unittest.TestCase):
+    def setUp(self):
+        f = Function("f", 1)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        c = Constant("c")
+        self.terms = f, g, x, y, z, c
+        self.seed = [Equation(f(x), y), Equation(y, g(z)), Equation(z, c)]
+
+    def test_forest(self):
+        f, g, x, y, z, c = self.terms
+        forest = Term_Forest(self.seed, 5)
+        self.assertEqual([root.term for root in forest.forest], [f(x), z])
+        self.assertEqual(Term_Forest.get_tree(forest.forest[0]), [f(x), y, g(z), g(c)])
+        self.assertEqual(forest.get_height(forest.forest[0]), 4)
+        self.assertEqual(forest.get_height(forest.forest[1]), 2)
+        self.assertIn(g(c), forest)
+        self.assertNotIn(f(c), forest)
+        self.assertEqual(forest, Term_Forest(self.seed, 5))
+
+    def test_max_height(self):
+        forest = Term_Forest(self.seed, 2)
+        self.assertEqual(forest.get_height(forest.forest[0]), 2)
+        self.assertEqual(len(Term_Forest.get_tree(forest.forest[0])), 2)
+
+    def test_breadth_first(self):
+        f, _, x, _, _, c = self.terms
+        # Grows forever without a height limit
+        nodes = list(islice(expand_forest([Equation(x, c), Equation(f(c), c)], 1000), 6))
+        self.assertEqual([node.depth for node in nodes], [0, 1, 2, 3, 3, 4])
+        self.assertEqual(nodes[3].term, f(x))
+        self.assertIs(nodes[3].parent, nodes[2])
+
+if __name__ == "__main__":
+    unittest.main()
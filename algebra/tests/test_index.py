@@ -0,0 +1,41 @@
+from symcollab.algebra import *
+import unittest
+
+class TestIndex(unittest.TestCase):
+    def test(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        terms = [f(x, a), f(a, y), f(b, b), g(x), f(x, x), f(g(a), b)]
+        index = DiscriminationTree(terms)
+        self.assertEqual(len(index), len(terms))
+        self.assertSetEqual(set(index.generalizations(f(a, a))), {f(x, a), f(a, y), f(x, x)})
+        self.assertSetEqual(set(index.generalizations(g(b))), {g(x)})
+        self.assertSetEqual(set(index.instances(f(x, b))), {f(b, b), f(g(a), b)})
+        self.assertSetEqual(set(index.instances(y)), set(terms))
+        self.assertSetEqual(set(index.unifiable(f(g(y), b))), {f(x, x), f(g(a), b)})
+        self.assertIn(f(x, x), index)
+        self.assertNotIn(f(y, y), index)
+
+        index.delete(f(x, x))
+        self.assertNotIn(f(x, x), index)
+        self.assertSetEqual(set(index.generalizations(f(a, a))), {f(x, a), f(a, y)})
+        self.assertRaises(KeyError, index.delete, f(x, x))
+
+    def test_values(self):
+        f = Function("f", 1)
+        x = Variable("x")
+        a = Constant("a")
+        index = DiscriminationTree()
+        index.insert(f(x), "r1")
+        index.insert(f(x), "r2")
+        index.insert(f(a), "r3")
+        self.assertEqual(sorted(index.generalizations(f(a))), ["r1", "r2", "r3"])
+        index.delete(f(x), "r1")
+        self.assertEqual(sorted(index), ["r2", "r3"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,6 +18,27 @@ class TestParser(unittest.TestCase):
         self.assertEqual(p.parse("x"), x)
         with self.assertRaises(ValueError):
             p.add(Variable("a"))
+        with self.assertRaises(ValueError):
+            p.parse("f(x,b)")
+        with self.assertRaises(ValueError):
+            p.parse("f(x,a")
+        with self.assertRaises(ValueError):
+            p.parse("f(x)")
+
+    def test_parse_many(self):
+        f = Function("f", 2)
+        x = Variable("P[i]")
+        a = Constant("a")
+        p = Parser()
+        p.add(f)
+        p.add(x)
+        p.add(a)
+        lines = ["f(P[i], a)", "", "# comment", "f(a, f(P[i], a)) = P[i]"]
+        parsed = list(p.parse_many(lines))
+        self.assertEqual(parsed[0], f(x, a))
+        self.assertEqual(parsed[1], Equation(f(a, f(x, a)), x))
+        deep = "f(" * 2000 + "a" + ", a)" * 2000
+        self.assertEqual(p.parse(deep).depth, 2000)
 
 if __name__ == "__main__":
     unittest.main()
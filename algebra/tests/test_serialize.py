@@ -0,0 +1,61 @@
+from io import BytesIO
+import os
+import tempfile
+from symcollab.algebra import *
+from symcollab.algebra.serialize import TermReader, TermWriter, dumps, loads
+import unittest
+
+class TestSerialize(unittest.TestCase):
+    def test(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        t = f(f(x, a), f(x, a))
+        self.assertIs(loads(dumps(t)), t)
+        sigma = SubstituteTerm()
+        sigma.add(x, f(y, a))
+        sigma.add(y, a)
+        values = [
+            t, Equation(x, t), sigma, None, True, -3, 2.5, "text",
+            [x, (a, 1)], {t: [sigma]}, ValueError("error")
+        ]
+        stream = BytesIO()
+        writer = TermWriter(stream)
+        for value in values:
+            writer.write(value)
+        stream.seek(0)
+        read = list(TermReader(stream))
+        self.assertEqual(read[:3], values[:2] + [read[2]])
+        self.assertEqual(read[2].subs, sigma.subs)
+        self.assertEqual(read[3:9], values[3:9])
+        self.assertEqual(read[9][t][0].subs, sigma.subs)
+        self.assertIsInstance(read[10], ValueError)
+        # Repeated subterms are only stored once
+        self.assertLess(len(dumps([t] * 10)), 2 * len(dumps(t)))
+
+    def test_append(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "terms.bin")
+            # An empty file starts a new stream
+            open(path, "wb").close()
+            with TermWriter.append(path) as writer:
+                writer.write(f(x, a))
+            with TermWriter.append(path) as writer:
+                writer.write(f(f(x, a), a))
+            # A partial last record is dropped
+            with TermWriter.append(path) as writer:
+                writer.write(f(a, f(x, x)))
+            partial = os.path.getsize(path) - 1
+            os.truncate(path, partial)
+            with TermWriter.append(path) as writer:
+                self.assertLess(os.path.getsize(path), partial)
+                writer.write(f(a, a))
+            with TermReader.open(path) as reader:
+                self.assertEqual(list(reader), [f(x, a), f(f(x, a), a), f(a, a)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,6 +24,80 @@ class TestSubstitute(unittest.TestCase):
         # Need to surround the sigma multiplication in parenthesis
         # otherwise it won't compose and just both apply to f(x, b)
         self.assertEqual(f(x, b) * (sigma * sigma2), f(g(a, c), b))
+
+    def test_sharing(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        sigma = SubstituteTerm()
+        sigma.add(x, a)
+        untouched = f(y, f(a, y))
+        term = f(x, untouched)
+        self.assertEqual(term * sigma, f(a, untouched))
+        self.assertIs((term * sigma).arguments[1], untouched)
+        self.assertIs(untouched * sigma, untouched)
+
+    def test_triangular(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        w = Variable("w")
+        a = Constant("a")
+        sigma = TriangularSubstitution()
+        sigma.add(x, f(y, w))
+        sigma.add(y, z)
+        sigma.add(z, a)
+        self.assertEqual(x * sigma, f(a, w))
+        theta = SubstituteTerm()
+        theta.add(w, y)
+        sigma = sigma * theta
+        self.assertEqual(x * sigma, f(a, a))
+        self.assertEqual(unravel(f(x, z), sigma), f(f(a, a), a))
+        resolved = sigma.to_substitute_term()
+        self.assertEqual(len(resolved), 4)
+        self.assertEqual(f(x, w) * resolved, f(f(a, a), a))
+        self.assertRaises(ValueError, sigma.add, x, a)
+        cyclic = TriangularSubstitution()
+        cyclic.add(x, f(y, a))
+        cyclic.add(y, x)
+        self.assertEqual(w * cyclic, w)
+        self.assertRaises(ValueError, cyclic, x)
+
+    def test_triangular_shared(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        b = Constant("b")
+        sigma = TriangularSubstitution()
+        sigma.add(x, f(y, z))
+        sigma.add(y, z)
+        self.assertEqual(x * sigma, f(z, z))
+        theta = SubstituteTerm()
+        theta.add(z, a)
+        composed = sigma * theta
+        self.assertEqual(x * composed, f(a, a))
+        # The substitutions composed from sigma don't change it
+        self.assertEqual(x * sigma, f(z, z))
+        self.assertEqual(len(sigma), 2)
+        sigma.add(z, b)
+        self.assertEqual(x * sigma, f(b, b))
+        self.assertEqual(x * composed, f(a, a))
+        self.assertEqual(composed.domain(), [x, y, z])
+
+    def test_long_chain(self):
+        f = Function("f", 2)
+        a = Constant("a")
+        n = 3000
+        xs = [Variable(f"x_{i}") for i in range(n + 1)]
+        sigma = TriangularSubstitution()
+        for i in range(n):
+            sigma.add(xs[i], f(xs[i + 1], a))
+        self.assertEqual(unravel(xs[0], sigma).depth, n)
+        self.assertEqual(unravel(xs[0], sigma.to_substitute_term()).depth, n)
         
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+from copy import deepcopy
 from symcollab.algebra import *
 import unittest
 
@@ -26,5 +27,88 @@ class TestTerm(unittest.TestCase):
         self.assertListEqual(get_vars_or_constants(f(x, f(a, b))), [x, a, b])
         self.assertEqual(depth(f(f(x,a), f(x,a))), 2)
 
+    def test_interning(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        self.assertIs(f(x, a), f(x, a))
+        self.assertIs(Function("f", 2)(x, Constant("a")), f(x, a))
+        self.assertEqual(FuncTerm(f, (x, a)), f(x, a))
+        self.assertEqual(hash(FuncTerm(f, (x, a))), hash(f(x, a)))
+        self.assertNotEqual(f(x, a), f(a, x))
+        # Shared nodes can't be changed under the terms containing them
+        t = f(f(x, a), a)
+        with self.assertRaises(AttributeError):
+            f(x, a).arguments = (a, a)
+        self.assertEqual(t, f(f(x, a), a))
+
+    def test_metadata(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        t = f(f(x, a), f(y, f(x, a)))
+        self.assertEqual(t.variables, frozenset({x, y}))
+        self.assertEqual(get_vars(t, unique=True), {x, y})
+        self.assertEqual(t.size, 9)
+        self.assertEqual(t.depth, 3)
+        self.assertFalse(t.ground)
+        self.assertTrue(f(a, a).ground)
+        self.assertIn(f(x, a), t)
+        self.assertNotIn(t, t)
+        self.assertEqual(count_occurence(f(x, a), t), 2)
+
+    def test_traversal(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(f(x, a), a)
+        self.assertEqual(list(preorder(t)), [t, f(x, a), x, a, a])
+        self.assertEqual(list(postorder(t)), [x, a, f(x, a), a, t])
+        self.assertEqual(list(preorder(t, lambda s: s == t)), [t, f(x, a), a])
+        self.assertEqual(fold(t, lambda s, sizes: 1 + sum(sizes)), t.size)
+        self.assertEqual(rebuild(t, lambda s: a if s == x else None), f(f(a, a), a))
+
+    def test_positions(self):
+        f = Function("f", 2)
+        g = Function("g", 11)
+        x = Variable("x")
+        a = Constant("a")
+        t = f(f(x, a), a)
+        self.assertEqual(Position('12'), (1, 2))
+        self.assertEqual(subterm_at(t, Position((1, 2))), a)
+        self.assertEqual(subterm_at(t, ()), t)
+        self.assertRaises(ValueError, subterm_at, t, (1, 1, 1))
+        self.assertRaises(ValueError, subterm_at, t, (3,))
+        u = replace_at(t, (1, 1), a)
+        self.assertEqual(u, f(f(a, a), a))
+        self.assertIs(u.arguments[1], t.arguments[1])
+        self.assertEqual([pos for pos, _ in positions(t)], [(), (1,), (1, 1), (1, 2), (2,)])
+        self.assertIs(positions(t), positions(t))
+        # Arities of ten or more
+        s = g(*([a] * 10 + [x]))
+        self.assertEqual(subterm_at(s, (11,)), x)
+        self.assertEqual(replace_at(s, (11,), a), g(*([a] * 11)))
+
+    def test_deep_terms(self):
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        n = 5000
+        t = x
+        for _ in range(n):
+            t = f(t, a)
+        self.assertEqual(depth(t), n)
+        self.assertEqual(t.size, 2 * n + 1)
+        self.assertEqual(get_vars(t), [x])
+        self.assertEqual(len(get_constants(t)), n)
+        self.assertIn(f(x, a), t)
+        self.assertEqual(count_occurence(f(x, a), t), 1)
+        self.assertEqual(deepcopy(t), t)
+        sigma = SubstituteTerm()
+        sigma.add(x, y)
+        self.assertEqual(get_vars(t * sigma), [y])
+
 if __name__ == "__main__":
     unittest.main()
@@ -27,4 +27,4 @@ r = RewriteRule(f(x, x), x)
 print("Result:", r.apply(term))
 
 print("Applying f(x, x) -> x to f(f(x, x), f(x,x)) at position 2")
-print("Result:", r.apply(term, '2'))
\ No newline at end of file
+print("Result:", r.apply(term, (2,)))
\ No newline at end of file
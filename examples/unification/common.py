@@ -2,7 +2,7 @@ from collections import Counter
 from typing import Set
 
 from symcollab.algebra import Equation, SubstituteTerm, get_vars, unravel
-from symcollab.Unification.equiv import syntactic_equal
+from symcollab.Unification.equiv import syntactic_equal_any
 
 def check_domain(problem: Set[Equation], unifier: SubstituteTerm):
     """
@@ -101,7 +101,7 @@ def print_unique_sol(sol: Set[SubstituteTerm], print_num: int = 3):
     sol_iter = iter(sol)
     unique_sols = {next(sol_iter)}
     for s in sol_iter:
-        if all((not syntactic_equal(s, us) for us in unique_sols)):
+        if not syntactic_equal_any(s, unique_sols):
             unique_sols.add(s)
     print("Unique Solutions:", len(unique_sols))
 
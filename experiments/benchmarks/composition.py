@@ -0,0 +1,38 @@
+"""
+Benchmarks the triangular substitution store against
+eager composition of idempotent substitutions.
+
+Builds the chain x_0 -> f(x_1, a), ..., x_{n-1} -> f(x_n, a)
+one binding at a time, the way syntactic unification and
+MOOProgram grow their substitutions, and then resolves x_0.
+"""
+from timeit import timeit
+from symcollab.algebra import Constant, Function, SubstituteTerm, TriangularSubstitution, Variable
+
+REPEAT = 5
+
+f = Function("f", 2)
+a = Constant("a")
+
+def eager(n):
+    xs = [Variable(f"x_{i}") for i in range(n + 1)]
+    sigma = SubstituteTerm()
+    for i in reversed(range(n)):
+        theta = SubstituteTerm()
+        theta.add(xs[i], f(xs[i + 1], a))
+        sigma = theta * sigma
+    return xs[0] * sigma
+
+def triangular(n):
+    xs = [Variable(f"x_{i}") for i in range(n + 1)]
+    sigma = TriangularSubstitution()
+    for i in range(n):
+        sigma.add(xs[i], f(xs[i + 1], a))
+    return xs[0] * sigma
+
+if __name__ == "__main__":
+    for n in (50, 100, 200, 400, 800):
+        assert eager(n) == triangular(n)
+        eager_time = timeit(lambda: eager(n), number=REPEAT) / REPEAT
+        triangular_time = timeit(lambda: triangular(n), number=REPEAT) / REPEAT
+        print(f"chain (n={n:<3})  eager: {eager_time:9.4f}s  triangular: {triangular_time:9.4f}s  speedup: {eager_time / triangular_time:6.1f}x")
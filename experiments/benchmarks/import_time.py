@@ -0,0 +1,93 @@
+"""
+Benchmarks the cold start time of the symcollab namespace,
+as reported by the -X importtime option of the interpreter.
+
+With --check, exits with a non-zero status when a module takes
+longer than its budget or regresses past a stored baseline:
+
+    python import_time.py --save-baseline baseline.json
+    python import_time.py --check --baseline baseline.json
+    python import_time.py --check --budget symcollab.moe=200
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = ['symcollab.algebra', 'symcollab.Unification', 'symcollab.moe']
+REPEAT = 5
+
+# Cold start budget of each module in milliseconds
+BUDGET = {
+    'symcollab.algebra': 100,
+    'symcollab.Unification': 150,
+    'symcollab.moe': 250,
+}
+
+def import_time(module):
+    """
+    Imports a module in a fresh interpreter and returns
+    its cumulative import time in microseconds.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise ValueError(f"No import time reported for {module}")
+
+def regressions(timings, budget, baseline, tolerance):
+    """The modules slower than their budget or than their baseline by more than the tolerance."""
+    failures = list()
+    for module, elapsed in timings.items():
+        if module in budget and elapsed > budget[module] * 1000:
+            failures.append(f"{module} took {elapsed / 1000:.1f}ms, over its budget of {budget[module]}ms")
+        if module in baseline and elapsed > baseline[module] * (1 + tolerance):
+            failures.append(
+                f"{module} took {elapsed / 1000:.1f}ms, over its baseline "
+                f"of {baseline[module] / 1000:.1f}ms by more than {tolerance:.0%}"
+            )
+    return failures
+
+def parse_budget(value):
+    module, _, milliseconds = value.partition("=")
+    return module, float(milliseconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--check", action="store_true",
+                        help="exit with a non-zero status if a module regresses")
+    parser.add_argument("--budget", action="append", type=parse_budget, default=[],
+                        metavar="MODULE=MS", help="override the budget of a module")
+    parser.add_argument("--baseline", help="a JSON file of import times to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="how much slower than the baseline is allowed, 0.25 by default")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the import times as a baseline")
+    args = parser.parse_args()
+
+    timings = dict()
+    for module in MODULES:
+        # Take the best of a few runs to reduce noise
+        timings[module] = min(import_time(module) for _ in range(REPEAT))
+        print(f"{module:<24} {timings[module] / 1000:8.1f}ms")
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w") as f:
+            json.dump(timings, f, indent=2)
+
+    if args.check:
+        budget = dict(BUDGET)
+        budget.update(args.budget)
+        baseline = dict()
+        if args.baseline is not None:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        failures = regressions(timings, budget, baseline, args.tolerance)
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        sys.exit(1 if failures else 0)
@@ -0,0 +1,59 @@
+"""
+Benchmarks the searches of narrow on reachability queries
+under commutativity and associativity of a symbol, along
+with rules that grow terms. The goals are found by random
+walks of increasing length from the starting term.
+
+Breadth-first search keeps at most MAX_VARIANTS variants
+and is reported as failed once it runs out.
+"""
+import random
+from time import perf_counter
+from symcollab.algebra import Constant, Function, Variable
+from symcollab.rewrite import narrow, RewriteRule, RewriteSystem, size_difference
+
+MAX_VARIANTS = 200000
+
+f = Function("f", 2)
+g = Function("g", 1)
+h = Function("h", 1)
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+a = Constant("a")
+b = Constant("b")
+c = Constant("c")
+
+rules = RewriteSystem({
+    RewriteRule(f(x, y), f(y, x)),
+    RewriteRule(f(f(x, y), z), f(x, f(y, z))),
+    RewriteRule(g(x), h(x)),
+    RewriteRule(h(x), g(g(x)))
+})
+
+def random_walk(term, steps, rng):
+    rule_list = sorted(rules, key=str)
+    for _ in range(steps):
+        rewrites = [new_t for rule in rule_list for _, new_t in rule.rewrites(term)]
+        term = rng.choice(rewrites)
+    return term
+
+def timed(search, term, goal, **kwargs):
+    start = perf_counter()
+    steps = narrow(term, goal, rules, max_variants=MAX_VARIANTS, search=search, **kwargs)
+    return perf_counter() - start, steps
+
+def show(elapsed, steps):
+    if steps is None:
+        return "       failed"
+    return f"{elapsed:8.4f}s ({len(steps)})"
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    term = f(f(g(a), b), f(c, h(b)))
+    for length in (8, 12, 16, 20, 24):
+        goal = random_walk(term, length, rng)
+        bfs = timed("breadth-first", term, goal)
+        bidirectional = timed("bidirectional", term, goal)
+        best_first = timed("best-first", term, goal, heuristic=size_difference)
+        print(f"walk of {length:2}  breadth-first: {show(*bfs)}  bidirectional: {show(*bidirectional)}  best-first: {show(*best_first)}")
@@ -0,0 +1,76 @@
+"""
+Benchmarks normalization with one-way matching against the
+way RewriteRule used to find redexes: renaming the rule apart
+from the term, freezing the term and unifying the hypothesis
+with it, while attempting every rule at every position.
+
+Normalizes products of Peano numerals with the usual
+rules for addition and multiplication, also comparing
+against innermost normalization with its normal form
+cache, starting from an empty cache every time.
+"""
+from copy import deepcopy
+from timeit import timeit
+from symcollab.algebra import Constant, Equation, Function, SubstituteTerm, Variable
+from symcollab.rewrite import freeze, normal, RewriteRule, RewriteSystem
+from symcollab.Unification import unify
+
+REPEAT = 3
+
+s = Function("s", 1)
+plus = Function("plus", 2)
+times = Function("times", 2)
+z = Constant("z")
+x = Variable("x")
+y = Variable("y")
+
+class UnificationRule(RewriteRule):
+    """Finds redexes by unifying the hypothesis with the frozen subterm."""
+    def _match(self, term):
+        overlap = (self.hypothesis.variables | self.conclusion.variables) & term.variables
+        renaming = SubstituteTerm()
+        for v in overlap:
+            renaming.add(v, Variable(v.symbol + "_1", v.sort))
+        hypothesis = deepcopy(self.hypothesis) * renaming
+        conclusion = deepcopy(self.conclusion) * renaming
+        sigma = unify({Equation(hypothesis, freeze(term))})
+        return conclusion * sigma if sigma is not False else None
+
+def unification_normal(element, rules):
+    """Normalizes by attempting every rule everywhere until none apply."""
+    element = deepcopy(element)
+    changed = True
+    while changed:
+        changed = False
+        for rule in rules:
+            new_elements = rule.apply(element)
+            if new_elements is not None:
+                element = next(iter(new_elements.values()))
+                changed = True
+                break
+    return element
+
+def peano_rules(rule_class):
+    return RewriteSystem({
+        rule_class(plus(z, y), y),
+        rule_class(plus(s(x), y), s(plus(x, y))),
+        rule_class(times(z, y), z),
+        rule_class(times(s(x), y), plus(y, times(x, y))),
+    })
+
+def numeral(n):
+    t = z
+    for _ in range(n):
+        t = s(t)
+    return t
+
+if __name__ == "__main__":
+    matching = peano_rules(RewriteRule)
+    unification = peano_rules(UnificationRule)
+    for n in (2, 4, 6, 8):
+        t = times(numeral(n), numeral(n))
+        assert normal(t, matching)[0] == unification_normal(t, unification) == numeral(n * n)
+        unification_time = timeit(lambda: unification_normal(t, unification), number=REPEAT) / REPEAT
+        matching_time = timeit(lambda: normal(t, matching), number=REPEAT) / REPEAT
+        cached_time = timeit(lambda: peano_rules(RewriteRule).normalize(t), number=REPEAT) / REPEAT
+        print(f"times(s^{n}(z), s^{n}(z))  unification: {unification_time:9.4f}s  matching: {matching_time:9.4f}s  innermost: {cached_time:9.4f}s  speedup: {unification_time / matching_time:6.1f}x / {unification_time / cached_time:6.1f}x")
@@ -0,0 +1,80 @@
+"""
+Benchmarks substitution application on repeated
+application until a fixpoint and on the eliminate rule of syntactic unification.
+
+Compares the current copy-free application against the
+previous strategy of deep-copying the term and scanning
+the substitution set for every variable occurrence.
+"""
+from copy import deepcopy
+from timeit import timeit
+from symcollab.algebra import Constant, Equation, Function, SubstituteTerm, Variable
+from symcollab.Unification.common import eliminate
+
+REPEAT = 5
+
+f = Function("f", 2)
+a = Constant("a")
+
+def legacy_applysub(self, term):
+    """Substitution application prior to being copy-free."""
+    def helper(t):
+        if isinstance(t, Variable):
+            for sub_var, sub_term in self.subs:
+                if t == sub_var:
+                    return deepcopy(sub_term)
+            return t
+        if len(t.arguments) == 0:
+            return t
+        return type(t).intern(t.function, [helper(ti) for ti in t.arguments])
+    return helper(deepcopy(term))
+
+def fixpoint(t, s):
+    """Apply a substitution until you can't."""
+    ts = t * s
+    while t != ts:
+        t = ts
+        ts = t * s
+    return t
+
+def chain(n):
+    """x_0 -> f(x_1, a), ..., x_{n-1} -> f(x_n, a)"""
+    xs = [Variable(f"x_{i}") for i in range(n + 1)]
+    sigma = SubstituteTerm()
+    for i in range(n):
+        sigma.add(xs[i], f(xs[i + 1], a))
+    return xs[0], sigma
+
+def chain_equations(n):
+    """{x_0 = f(x_1, a), ..., x_{n-1} = f(x_n, a)}"""
+    xs = [Variable(f"x_{i}") for i in range(n + 1)]
+    return {Equation(xs[i], f(xs[i + 1], a)) for i in range(n)}
+
+def run_eliminate(equations):
+    sigma = SubstituteTerm()
+    new_equations, sigma = eliminate(equations, sigma)
+    while new_equations != equations:
+        equations = new_equations
+        new_equations, sigma = eliminate(equations, sigma)
+    return sigma
+
+def compare(label, func):
+    current_result = func()
+    current = timeit(func, number=REPEAT) / REPEAT
+    copy_free_applysub = SubstituteTerm._applysub
+    SubstituteTerm._applysub = legacy_applysub
+    try:
+        legacy_result = func()
+        legacy = timeit(func, number=REPEAT) / REPEAT
+    finally:
+        SubstituteTerm._applysub = copy_free_applysub
+    assert str(current_result) == str(legacy_result)
+    print(f"{label:<22} legacy: {legacy:9.4f}s  copy-free: {current:9.4f}s  speedup: {legacy / current:6.1f}x")
+
+if __name__ == "__main__":
+    for n in (25, 50, 100):
+        t, sigma = chain(n)
+        compare(f"fixpoint (n={n})", lambda: fixpoint(t, sigma))
+    for n in (10, 20, 40):
+        equations = chain_equations(n)
+        compare(f"eliminate (n={n})", lambda: run_eliminate(equations))
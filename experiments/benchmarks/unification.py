@@ -0,0 +1,91 @@
+"""
+Benchmarks syntactic unification with union-find against
+the rule-based procedure it replaced, which checks for
+cycles, clashes and eliminates one variable at a time,
+applying the substitution to every remaining equation.
+
+Deep problems chain variables through nested terms,
+wide problems are random equations over many variables.
+"""
+import random
+from timeit import timeit
+from symcollab.algebra import Constant, Equation, Function, SubstituteTerm, \
+    TriangularSubstitution, Variable
+from symcollab.Unification.common import (
+    occurs_check, function_clash, eliminate,
+    orient, decompose, delete_trivial
+)
+from symcollab.Unification.unif import unif
+
+REPEAT = 3
+
+f = Function("f", 2)
+g = Function("g", 1)
+h = Function("h", 3)
+a = Constant("a")
+b = Constant("b")
+
+def rule_based_unif(equations):
+    """Syntactic unification as it was done before union-find."""
+    sigma = TriangularSubstitution()
+    while len(equations) > 0:
+        if occurs_check(equations):
+            return False
+        if function_clash(equations):
+            return False
+        equations, sigma = eliminate(equations, sigma)
+        equations = orient(equations)
+        equations = decompose(equations)
+        equations = delete_trivial(equations)
+    return sigma.to_substitute_term()
+
+def deep_problem(n):
+    """
+    Left nested pairs of the variables x_i and y_i made equal,
+    with x_i = g(x_{i-1}) and x_0 = a.
+    """
+    xs = [Variable(f"x{i}") for i in range(n + 1)]
+    ys = [Variable(f"y{i}") for i in range(n + 1)]
+    left = xs[0]
+    right = ys[0]
+    for i in range(1, n + 1):
+        left = f(left, xs[i])
+        right = f(right, ys[i])
+    equations = {Equation(left, right), Equation(xs[0], a)}
+    equations |= {Equation(xs[i], g(xs[i - 1])) for i in range(1, n + 1)}
+    return equations
+
+def random_term(rng, variables, depth):
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(variables + [a, b])
+    function = rng.choice([f, g, h])
+    return function(*(random_term(rng, variables, depth - 1) for _ in range(function.arity)))
+
+def wide_problem(n, rng):
+    """
+    n equations between random terms and their instances by a
+    substitution of the first half of the variables with terms
+    over the second half, which is therefore a unifier.
+    """
+    variables = [Variable(f"v{i}") for i in range(n)]
+    theta = SubstituteTerm()
+    for v in variables[:n // 2]:
+        theta.add(v, random_term(rng, variables[n // 2:], 2))
+    equations = set()
+    for _ in range(n):
+        t = random_term(rng, variables, 3)
+        equations.add(Equation(t, t * theta))
+    return equations
+
+def compare(name, equations):
+    assert (rule_based_unif(set(equations)) is False) == (unif(set(equations)) is False)
+    rule_based_time = timeit(lambda: rule_based_unif(set(equations)), number=REPEAT) / REPEAT
+    union_find_time = timeit(lambda: unif(set(equations)), number=REPEAT) / REPEAT
+    print(f"{name:10} rule-based: {rule_based_time:9.4f}s  union-find: {union_find_time:9.4f}s  speedup: {rule_based_time / union_find_time:7.1f}x")
+
+if __name__ == "__main__":
+    for n in (10, 20, 40, 80):
+        compare(f"deep {n}", deep_problem(n))
+    rng = random.Random(0)
+    for n in (20, 80, 320):
+        compare(f"wide {n}", wide_problem(n, rng))
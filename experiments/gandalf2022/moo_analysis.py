@@ -5,20 +5,19 @@ from collections import defaultdict, Counter
 from enum import Enum
 from typing import Dict, Optional
 from symcollab.algebra import depth, Term
+from symcollab.algebra.serialize import TermReader
 from symcollab.moe.check import MOOCheckResult
 import os.path
-import pickle
 
-MOO_FILE = "1.pickle"
+MOO_FILE = "saved_moo_experiments_v4.bin"
 
 moo_tested: Optional[Dict[Term, Optional[MOOCheckResult]]] = None
 
 # Read current state from file if it exists
 if os.path.isfile(MOO_FILE):
     print("Reading file:", MOO_FILE)
-    with open(MOO_FILE, "rb") as reader:
-        picked_state = reader.read()
-        _, moo_tested = pickle.loads(picked_state)
+    with TermReader.open(MOO_FILE) as reader:
+        moo_tested = dict(reader)
 else:
     print(f"No save file '{MOO_FILE}' exists.")
 
@@ -6,7 +6,7 @@ from ac_benchmarks import benchmarks
 from symcollab.Unification.syntactic_ac_unification import (
     synt_ac_unif, enable_recording, get_timings, set_verbose
 )
-from symcollab.Unification.equiv import syntactic_equal
+from symcollab.Unification.equiv import syntactic_equal_any
 
 
 SOLUTION_BOUND = 100
@@ -37,7 +37,7 @@ for j, (solutions, timings) in enumerate(results):
     unique_timings = [timings[0]]
 
     for i in range(1, len(solutions_list)):
-        if all((not syntactic_equal(solutions_list[i], us) for us in unique_solutions)):
+        if not syntactic_equal_any(solutions_list[i], unique_solutions):
             unique_solutions.append(solutions_list[i])
             unique_timings.append(timings[i])
             if len(unique_solutions) >= UNIQUE_SOLUTION_BOUND:
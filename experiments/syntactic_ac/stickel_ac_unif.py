@@ -0,0 +1,21 @@
+"""
+Times Stickel's method on the Boudet
+and Contejean benchmarks, including the
+computation of the Hilbert basis, for the
+first unifier and for a complete set.
+"""
+from time import perf_counter
+from timeit import timeit
+from ac_benchmarks import benchmarks, f
+from symcollab.Unification.ac_unif import ac_unify, ac_unify_iter
+
+REPEAT = 10
+
+for i, benchmark in enumerate(benchmarks, 1):
+    unifiers = ac_unify(benchmark, f)
+    assert len(unifiers) > 0
+    time = timeit(lambda: ac_unify(benchmark, f), number=REPEAT) / REPEAT
+    start = perf_counter()
+    total = sum(1 for _ in ac_unify_iter(benchmark, f))
+    complete_time = perf_counter() - start
+    print(f"Benchmark {i:2}: first {time * 1000:7.2f}ms, all {total:6} in {complete_time:7.2f}s")
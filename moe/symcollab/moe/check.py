@@ -7,6 +7,8 @@ from typing import Callable, Dict, List, Optional, Union
 from symcollab.algebra import Constant, Function, SubstituteTerm, Term, Variable, unravel
 from symcollab.Unification.constrained.p_unif import p_unif
 from symcollab.Unification.constrained.xor_rooted_unif import XOR_rooted_security
+from symcollab.Unification.batch import unify_many
+from symcollab.Unification.cache import UnificationCache
 from symcollab.xor.structure import Zero
 from .program import MOOProgram
 from .collisions import find_collision
@@ -18,7 +20,9 @@ __all__ = ['moo_check']
 
 def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'every',
               unif_algo: Callable = p_unif, length_bound: int = 10,
-              knows_iv: bool = True, invert_check: bool = False) -> 'MOOCheckResult':
+              knows_iv: bool = True, invert_check: bool = False,
+              cache: Optional[UnificationCache] = None,
+              workers: Optional[int] = None) -> 'MOOCheckResult':
     """
     Simulates a MOOProgram interaction and checks if any conditions for security fails.
     Currently it checks syntactically and for collisions.
@@ -35,6 +39,14 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
       The maximum interactions to check for collisions. Default is 10.
     knows_iv: bool
       Whether or not the adversary knows the initialization vector.
+    invert_check: bool
+      Whether or not to check if the mode of operation is invertible.
+    cache: UnificationCache
+      If given, collisions are looked for through the cache, which
+      can be shared between checks of several modes of operation.
+    workers: int
+      If greater than one, the past ciphertexts are checked for
+      collisions across a pool of that many processes.
 
     Example
     -------
@@ -98,7 +110,9 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
                 ciphertext,
                 ciphertexts_received,
                 new_constraints,
-                unif_algo
+                unif_algo,
+                cache,
+                workers
             )
             if any_unifiers(collisions):
                 return MOOCheckResult(False, collisions, invertible, i)
@@ -113,7 +127,7 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
     # If the last block wasn't returned, we'll use the stop frame to check
     if result is None:
         ciphertext = unravel(last_result.message, last_result.substitutions)
-        collisions = search_for_collision(ciphertext, ciphertexts_received, constraints, unif_algo)
+        collisions = search_for_collision(ciphertext, ciphertexts_received, constraints, unif_algo, cache, workers)
         if any_unifiers(collisions):
             return MOOCheckResult(False, collisions, invertible, length_bound + 1)
 
@@ -124,20 +138,35 @@ def moo_check(moo_name: str = 'cipher_block_chaining', schedule_name: str = 'eve
 
 def search_for_collision(ciphertext: Term, previous_ciphertexts: List[Term],
                          constraints: Dict[Variable, List[Term]],
-                         unif_algo: Callable) -> Optional[Union[SubstituteTerm, List[SubstituteTerm]]]:
+                         unif_algo: Callable, cache: Optional[UnificationCache] = None,
+                         workers: Optional[int] = None) \
+                         -> Optional[Union[SubstituteTerm, List[SubstituteTerm]]]:
     """
     Search through the known ciphertext history and see if there are any collisions
     between the current ciphertext and a past one.
+    The past ciphertexts are checked across a pool of processes when workers
+    is greater than one, in which case the cache is not used.
     """
     if unif_algo == XOR_rooted_security:
         terms = deepcopy(previous_ciphertexts)
         terms.append(ciphertext)
+        if cache is not None:
+            return cache.solve(XOR_rooted_security, terms, constraints)
         unifiers = XOR_rooted_security(terms, constraints).solve()
         return unifiers
 
     collisions = None
+    if workers is not None and workers > 1:
+        problems = (
+            (known_ciphertext, ciphertext, constraints, unif_algo)
+            for known_ciphertext in previous_ciphertexts
+        )
+        for _, collisions in unify_many(problems, find_collision, workers, until=any_unifiers):
+            pass
+        return collisions
+
     for known_ciphertext in previous_ciphertexts:
-        collisions = find_collision(known_ciphertext, ciphertext, constraints, unif_algo)
+        collisions = find_collision(known_ciphertext, ciphertext, constraints, unif_algo, cache)
         if any_unifiers(collisions):
             return collisions
     return collisions
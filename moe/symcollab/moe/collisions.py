@@ -7,29 +7,41 @@ from symcollab.algebra import Equation, SubstituteTerm, Term, Variable
 from symcollab.Unification.constrained.p_unif import p_unif
 from symcollab.Unification.constrained.p_syntactic import p_syntactic
 from symcollab.Unification.constrained.xor_rooted_unif import XOR_rooted_security
+from symcollab.Unification.cache import UnificationCache
 from symcollab.xor.structure import Equations
 
 __all__ = ['find_collision']
 
 def find_collision(cipher_text1: Term, cipher_text2: Term,
                    constraints: Dict[Variable, List[Term]],
-                   unif_algo: Callable = p_unif) -> Optional[SubstituteTerm]:
+                   unif_algo: Callable = p_unif,
+                   cache: Optional[UnificationCache] = None) -> Optional[SubstituteTerm]:
     """
     Sets up a unification problem between two ciphertexts in order to see
     if there is a possible collision given some constraints.
+    The problem is solved through the cache when one is given.
     """
+    if cache is None:
+        solve = lambda algorithm, *problem: algorithm(*problem)
+    else:
+        solve = cache.solve
     if unif_algo == p_unif:
-        unifiers = unif_algo(
+        unifiers = solve(
+            unif_algo,
             Equations([Equation(cipher_text1, cipher_text2)]),
             constraints
         )
     elif unif_algo == XOR_rooted_security:
-        unifiers = unif_algo(
-            [cipher_text1, cipher_text2],
-            constraints
-        ).solve()
+        if cache is None:
+            unifiers = unif_algo(
+                [cipher_text1, cipher_text2],
+                constraints
+            ).solve()
+        else:
+            unifiers = cache.solve(unif_algo, [cipher_text1, cipher_text2], constraints)
     elif unif_algo == p_syntactic:
-        unifiers = unif_algo(
+        unifiers = solve(
+            unif_algo,
             cipher_text1,
             cipher_text2,
             constraints
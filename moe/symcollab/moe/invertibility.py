@@ -9,7 +9,6 @@ from symcollab.algebra import Constant, depth, Function, FuncTerm, Term, Variabl
 from symcollab.algebra.dag import TermDAG
 from symcollab.xor import xor
 from symcollab.moe.program import MOOProgram
-import numpy as np
 
 __all__ = ['invert_simple', 'moo_invert', 'deducible']
 
@@ -6,7 +6,7 @@ MOOProgram.
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Callable, List, Optional
-from symcollab.algebra import Constant, Term, SubstituteTerm, Variable
+from symcollab.algebra import Constant, Term, TriangularSubstitution, Variable
 from .schedule import MOO_Schedule
 from .moo import MOO
 
@@ -17,9 +17,11 @@ class MOOFrame:
     """
     Used by the MOOProgram to contain information about the ciphertext,
     and the substitutions we know about the older ciphertexts.
+    The substitutions are kept in triangular form, use unravel
+    or to_substitute_term to resolve them.
     """
     message: Term
-    substitutions: SubstituteTerm
+    substitutions: TriangularSubstitution
 
     def __str__(self):
         return str(self.substitutions)
@@ -51,7 +53,7 @@ class MOOProgram:
             raise ValueError(f"Schedule of name {schedule_name} is not found.")
         self.schedule: Callable = schedule
 
-        self.substitutions: SubstituteTerm = SubstituteTerm()
+        self.substitutions: TriangularSubstitution = TriangularSubstitution()
         self.iteration: int = 0
         # TODO: Maybe consider generating a uuid for the IV, so that
         # it is different across sessions?
@@ -60,6 +60,16 @@ def custom():
         response += ", MOO may not be Invertible"
     return render_page(response=response)
 
+# The signature is fixed, so the parser is shared across requests
+_moo_parser = Parser()
+_moo_parser.add(Function("f", 1))
+_moo_parser.add(xor)
+_moo_parser.add(Variable("P[i]"))
+_moo_parser.add(Variable("C[i]"))
+_moo_parser.add(Variable("C[i-1]"))
+_moo_parser.add(Constant("r"))
+_moo_parser.add(Constant("P[0]"))
+
 # TODO: Replace with a more robust parser
 def _temporary_parser(moo_string: str) -> Term:
     """
@@ -67,15 +77,7 @@ def _temporary_parser(moo_string: str) -> Term:
     supplied cryptographic mode of operation.
     This function is limited in what it can parse.
     """
-    parser = Parser()
-    parser.add(Function("f", 1))
-    parser.add(xor)
-    parser.add(Variable("P[i]"))
-    parser.add(Variable("C[i]"))
-    parser.add(Variable("C[i-1]"))
-    parser.add(Constant("r"))
-    parser.add(Constant("P[0]"))
-    return parser.parse(moo_string)
+    return _moo_parser.parse(moo_string)
 
 def _valid_moo_unif_pair(moo: Term, unif_choice) -> bool:
     """
@@ -0,0 +1,33 @@
+"""
+Guards the cold start of the symcollab namespace.
+Heavy dependencies should only be imported once the
+algorithm that needs them is used.
+"""
+import subprocess
+import sys
+from typing import Set
+import unittest
+
+MODULES = ['symcollab.algebra', 'symcollab.moe']
+
+HEAVY_MODULES = {'sympy', 'numpy', 'scipy', 'networkx', 'matplotlib', 'anytree', 'flask'}
+
+def imported_modules(module: str) -> Set[str]:
+    """
+    Imports a module in a fresh interpreter and returns
+    the names of every module that got imported.
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        capture_output=True, text=True, check=True
+    )
+    return set(process.stdout.split())
+
+class TestImportTime(unittest.TestCase):
+    def test_heavy_dependencies(self):
+        for module in MODULES:
+            imported = {name.split(".")[0] for name in imported_modules(module)}
+            self.assertSetEqual(imported & HEAVY_MODULES, set(), f"imported by {module}")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 """Contains modules relevant to rewrite theory."""
 from .rule import *
+from .automaton import *
 from .system import *
 from .variants import *
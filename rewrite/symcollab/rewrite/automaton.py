@@ -0,0 +1,154 @@
+"""
+This module compiles the hypotheses of a set of rewrite
+rules into a matching automaton, so a term can be matched
+against every rule in a single traversal.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from symcollab.algebra import FuncTerm, preorder, SubstituteTerm, Term, Variable
+from .rule import RewriteRule
+
+__all__ = ['MatchingAutomaton']
+
+def _label(term: Term) -> Optional[Tuple[Any, int]]:
+    """The root symbol of a term along with its arity."""
+    if isinstance(term, FuncTerm):
+        return (term.function, len(term.arguments))
+    return None
+
+
+class _State:
+    __slots__ = ('transitions', 'wildcard', 'accept')
+
+    def __init__(self):
+        # The state reached after reading each root symbol
+        self.transitions: Dict[Tuple[Any, int], '_State'] = dict()
+        # The state reached after binding a whole subterm to a variable
+        self.wildcard: Optional['_State'] = None
+        self.accept: List['_CompiledRule'] = list()
+
+
+class _CompiledRule:
+    """
+    A rule whose hypothesis ends at an accepting state. The subterms
+    bound along the way are numbered in the order they are read.
+    """
+    __slots__ = ('rule', 'slots', 'checks')
+
+    def __init__(self, rule: RewriteRule):
+        self.rule = rule
+        # The slot of the first occurrence of each variable
+        slots: Dict[Variable, int] = dict()
+        # Pairs of slots that must hold equal subterms
+        checks: List[Tuple[int, int]] = list()
+        slot = 0
+        for t in preorder(rule.hypothesis):
+            if isinstance(t, Variable):
+                if t in slots:
+                    checks.append((slots[t], slot))
+                else:
+                    slots[t] = slot
+                slot += 1
+        self.slots = tuple(slots.items())
+        self.checks = tuple(checks)
+
+    def bind(self, bound: List[Term]) -> Optional[SubstituteTerm]:
+        """Returns the matching substitution, or None if the bound subterms don't fit."""
+        for i, j in self.checks:
+            if bound[i] != bound[j]:
+                return None
+        subs = set()
+        for v, slot in self.slots:
+            t = bound[slot]
+            if v.sort != t.sort:
+                return None
+            if v != t:
+                subs.add((v, t))
+        sigma = SubstituteTerm()
+        sigma.subs = subs
+        return sigma
+
+
+class MatchingAutomaton:
+    """
+    A matching automaton compiled from the hypotheses of rewrite rules.
+
+    States dispatch on the root symbol of the next subterm read in
+    pre-order, and hypotheses with a common prefix share the states
+    that test it. Variables bind whole subterms into numbered slots
+    that are fixed when compiling, so matching only checks repeated
+    variables and sorts once a hypothesis is fully read.
+
+    Parameters
+    ----------
+    rules : Iterable[RewriteRule]
+        The rules to compile.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import Constant, Function, Variable
+    >>> from symcollab.rewrite import MatchingAutomaton, RewriteRule
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> automaton = MatchingAutomaton([RewriteRule(f(x, x), x), RewriteRule(f(a, x), b)])
+    >>> [str(rule) for rule, _ in automaton.matches(f(a, a))]
+    ['f(a, x) → b', 'f(x, x) → x']
+    >>> automaton.rewrite_root(f(b, b))
+    (f(x, x) → x, b)
+    """
+    def __init__(self, rules: Iterable[RewriteRule]):
+        self._start = _State()
+        for rule in rules:
+            self._add(rule)
+
+    def _add(self, rule: RewriteRule):
+        state = self._start
+        for t in preorder(rule.hypothesis):
+            if isinstance(t, Variable):
+                if state.wildcard is None:
+                    state.wildcard = _State()
+                state = state.wildcard
+            else:
+                state = state.transitions.setdefault(_label(t), _State())
+        state.accept.append(_CompiledRule(rule))
+
+    def matches(self, term: Term) -> Iterator[Tuple[RewriteRule, SubstituteTerm]]:
+        """
+        Yields every rule whose hypothesis matches the term along with
+        the matching substitution. Hypotheses that test more symbols
+        before binding a variable are tried first.
+        """
+        # The subterms left to read and the subterms bound so far are
+        # linked lists of (term, rest) pairs shared between branches.
+        stack = [(self._start, (term, None), None)]
+        while stack:
+            state, pending, bound = stack.pop()
+            if pending is None:
+                if len(state.accept) > 0:
+                    slots: List[Term] = list()
+                    while bound is not None:
+                        t, bound = bound
+                        slots.append(t)
+                    slots.reverse()
+                    for compiled in state.accept:
+                        sigma = compiled.bind(slots)
+                        if sigma is not None:
+                            yield compiled.rule, sigma
+                continue
+            t, rest = pending
+            if state.wildcard is not None:
+                stack.append((state.wildcard, rest, (t, bound)))
+            label = _label(t)
+            if label is not None:
+                next_state = state.transitions.get(label)
+                if next_state is not None:
+                    for arg in reversed(t.arguments):
+                        rest = (arg, rest)
+                    stack.append((next_state, rest, bound))
+
+    def rewrite_root(self, term: Term) -> Optional[Tuple[RewriteRule, Term]]:
+        """Rewrites the root of a term with the first rule that matches it."""
+        for rule, sigma in self.matches(term):
+            return rule, rule.conclusion * sigma
+        return None
@@ -1,139 +1,224 @@
 """
-DO NOT USE.
-Module to contain code for forward closure by Daniel Kemp
-in case Brandon ever gets back to integrating it into
-the RewriteSystem module.
+Module for computing the forward closure of a rewrite system,
+based on the procedure by Daniel Kemp.
+
+The forward closure of a convergent rewrite system R repeatedly
+overlaps the conclusions of the newest rules with the hypotheses
+of R at non-variable positions. It is finite exactly when an
+iteration stops producing non-redundant rules, which is used to
+decide the finite variant property of a theory.
 """
-from copy import deepcopy
-from typing import List, Optional
-from symcollab.algebra import Constant, Variable, Term, Equation
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set
+from symcollab.algebra import DiscriminationTree, Equation, Position, positions, \
+    rebuild, replace_at, subterm_at, Term, Variable
 from symcollab.Unification.unif import unif
-from .rule import RewriteRule
-from .system import RewriteSystem, normal
+from .rule import match, RewriteRule
+from .system import RewriteSystem
 
+__all__ = ['fpos', 'overlap', 'check_redundancy', 'ClosureStatistics', 'ForwardClosure', 'forward_closure']
 
-def fpos(term: Term):
+def fpos(term: Term) -> List[Position]:
     """
     Return a list of sub non-variable positions of a given term
     """
-    return fpos_aux(term, None, None)
-
-def fpos_aux(term, parent, index):
-    """
-    Main code of fpos, passes along position and index parameters
+    return [pos for pos, t in positions(term) if not isinstance(t, Variable)]
+
+def _rename_apart(rule: RewriteRule, avoid: Set[Variable]) -> RewriteRule:
+    """Renames the variables of a rule so that none of them are in avoid."""
+    variables = rule.hypothesis.variables | rule.conclusion.variables
+    if variables.isdisjoint(avoid):
+        return rule
+    taken = set(avoid) | variables
+    renaming: Dict[Variable, Variable] = dict()
+    for v in variables:
+        symbol = v.symbol
+        while Variable(symbol, v.sort) in taken:
+            symbol += "'"
+        renaming[v] = Variable(symbol, v.sort)
+        taken.add(renaming[v])
+    rename = lambda t: renaming.get(t) if isinstance(t, Variable) else None
+    return RewriteRule(rebuild(rule.hypothesis, rename), rebuild(rule.conclusion, rename))
+
+def overlap(rule1: RewriteRule, rule2: RewriteRule, rs: RewriteSystem,
+            position: Position) -> Optional[RewriteRule]:
     """
-    if parent is None:
-        position = []
-    else:
-        position = parent + [index]
-    if isinstance(term, Variable):
-        return []
-    child_positions = []
-    index = 0
-    for child in term.arguments:
-        child_positions += fpos_aux(child, position, index)
-        index += 1
-    return [position] + child_positions
-
-def get_sub_term(term, input_position):
-    """ Get the term at a position, uses the format that fpos returns """
-    if input_position == [] or isinstance(term, (Variable, Constant)):
-        return term
-    return get_sub_term(
-        term.arguments[input_position[0]],
-        input_position[1:]
-    )
-
-def replace(term, position, subterm):
-    """Replace the term at a given position."""
-    new_term = deepcopy(term)
-    new_subterm = new_term
-    for pos in position[:-1]:
-        new_subterm = new_subterm.arguments[pos]
-    new_subterm_args = list(new_subterm.arguments)
-    new_subterm_args[position[-1]] = subterm
-    new_subterm.arguments = tuple(new_subterm_args)
-    return new_term
-
-
-def overlap(rule1, rule2, rs, position):
+    Overlaps the conclusion of a rule at a position with the hypothesis
+    of a second rule, then normalizes the conclusion of the outcome with
+    a convergent rewrite system. Returns None if they don't overlap.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import Constant, Function, Variable
+    >>> from symcollab.rewrite import RewriteRule, RewriteSystem
+    >>> f = Function("f", 1)
+    >>> g = Function("g", 1)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> r1 = RewriteRule(f(x), g(x))
+    >>> r2 = RewriteRule(g(a), b)
+    >>> overlap(r1, r2, RewriteSystem({r1, r2}), ())
+    f(a) → b
     """
-    UNFINISHED
-    Overlaps a rule at a position with a second rule, then reduces the
-    outcome against an initial set of rules.
+    rule2 = _rename_apart(rule2, rule1.hypothesis.variables | rule1.conclusion.variables)
+    unifier = unif({Equation(subterm_at(rule1.conclusion, position), rule2.hypothesis)})
+    if unifier is False:
+        return None
+    new_left = rule1.hypothesis * unifier
+    new_right = replace_at(rule1.conclusion, position, rule2.conclusion) * unifier
+    return RewriteRule(new_left, rs.normalize(new_right))
+
+def check_redundancy(rule: RewriteRule, closure: DiscriminationTree, rs: RewriteSystem) -> bool:
     """
-    rule1_copy = deepcopy(rule1)
-    rule2_copy = deepcopy(rule2)
-
-    right = get_sub_term(rule1_copy.conclusion, position)
-    left = rule2_copy.hypothesis
-    unifiers = unif({Equation(left, right)})
-    print("Left", left)
-    print("Right", right)
-    print(unifiers)
-    if unifiers is False:
-        return False
+    Checks redundancy of a rule against the rules in a closure,
+    indexed by their hypotheses.
 
+    A rule is redundant when it rewrites a term to itself, when the
+    rewrite system reduces its hypothesis below the root, or when it
+    is an instance of a rule in the closure.
+    """
+    if rule.hypothesis == rule.conclusion:
+        return True
+    for pos, t in positions(rule.hypothesis):
+        if pos != () and not isinstance(t, Variable) and rs.normalize(t) != t:
+            return True
+    for other in closure.generalizations(rule.hypothesis):
+        sigma = match(other.hypothesis, rule.hypothesis)
+        if sigma is not None and other.conclusion * sigma == rule.conclusion:
+            return True
+    return False
 
-    new_left = deepcopy(rule1_copy.hypothesis)
-    new_left = new_left * unifiers
 
-    new_right = deepcopy(rule1_copy.conclusion)
-    new_right = replace(new_right, position, rule2_copy.conclusion)
-    new_right = new_right * unifiers
-    new_right = normal(new_right, rs)[0]
+@dataclass
+class ClosureStatistics:
+    """
+    Progress of one iteration of the forward closure.
+
+    Parameters
+    ==========
+    iteration
+      The number of the iteration, starting at 1.
+    candidates
+      The pairs of positions and rules retrieved from the index.
+    overlaps
+      The candidates which actually overlap.
+    redundant
+      The overlaps discarded as redundant.
+    new_rules
+      The rules added to the closure.
+    rules
+      The number of rules in the closure afterwards.
+    """
+    iteration: int
+    candidates: int
+    overlaps: int
+    redundant: int
+    new_rules: int
+    rules: int
 
-    return RewriteRule(new_left, new_right)
 
-def check_redundancy(rule: RewriteRule, redundancy_rules: List[RewriteRule]):
+class ForwardClosure:
     """
-    UNFINISHED
-    Checks redundancy of a rule against a set of redundancy rules.
+    Incrementally computes the forward closure of a convergent rewrite system.
+
+    Each iteration overlaps the conclusions of the rules added by the
+    previous iteration with the hypotheses of the original rules. The
+    non-variable positions of those conclusions are kept in a discrimination
+    tree, so only the positions that may unify with a hypothesis are tried.
+    The hypotheses of the closure are indexed as well, to find the rules
+    that may subsume an overlap. Conclusions are normalized by the original
+    system, whose normal forms are remembered across iterations.
+
+    Parameters
+    ----------
+    rs : RewriteSystem
+      A convergent rewrite system.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import Constant, Function, Variable
+    >>> from symcollab.rewrite import RewriteRule, RewriteSystem
+    >>> f = Function("f", 1)
+    >>> g = Function("g", 1)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> b = Constant("b")
+    >>> fc = ForwardClosure(RewriteSystem({RewriteRule(f(x), g(x)), RewriteRule(g(a), b)}))
+    >>> fc.step()
+    ClosureStatistics(iteration=1, candidates=1, overlaps=1, redundant=0, new_rules=1, rules=3)
+    >>> fc.step()
+    ClosureStatistics(iteration=2, candidates=0, overlaps=0, redundant=0, new_rules=0, rules=3)
+    >>> fc.saturated
+    True
     """
-    for redundancy_rule in redundancy_rules:
-        hypothesis_unifiers = unif({Equation(redundancy_rule.hypothesis, rule.hypothesis)})
-        conclusion_unifiers = unif({Equation(redundancy_rule.conclusion, rule.conclusion)})
-
-        if hypothesis_unifiers is not False and conclusion_unifiers is not False:
-            # If all substitutions in conclusion_unifiers present in hypothesis unifiers, return True
-            if all(((var, term) in hypothesis_unifiers.subs for var, term in zip(*conclusion_unifiers.subs))):
-                return True
-
-        for position in fpos(rule.hypothesis)[1:]:
-            unifiers = unif({Equation(redundancy_rule.hypothesis, get_sub_term(rule.hypothesis, position))})
-            if unifiers is not False:
-                return True
-    return False
+    def __init__(self, rs: RewriteSystem):
+        self.rules = RewriteSystem(set(rs.rules))
+        self.closure = RewriteSystem(set(rs.rules))
+        self.statistics: List[ClosureStatistics] = list()
+        self.saturated = False
+        # The rules added by the latest iteration, to be overlapped next
+        self._newest: List[RewriteRule] = list(self.closure.rules)
+        self._closure_index = DiscriminationTree()
+        for rule in self.closure.rules:
+            self._closure_index.insert(rule.hypothesis, rule)
+
+    def step(self) -> ClosureStatistics:
+        """Runs one iteration of the forward closure."""
+        # Index the non-variable positions of the newest conclusions
+        conclusions = DiscriminationTree()
+        for rule in self._newest:
+            for pos in fpos(rule.conclusion):
+                conclusions.insert(subterm_at(rule.conclusion, pos), (rule, pos))
+        candidates = 0
+        overlaps = 0
+        redundant = 0
+        new_rules: List[RewriteRule] = list()
+        for rule2 in self.rules.rules:
+            for rule1, pos in conclusions.unifiable(rule2.hypothesis):
+                candidates += 1
+                ov = overlap(rule1, rule2, self.rules, pos)
+                if ov is None:
+                    continue
+                overlaps += 1
+                if check_redundancy(ov, self._closure_index, self.rules):
+                    redundant += 1
+                    continue
+                self._closure_index.insert(ov.hypothesis, ov)
+                new_rules.append(ov)
+        self.closure.extend(RewriteSystem(set(new_rules)))
+        self._newest = new_rules
+        self.saturated = len(new_rules) == 0
+        statistics = ClosureStatistics(
+            len(self.statistics) + 1, candidates, overlaps,
+            redundant, len(new_rules), len(self.closure.rules)
+        )
+        self.statistics.append(statistics)
+        return statistics
+
+    def __iter__(self) -> Iterator[ClosureStatistics]:
+        """Runs iterations until the closure is saturated, yielding the progress of each."""
+        while not self.saturated:
+            yield self.step()
+
+    def run(self, bound: int = -1) -> Optional[RewriteSystem]:
+        """
+        Runs at most bound more iterations, or until the closure is
+        saturated when the bound is -1. Returns the closure if it is
+        saturated and None otherwise.
+        """
+        iteration = 0
+        while not self.saturated and (bound == -1 or iteration < bound):
+            self.step()
+            iteration += 1
+        return self.closure if self.saturated else None
 
-    # # By Daniel Kemp
 def forward_closure(rs: RewriteSystem, bound: int = 1) -> Optional[RewriteSystem]:
     """
-    UNFINISHED
     Run the forward closure on a rewrite system
     with a limit set on the number of interations.
     Defaults to 1 iteration.
+    Returns None when the bound is reached before the
+    closure is saturated.
     """
-    initial_rules = rs.rules # R2 from the paper
-    current_new_rules = deepcopy(rs.rules) # R1 from the paper
-    # Start with FC0 := R, this will eventually be R3 from the paper
-    current_fc = deepcopy(rs)
-
-    for _ in range(bound):
-        # Start FOV
-        new_rules = RewriteSystem()
-        for rule, initial_rule in zip(current_new_rules, initial_rules):
-            for position in fpos(rule.conclusion):
-                ov = overlap(rule, initial_rule, rs, position)
-                if not ov:
-                    continue
-                print("Overlap found")
-                if not check_redundancy(ov, initial_rules) and not check_redundancy(ov, new_rules.rules):
-                    new_rules.append(ov)
-        if len(new_rules.rules) == 0:
-            return deepcopy(current_fc)
-
-        current_new_rules = deepcopy(new_rules.rules)
-        current_fc.extend(deepcopy(new_rules))
-
-    print("Bound of {} reached but no forward closure" % (bound))
-    return None
+    return ForwardClosure(rs).run(bound)
@@ -3,13 +3,13 @@ The rewrite module is responsible for maintaining
 definitions of rewrite rules, as well as performing
 some useful operations with them.
 """
-from typing import overload, List, Optional, Union, Dict
+from typing import overload, Dict, Iterator, Optional, Tuple, Union
 from copy import deepcopy
-from symcollab.algebra import Constant, Equation, Function, \
-    FuncTerm, get_vars, SortMismatch, SubstituteTerm, Term, Variable
-from symcollab.Unification import unify
+from symcollab.algebra import Constant, Function, FuncTerm, \
+    positions, Position, rebuild, replace_at, SubstituteTerm, \
+    subterm_at, Term, Variable
 
-__all__ = ['freeze', 'converse', 'RewriteRule', 'Position']
+__all__ = ['freeze', 'match', 'converse', 'RewriteRule', 'Position']
 
 @overload
 def freeze(term: Variable) -> Constant:
@@ -42,52 +42,68 @@ def freeze(term):
     >>> freeze(f(x))
     f(x)
     """
-    if isinstance(term, Variable):
-        return Constant(term.symbol, term.sort)
-    elif isinstance(term, FuncTerm):
-        arguments = list(term.arguments)
-        for i, t in enumerate(arguments):
-            arguments[i] = freeze(t)
-        term.arguments = arguments
-    return term
-
-def _getOverlapVars(term: Term, hypothesis: Term, conclusion: Term) -> List[Variable]:
-    """Return a list of variables that are overlapping with two terms hypothesis and conclusion"""
-    rewrite_vars = get_vars(hypothesis, unique=True) | get_vars(conclusion, unique=True)
-    term_vars = get_vars(term, unique=True)
-    return list(rewrite_vars & term_vars)
-
-def _changeVars(overlaping_vars: List[Variable], term: Term, hypothesis: Term, conclusion: Term):
-    """Change variable names in hypothesis & conclusion to not overlap with overlapping_vars"""
-    hypothesis = deepcopy(hypothesis)
-    conclusion = deepcopy(conclusion)
-    all_vars = get_vars(term, unique=True) | \
-        get_vars(hypothesis, unique=True) | \
-        get_vars(conclusion, unique=True)
-    new_vars: List[Variable] = []
-    # Go through all the variables that share the same symbol between the term and rewrite rule
-    # and change the variables in the rewrite rule
-    for v in overlaping_vars:
-        new_var = v
-        # Keep renaming variable in rewrite rule until it is not an already existing variable
-        while new_var in all_vars:
-            new_var = Variable(new_var.symbol + "_1", new_var.sort)
-        new_vars.append(new_var)
-    # Create substitution between the old and new variable names and apply them
-    s = SubstituteTerm()
-    for old_v, new_v in zip(overlaping_vars, new_vars):
-        s.add(old_v, new_v)
-    return hypothesis * s, conclusion * s
-
-
-## How does positions work?
-# Ex: '121' means From the root term, look at the first argument, then
-# the second argument of that term, and then the first argument of that term
-# f(f(a, f(b, c)),d) | '121' = b
-# f(a, b) | '' = f(a, b)
-
-# New Type for better annotations
-Position = str
+    if isinstance(term, Function):
+        return term
+    return rebuild(
+        term,
+        lambda t: Constant(t.symbol, t.sort) if isinstance(t, Variable) else None,
+        lambda t: not t.ground
+    )
+
+def match(pattern: Term, subject: Term) -> Optional[SubstituteTerm]:
+    """
+    Matches a pattern against a subject, returning the substitution
+    sigma such that pattern * sigma == subject, or None if there is
+    no such substitution.
+
+    Only the variables of the pattern are bound. The variables of the
+    subject are treated as constants, so the subject never has to be
+    frozen or renamed apart from the pattern.
+
+    Parameters
+    ----------
+    pattern : Term
+      The term whose variables can be instantiated.
+    subject : Term
+      The term to match against.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import Constant, Function, Variable
+    >>> from symcollab.rewrite import match
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> y = Variable("y")
+    >>> a = Constant("a")
+    >>> print(match(f(x, a), f(f(y, y), a)))
+    {x ↦ f(y, y)}
+    >>> match(f(x, x), f(y, a)) is None
+    True
+    """
+    bindings: Dict[Variable, Term] = dict()
+    stack = [(pattern, subject)]
+    while stack:
+        p, s = stack.pop()
+        if isinstance(p, Variable):
+            bound = bindings.get(p)
+            if bound is None:
+                if p.sort != s.sort:
+                    return None
+                bindings[p] = s
+            elif bound != s:
+                return None
+        # A shared ground subterm matches without looking inside
+        elif p is s and p.ground:
+            continue
+        elif not isinstance(s, FuncTerm) or p.function != s.function or \
+             len(p.arguments) != len(s.arguments):
+            return None
+        else:
+            stack.extend(zip(p.arguments, s.arguments))
+    sigma = SubstituteTerm()
+    sigma.subs = {(v, t) for v, t in bindings.items() if v != t}
+    return sigma
+
 
 class RewriteRule:
     """
@@ -99,7 +115,7 @@ class RewriteRule:
         self.hypothesis = hypothesis
         self.conclusion = conclusion
 
-    def apply(self, term: Term, pos: Optional[Position] = None) \
+    def apply(self, term: Term, pos: Optional[Union[Position, str]] = None) \
     -> Optional[Union[Dict[Position, Term], Term]]:
         """
         Applies a rewrite rule to
@@ -110,19 +126,19 @@ class RewriteRule:
         ----------
         term : Term
           The term in which to apply the RewriteRule
-        pos : str, optional
+        pos : Position, optional
           The position inside the term to rewrite.
           If no position is given then all possible subterms are rewritten.
           See notes for details.
 
         Notes
         -----
-        Positions are given as a string sequence, with each
-        character indicating the argument to consider in the FuncTerm.
-        For example, '121' indicates the first argument from the
+        Positions are tuples of argument indices starting at 1.
+        For example, (1, 2, 1) indicates the first argument from the
         root term. Then, the second argument from that term, and lastly
-        the third argument of that term.
-        f(f(a, f(b, c)),d) | '121' = b
+        the first argument of that term.
+        f(f(a, f(b, c)),d) | (1, 2, 1) = b
+        The older string notation such as '121' is also accepted.
 
         Examples
         --------
@@ -133,65 +149,35 @@ class RewriteRule:
         >>> b = Constant("b")
         >>> r = RewriteRule(f(a), f(b))
         >>> r.apply(f(f(a)))
-        {'1': f(f(b))}
+        {(1,): f(f(b))}
         """
         if pos is None:
-            result = self._apply_all(term, '', term, dict())
+            result = dict(self.rewrites(term))
             return result if len(result) != 0 else None
-        return self._apply_pos(term, pos)
-
-
-    def _match(self, term: Term) -> Term:
-        """Attempts to rewrite the root term with the rewrite rule. Returns the same term if rewriting is not possible"""
-        # Change common variables in RewriteRule if they exist
-        overlaping_vars = _getOverlapVars(term, self.hypothesis, self.conclusion)
-        while overlaping_vars:
-            self.hypothesis, self.conclusion = _changeVars(
-                overlaping_vars, term, self.hypothesis, self.conclusion)
-            overlaping_vars = _getOverlapVars(term, self.hypothesis, self.conclusion)
-        # Perform matching and substitution
-        frozen_term = freeze(term)
-        sigma = unify({Equation(self.hypothesis, frozen_term)})
-        return self.conclusion * sigma if sigma is not False else None
+        return self._apply_pos(term, Position(pos))
+
+
+    def _match(self, term: Term) -> Optional[Term]:
+        """Attempts to rewrite the root term with the rewrite rule. Returns None if rewriting is not possible"""
+        sigma = match(self.hypothesis, term)
+        return self.conclusion * sigma if sigma is not None else None
 
     def _apply_pos(self, term: Term, pos: Position) -> Optional[Term]:
-        if pos == '':
-            return self._match(term)
-
-        # Recurse down to appropriate position
-        term = deepcopy(term)
-        if isinstance(term, Constant) or isinstance(term, Variable):
-            raise ValueError("Position " + pos + " is not valid for term " + str(term))
-        index = int(pos[0])
-        if index > len(term.arguments):
-            raise ValueError("Position " + pos + " is not valid for term " + str(term))
-
-        term_arguments = list(term.arguments)
-        new_argument = self._apply_pos(term_arguments[index - 1], pos[1:])
-        if new_argument is None:
+        new_subterm = self._match(subterm_at(term, pos))
+        if new_subterm is None:
             return None
-        term_arguments[index - 1] = new_argument
-        term.arguments = tuple(term_arguments)
-        return term
+        return replace_at(term, pos, new_subterm)
 
-    def _apply_all(self, term: Term, pos: Position,
-                   subterm: Term, result: Dict[Position, Term]) -> Dict[Position, Term]:
-        """Applies the rewrite rule to every subterm"""
-        # If the current position is rewritable, add it to result dictionary
-        r: Optional[Term] = None
-        try:
-            r = self._apply_pos(term, pos)
-        except SortMismatch:
-            pass
-        if r is not None:
-            result[pos] = r
-
-        # Recurse down arguments
-        if isinstance(subterm, FuncTerm):
-            for i, t in enumerate(subterm.arguments):
-                self._apply_all(term, pos + str(i + 1), t, result)
-
-        return result
+    def rewrites(self, term: Term) -> Iterator[Tuple[Position, Term]]:
+        """
+        Lazily applies the rewrite rule to every subterm, parents
+        before children, yielding each position that can be
+        rewritten along with the rewritten term.
+        """
+        for pos, subterm in positions(term):
+            new_subterm = self._match(subterm)
+            if new_subterm is not None:
+                yield pos, replace_at(term, pos, new_subterm)
 
     def __repr__(self):
         return str(self.hypothesis) + " → " + str(self.conclusion)
@@ -205,8 +191,7 @@ class RewriteRule:
     def __deepcopy__(self, memo):
         return RewriteRule(
             deepcopy(self.hypothesis),
-            deepcopy(self.conclusion),
-            self.unif_algo
+            deepcopy(self.conclusion)
         )
 
 def converse(rule: RewriteRule) -> RewriteRule:
@@ -224,7 +209,7 @@ def converse(rule: RewriteRule) -> RewriteRule:
     >>> b = Constant("b")
     >>> r = RewriteRule(f(a,b), f(b,a))
     >>> converse(r)
-    f(b, a) -> f(a, b)
+    f(b, a) → f(a, b)
     """
     new_rule = deepcopy(rule)
     # Flip Hypothesis and Conclusion
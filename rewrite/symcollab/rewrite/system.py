@@ -2,30 +2,129 @@
 This module is responsible for rewrite systems,
 a set of rewrite rules and operations on them.
 """
-from copy import deepcopy
-from typing import List, Optional, Set, Tuple
-from symcollab.algebra import SortMismatch, Term
+from collections import OrderedDict
+from enum import Enum
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple, Union
+from symcollab.algebra import FuncTerm, Position, positions, \
+    replace_at, Term, Variable
+from .automaton import MatchingAutomaton
 from .rule import RewriteRule
 
-__all__ = ['RewriteSystem', 'normal']
+__all__ = ['RewriteSystem', 'Strategy', 'Normalizer', 'normal']
 
 class RewriteSystem:
     """
     A set of rewrite rules.
     Used primarily to hold properties of a rewrite system.
+
+    The hypotheses of the rules are compiled into a matching
+    automaton, so the rules that rewrite a term can be found
+    without attempting every rule.
     """
     def __init__(self, rules: Optional[Set[RewriteRule]]=None):
         if rules is None:
             rules = set()
-        self.rules = rules
+        # A copy, so the rules only change through append and extend
+        self._rules: FrozenSet[RewriteRule] = frozenset(rules)
+        # Counts the changes to the rules, so normalizers know to forget
+        self._version = 0
+        self._normalizers: Dict[Strategy, 'Normalizer'] = dict()
+        self._automaton: Optional[MatchingAutomaton] = None
+        self._automaton_version = -1
+
+    @property
+    def rules(self) -> FrozenSet[RewriteRule]:
+        """The rules of the system, which can't be changed directly."""
+        return self._rules
 
     def append(self, rule):
         """Add a single rule to the rewrite system"""
-        self.rules.add(rule)
+        self._rules = self._rules | {rule}
+        self._version += 1
 
     def extend(self, system):
         """Add a list of rules to a rewrite system"""
-        self.rules.update(system.rules)
+        self._rules = self._rules | frozenset(system.rules)
+        self._version += 1
+
+    def applicable(self, term: Term) -> List[RewriteRule]:
+        """
+        Returns the rules whose hypothesis matches a subterm
+        of the term, in the order the rules are iterated over.
+        Applying any other rule to the term is bound to fail.
+
+        Examples
+        --------
+        >>> from symcollab.algebra import Constant, Function, Variable
+        >>> from symcollab.rewrite import RewriteRule, RewriteSystem
+        >>> f = Function("f", 2)
+        >>> g = Function("g", 1)
+        >>> x = Variable("x")
+        >>> a = Constant("a")
+        >>> rs = RewriteSystem({RewriteRule(f(x, x), x), RewriteRule(g(a), a)})
+        >>> rs.applicable(g(f(a, a)))
+        [f(x, x) → x]
+        """
+        automaton = self.compile()
+        matching = set()
+        for _, subterm in positions(term):
+            matching.update(id(rule) for rule, _ in automaton.matches(subterm))
+        return [rule for rule in self.rules if id(rule) in matching]
+
+    def compile(self) -> MatchingAutomaton:
+        """
+        Returns a matching automaton of the hypotheses of the rules, which
+        matches a term against every rule in a single traversal. It is
+        compiled again on first use after the rules change.
+
+        Examples
+        --------
+        >>> from symcollab.algebra import Constant, Function, Variable
+        >>> from symcollab.rewrite import RewriteRule, RewriteSystem
+        >>> f = Function("f", 2)
+        >>> x = Variable("x")
+        >>> a = Constant("a")
+        >>> b = Constant("b")
+        >>> rs = RewriteSystem({RewriteRule(f(x, x), x)})
+        >>> rs.compile().rewrite_root(f(a, b)) is None
+        True
+        >>> rs.append(RewriteRule(f(a, x), x))
+        >>> rs.compile().rewrite_root(f(a, b))
+        (f(a, x) → x, b)
+        """
+        if self._automaton is None or self._automaton_version != self._version:
+            self._automaton = MatchingAutomaton(self.rules)
+            self._automaton_version = self._version
+        return self._automaton
+
+    def normalizer(self, strategy: Union['Strategy', str] = 'innermost') -> 'Normalizer':
+        """
+        Returns the normalizer of the system for a strategy. It is
+        shared by every caller, along with the normal forms it remembers.
+        """
+        strategy = Strategy(strategy)
+        if strategy not in self._normalizers:
+            self._normalizers[strategy] = Normalizer(self, strategy)
+        return self._normalizers[strategy]
+
+    def normalize(self, term: Term, strategy: Union['Strategy', str] = 'innermost') -> Term:
+        """
+        Returns the normal form of a term, assuming
+        the rewrite system is convergent.
+
+        Examples
+        --------
+        >>> from symcollab.algebra import Constant, Function, Variable
+        >>> from symcollab.rewrite import RewriteRule, RewriteSystem
+        >>> f = Function("f", 2)
+        >>> x = Variable("x")
+        >>> a = Constant("a")
+        >>> b = Constant("b")
+        >>> rs = RewriteSystem({RewriteRule(f(x, x), x), RewriteRule(f(a, x), b)})
+        >>> rs.normalize(f(a, f(b, b)))
+        b
+        """
+        return self.normalizer(strategy)(term)
 
     def __iter__(self):
         return iter(self.rules)
@@ -44,7 +143,210 @@ class RewriteSystem:
         str_repr += "\n}"
         return str_repr
 
-def normal(element: Term, rewrite_rules: RewriteSystem, bound: int = -1) -> Term:
+class Strategy(Enum):
+    """
+    The order in which redexes are rewritten.
+
+    INNERMOST normalizes the arguments of a term before its root,
+    OUTERMOST rewrites the leftmost of the topmost redexes first and
+    LEFTMOST_INNERMOST rewrites the leftmost of the lowest redexes first.
+    """
+    INNERMOST = "innermost"
+    OUTERMOST = "outermost"
+    LEFTMOST_INNERMOST = "leftmost-innermost"
+
+
+class Normalizer:
+    """
+    Computes normal forms with respect to a convergent rewrite system.
+
+    The normal forms of every term and subterm encountered are kept in
+    a least recently used cache keyed by the hash-consed term, so
+    normalizing shared subterms again costs a single lookup.
+
+    Parameters
+    ----------
+    rules : RewriteSystem
+      The rules to normalize with.
+    strategy : Strategy
+      The order in which redexes are rewritten.
+    cache_size : int
+      The maximum number of normal forms to remember.
+
+    Notes
+    -----
+    Normal forms are only unique for convergent systems. For
+    other systems the result depends on the strategy, and on
+    what the cache remembers from earlier normalizations.
+
+    Examples
+    --------
+    >>> from symcollab.algebra import Constant, Function, Variable
+    >>> from symcollab.rewrite import Normalizer, RewriteRule, RewriteSystem
+    >>> f = Function("f", 2)
+    >>> x = Variable("x")
+    >>> a = Constant("a")
+    >>> normalize = Normalizer(RewriteSystem({RewriteRule(f(x, x), x)}))
+    >>> normalize(f(f(a, a), f(a, f(a, a))))
+    a
+    """
+    def __init__(self, rules: 'RewriteSystem', strategy: Union[Strategy, str] = Strategy.INNERMOST,
+                 cache_size: int = 65536):
+        self.rules = rules
+        self.strategy = Strategy(strategy)
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Term, Term]' = OrderedDict()
+        self._automaton = rules.compile()
+        self._version = rules._version
+
+    def clear(self):
+        """Forgets every normal form."""
+        self._cache.clear()
+
+    def _sync(self):
+        """Forgets every normal form if the rules changed."""
+        self._automaton = self.rules.compile()
+        if self._version != self.rules._version:
+            self._version = self.rules._version
+            self.clear()
+
+    def _lookup(self, term: Term) -> Optional[Term]:
+        if isinstance(term, Variable):
+            return term
+        nf = self._cache.get(term)
+        if nf is not None:
+            self._cache.move_to_end(term)
+        return nf
+
+    def _remember(self, term: Term, nf: Term):
+        self._cache[term] = nf
+        self._cache.move_to_end(term)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def rewrite_root(self, term: Term) -> Optional[Tuple[RewriteRule, Term]]:
+        """Rewrites the root of a term with the first rule that matches it."""
+        return self._automaton.rewrite_root(term)
+
+    def __call__(self, term: Term) -> Term:
+        """Returns the normal form of a term."""
+        self._sync()
+        nf = self._lookup(term)
+        if nf is not None:
+            return nf
+        if self.strategy is Strategy.INNERMOST:
+            return self._innermost(term)
+        nf = term
+        visited = [term]
+        for _, _, nf in self._steps(term):
+            if self._lookup(nf) is not None:
+                nf = self._lookup(nf)
+                break
+            visited.append(nf)
+        # Every term along the way has the same normal form
+        for t in visited:
+            self._remember(t, nf)
+        return nf
+
+    def _innermost(self, term: Term) -> Term:
+        """Normalizes the arguments of each term bottom-up before its root."""
+        done: Dict[Term, Term] = dict()
+        # Terms whose root was rewritten, waiting for the normal form of the result
+        waiting: Dict[Term, Term] = dict()
+
+        def lookup(t: Term) -> Optional[Term]:
+            nf = done.get(t)
+            return nf if nf is not None else self._lookup(t)
+
+        stack = [term]
+        while stack:
+            t = stack[-1]
+            if lookup(t) is not None:
+                stack.pop()
+                continue
+            if t in waiting:
+                nf = lookup(waiting.pop(t))
+                done[t] = nf
+                stack.pop()
+                continue
+            pending = [arg for arg in reversed(t.arguments) if lookup(arg) is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            arguments = [lookup(arg) for arg in t.arguments]
+            changed = any(new is not old for new, old in zip(arguments, t.arguments))
+            u = type(t).intern(t.function, arguments) if changed else t
+            rewrite = self.rewrite_root(u)
+            if rewrite is None:
+                done[t] = u
+                done[u] = u
+                stack.pop()
+                continue
+            waiting[t] = rewrite[1]
+            stack.append(rewrite[1])
+        for t, nf in done.items():
+            self._remember(t, nf)
+        return done[term]
+
+    def _steps(self, term: Term) -> Iterator[Tuple[RewriteRule, Position, Term]]:
+        """
+        Rewrites one redex at a time following the strategy, yielding the
+        rule, the position and the new term after each step. Subterms
+        already known to be in normal form are not searched.
+        """
+        innermost = self.strategy is not Strategy.OUTERMOST
+        may_rewrite = lambda s: self._cache.get(s) is not s
+        while True:
+            for pos, subterm in _positions(term, innermost, may_rewrite):
+                rewrite = self.rewrite_root(subterm)
+                if rewrite is not None:
+                    rule, new_subterm = rewrite
+                    term = replace_at(term, pos, new_subterm)
+                    yield rule, pos, term
+                    break
+            else:
+                return
+
+    def steps(self, term: Term) -> Iterator[Tuple[RewriteRule, Position, Term]]:
+        """
+        Rewrites one redex at a time, yielding the rule, the position
+        and the new term after each step. Innermost normalization
+        is traced in leftmost-innermost order.
+        """
+        self._sync()
+        return self._steps(term)
+
+
+def _positions(term: Term, innermost: bool,
+               descend: Callable[[FuncTerm], bool]) -> Iterator[Tuple[Position, Term]]:
+    """
+    The positions of a term along with their subterms, children
+    first if innermost and parents first otherwise. The arguments
+    of a subterm are only visited if descend returns True for it.
+    """
+    stack: List[Tuple[Term, Position]] = [(term, Position())]
+    if not innermost:
+        while stack:
+            t, pos = stack.pop()
+            yield pos, t
+            if isinstance(t, FuncTerm) and descend(t):
+                stack.extend((t.arguments[i - 1], pos.child(i)) for i in range(len(t.arguments), 0, -1))
+        return
+    expanded: List[bool] = [False]
+    while stack:
+        t, pos = stack[-1]
+        if expanded[-1] or not isinstance(t, FuncTerm) or not descend(t):
+            stack.pop()
+            expanded.pop()
+            yield pos, t
+            continue
+        expanded[-1] = True
+        for i in range(len(t.arguments), 0, -1):
+            stack.append((t.arguments[i - 1], pos.child(i)))
+            expanded.append(False)
+
+def normal(element: Term, rewrite_rules: RewriteSystem, bound: int = -1,
+           strategy: Union[Strategy, str] = Strategy.OUTERMOST) -> Term:
     """
     Returns the normal form of an element
     along with the rewrite rules to get there
@@ -54,6 +356,8 @@ def normal(element: Term, rewrite_rules: RewriteSystem, bound: int = -1) -> Term
     -----
     If the set of rewrite rules aren't convergent,
     then it is possible that this function won't terminate.
+    When the steps aren't needed, RewriteSystem.normalize
+    is faster as it remembers normal forms.
 
     Parameters
     ----------
@@ -63,29 +367,13 @@ def normal(element: Term, rewrite_rules: RewriteSystem, bound: int = -1) -> Term
       Possible rules to apply.
     bound : int
       Applies up to 'bound' rewrite rules. Set to -1 in order to have no bound.
+    strategy : Strategy
+      The order in which redexes are rewritten.
     """
-    element = deepcopy(element)
-    element_changed = True
-    iteration = 0
-    rules_performed: List[Tuple[RewriteRule, str]] = list()
-    # We keep on going until the element stops changing
-    while element_changed:
-        element_changed = False
+    rules_performed: List[Tuple[RewriteRule, Position]] = list()
+    for rule, position, element in rewrite_rules.normalizer(strategy).steps(element):
         # Check to see if we went passed our bound
-        if bound != -1 and iteration > bound:
+        if bound != -1 and len(rules_performed) >= bound:
             return None
-
-        # Apply the first rewrite rule that works
-        for rule in rewrite_rules:
-            try:
-                new_elements = rule.apply(element)
-            except SortMismatch:
-                continue
-            if new_elements is not None:
-                position, element = next(iter(new_elements.items()))
-                rules_performed.append((rule, position))
-                element_changed = True
-                break
-        iteration += 1
-
+        rules_performed.append((rule, position))
     return element, rules_performed
@@ -2,12 +2,43 @@
 The variants module is responsible for computing variants
 and identifying some properties about them.
 """
-from typing import List, Dict, Tuple, Optional
-from symcollab.algebra import Term, SortMismatch
+from collections import Counter
+from enum import Enum
+from heapq import heappop, heappush
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from symcollab.algebra import FuncTerm, positions, preorder, replace_at, Term
+from .automaton import MatchingAutomaton
 from .rule import RewriteRule, Position
 from .system import RewriteSystem
 
-__all__ = ['Variants', 'is_finite', 'narrow']
+__all__ = ['Variants', 'is_finite', 'Search', 'narrow', 'size_difference', 'symbol_distance']
+
+# A rewrite found while expanding a term: the index of the
+# rule, the position rewritten and the resulting term
+_Rewrite = Tuple[int, Position, Term]
+
+def _rewrites(term: Term, automaton: MatchingAutomaton,
+              rule_index: Dict[RewriteRule, int]) -> List[_Rewrite]:
+    """Every single step rewrite of a term, ordered by rule and then position."""
+    found: List[_Rewrite] = list()
+    for pos, subterm in positions(term):
+        for rule, sigma in automaton.matches(subterm):
+            found.append((rule_index[rule], pos, replace_at(term, pos, rule.conclusion * sigma)))
+    found.sort(key=lambda r: r[0])
+    return found
+
+# Set in each worker process of a pool expanding variants
+_worker_automaton: Optional[MatchingAutomaton] = None
+_worker_rule_index: Dict[RewriteRule, int] = dict()
+
+def _init_worker(rules: List[RewriteRule]):
+    global _worker_automaton, _worker_rule_index
+    _worker_automaton = MatchingAutomaton(rules)
+    _worker_rule_index = {rule: i for i, rule in enumerate(rules)}
+
+def _worker_rewrites(term: Term) -> List[_Rewrite]:
+    return _rewrites(term, _worker_automaton, _worker_rule_index)
+
 
 class Variants:
     """
@@ -19,12 +50,24 @@ class Variants:
        The term to compute the variants from.
     rules : RewriteSystem
        The rules from which to compute the variants from.
+    max_variants : int, optional
+       The maximum number of variants to compute, including the term itself.
+    max_depth : int, optional
+       The maximum number of rewrite steps from the term to a variant.
+    processes : int, optional
+       When greater than one, each level of the variant tree is expanded
+       across a pool of that many processes, partitioned by term.
+       The variants are produced in the same order either way.
 
     Notes
     -----
     A variant of a term $t$ is a term that can be obtained by applying
     a sequence of rewrite rules to $t$.
 
+    Every variant is kept in a single set of the terms seen so far, so
+    each is only expanded once. Once a budget is exhausted the iteration
+    stops and `truncated` is set if more variants could have been found.
+
     Examples
     --------
     >>> from symcollab.algebra import Constant, Function, Variable
@@ -40,13 +83,24 @@ class Variants:
     >>> list(vt)
     [f(a, f(b, b)), b, f(a, b)]
     """
-    def __init__(self, term: Term, rules: RewriteSystem):
+    def __init__(self, term: Term, rules: RewriteSystem,
+                 max_variants: Optional[int] = None, max_depth: Optional[int] = None,
+                 processes: Optional[int] = None):
         # Each index represents the depth of the tree
         # Then at each depth of a tree we have a dictionary of terms
         # mapped to what substitutions led to it.
         self.tree: List[Dict[Term, List[Tuple[RewriteRule, Position]]]] = [{term : []}]
         self.branch_iter = iter(self.tree[0]) # Where we are at the branch
         self.rules: RewriteSystem = rules
+        self.max_variants = max_variants
+        self.max_depth = max_depth
+        self.processes = processes
+        self.truncated = False
+        self._seen: Set[Term] = {term}
+        # Sorted so the merge order doesn't depend on how the set iterates
+        self._rule_list = sorted(rules, key=str)
+        self._rule_index = {rule: i for i, rule in enumerate(self._rule_list)}
+        self._pool = None
 
     def __iter__(self):
         return self
@@ -54,30 +108,67 @@ class Variants:
     # This function will only show for what is currently computed but it is helpful
     # for preventing repeats of the same calculations
     def __contains__(self, x: Term):
-        for branch in self.tree:
-            if x in branch:
-                return True
-        return False
+        return x in self._seen
+
+    def close(self):
+        """Shuts down the process pool, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _expand(self, terms: List[Term]) -> Iterator[List[_Rewrite]]:
+        """The rewrites of each term, in the order of the terms."""
+        if self.processes is None or self.processes <= 1 or len(terms) <= 1:
+            automaton = self.rules.compile()
+            return (_rewrites(t, automaton, self._rule_index) for t in terms)
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                self.processes,
+                initializer=_init_worker,
+                initargs=(self._rule_list,)
+            )
+        chunksize = max(1, len(terms) // (4 * self.processes))
+        return self._pool.map(_worker_rewrites, terms, chunksize=chunksize)
 
     def _create_next_branch(self):
         """Compute the new branch of terms in the variant tree"""
-        branch: Dict[Term, List[RewriteRule]] = {}
-        last_branch_index = len(self.tree) - 1
-        # Apply each rewrite rule to the terms in the last branch
-        for rule in self.rules:
-            for t in self.tree[last_branch_index].keys():
-                try:
-                    new_terms = rule.apply(t)
-                except SortMismatch:
-                    continue
-                if new_terms is None:
-                    continue
-                for pos, new_t in new_terms.items():
-                    # Check that the result is not already in the tree
-                    # If new, then save the sequence of rewrite rules
-                    # used to produce the term.
-                    if new_t not in self:
-                        branch[new_t] = self.tree[last_branch_index][t] + [(rule, pos)]
+        branch: Dict[Term, List[Tuple[RewriteRule, Position]]] = {}
+        last_branch = self.tree[-1]
+        terms = list(last_branch.keys())
+        if self.truncated:
+            return branch
+        if self.max_depth is not None and len(self.tree) > self.max_depth:
+            automaton = self.rules.compile()
+            self.truncated = any(
+                next(automaton.matches(subterm), None) is not None
+                for t in terms for _, subterm in positions(t)
+            )
+            return branch
+        # Merge the rewrites of every term ordered by rule, then by term
+        found = [
+            (rule_index, i, pos, new_t)
+            for i, rewrites in enumerate(self._expand(terms))
+            for rule_index, pos, new_t in rewrites
+        ]
+        found.sort(key=lambda r: (r[0], r[1]))
+        for rule_index, i, pos, new_t in found:
+            # Check that the result is not already in the tree
+            # If new, then save the sequence of rewrite rules
+            # used to produce the term.
+            if new_t in self._seen:
+                continue
+            if self.max_variants is not None and len(self._seen) >= self.max_variants:
+                self.truncated = True
+                break
+            self._seen.add(new_t)
+            branch[new_t] = last_branch[terms[i]] + [(self._rule_list[rule_index], pos)]
         return branch
 
     def __next__(self):
@@ -86,6 +177,7 @@ class Variants:
         except StopIteration:
             branch = self._create_next_branch()
             if len(branch) == 0:
+                self.close()
                 raise StopIteration
             self.tree.append(branch)
             self.branch_iter = iter(self.tree[-1])
@@ -96,7 +188,8 @@ def is_finite(v: Variants, bound: int = -1) -> bool:
     """
     Check to see if there are a finite number of variants.
 
-    Returns false if the variants are infinite or the bound is reached.
+    Returns false if the variants are infinite, the bound is reached
+    or the budget of the variants is exhausted.
 
     Parameters
     ----------
@@ -112,15 +205,157 @@ def is_finite(v: Variants, bound: int = -1) -> bool:
         if bound != -1 and iteration > bound:
             return False
         iteration += 1
-    return True
+    return not v.truncated
+
+class Search(Enum):
+    """
+    The order in which narrow explores the variants of a term.
+
+    BREADTH_FIRST walks the variant tree of the term level by level,
+    BIDIRECTIONAL also searches backwards from the goal with the converse
+    rules until the two searches meet and BEST_FIRST always expands the
+    variant a heuristic deems closest to the goal.
+    """
+    BREADTH_FIRST = "breadth-first"
+    BIDIRECTIONAL = "bidirectional"
+    BEST_FIRST = "best-first"
+
+
+def size_difference(term: Term, goal_term: Term) -> int:
+    """A narrowing heuristic: the difference in size between a term and the goal."""
+    return abs(term.size - goal_term.size)
 
-def narrow(term: Term, goal_term: Term, rules: RewriteSystem, bound: int = -1) \
+def _histogram(term: Term) -> Counter:
+    return Counter(t.function if isinstance(t, FuncTerm) else t for t in preorder(term))
+
+def symbol_distance(term: Term, goal_term: Term) -> int:
+    """
+    A narrowing heuristic: the number of symbol occurrences that
+    differ between a term and the goal, ignoring where they occur.
+    """
+    histogram = _histogram(term)
+    histogram.subtract(_histogram(goal_term))
+    return sum(abs(n) for n in histogram.values())
+
+# The step leading to each term found by a search: the term it
+# was rewritten from, or to when searching backwards, along with
+# the rule and position. The start of the search maps to None.
+_Parents = Dict[Term, Optional[Tuple[Term, RewriteRule, Position]]]
+
+def _chain(parents: _Parents, term: Term) -> List[Tuple[RewriteRule, Position]]:
+    """The steps between a term and the start of a search, from the term onwards."""
+    steps: List[Tuple[RewriteRule, Position]] = list()
+    parent = parents[term]
+    while parent is not None:
+        term, rule, pos = parent
+        steps.append((rule, pos))
+        parent = parents[term]
+    return steps
+
+def _bidirectional(term: Term, goal_term: Term, rules: RewriteSystem, bound: int,
+                   max_variants: Optional[int], max_depth: Optional[int]) \
+    -> Optional[List[Tuple[RewriteRule, Position]]]:
+    forward_rules = sorted(rules, key=str)
+    # A rule can only be applied backwards when the conclusion
+    # determines every variable of the hypothesis
+    backward_rules = [
+        rule for rule in forward_rules
+        if rule.hypothesis.variables <= rule.conclusion.variables
+    ]
+    converse_rules = [RewriteRule(rule.conclusion, rule.hypothesis) for rule in backward_rules]
+    sides = [
+        (rules.compile(), {rule: i for i, rule in enumerate(forward_rules)}, forward_rules),
+        (MatchingAutomaton(converse_rules), {rule: i for i, rule in enumerate(converse_rules)}, backward_rules)
+    ]
+    parents: List[_Parents] = [{term: None}, {goal_term: None}]
+    # The number of steps from the start of each search
+    depths: List[Dict[Term, int]] = [{term: 0}, {goal_term: 0}]
+    frontiers: List[List[Term]] = [[term], [goal_term]]
+    # The shortest meeting found so far, along with its length
+    best: Optional[Tuple[int, Term]] = None
+
+    def join() -> Optional[List[Tuple[RewriteRule, Position]]]:
+        if best is None:
+            return None
+        meeting = best[1]
+        return list(reversed(_chain(parents[0], meeting))) + _chain(parents[1], meeting)
+
+    depth = 0
+    expanded = 0
+    while len(frontiers[0]) > 0:
+        if max_depth is not None and depth >= max_depth:
+            return None
+        # Grow the smaller frontier, as long as the goal has predecessors
+        side = 0 if len(frontiers[1]) == 0 or len(frontiers[0]) <= len(frontiers[1]) else 1
+        automaton, rule_index, side_rules = sides[side]
+        level: List[Term] = list()
+        for t in frontiers[side]:
+            if bound != -1 and expanded >= bound:
+                return join()
+            expanded += 1
+            for i, pos, new_t in _rewrites(t, automaton, rule_index):
+                if new_t in parents[side]:
+                    continue
+                parents[side][new_t] = (t, side_rules[i], pos)
+                depths[side][new_t] = depths[side][t] + 1
+                if new_t in parents[1 - side]:
+                    # The rest of the level may still meet the other side sooner
+                    length = depths[0][new_t] + depths[1][new_t]
+                    if best is None or length < best[0]:
+                        best = (length, new_t)
+                    continue
+                if max_variants is not None and len(parents[0]) + len(parents[1]) > max_variants:
+                    return join()
+                level.append(new_t)
+        if best is not None:
+            return join()
+        frontiers[side] = level
+        depth += 1
+    return None
+
+def _best_first(term: Term, goal_term: Term, rules: RewriteSystem, bound: int,
+                max_variants: Optional[int], max_depth: Optional[int],
+                heuristic: Callable[[Term, Term], float]) \
+    -> Optional[List[Tuple[RewriteRule, Position]]]:
+    rule_list = sorted(rules, key=str)
+    rule_index = {rule: i for i, rule in enumerate(rule_list)}
+    automaton = rules.compile()
+    parents: _Parents = {term: None}
+    depths = {term: 0}
+    # Ties are broken by the fewest steps, then the order the terms were found in
+    queue = [(heuristic(term, goal_term), 0, 0, term)]
+    found = 1
+    expanded = 0
+    while len(queue) > 0:
+        t = heappop(queue)[-1]
+        if max_depth is not None and depths[t] >= max_depth:
+            continue
+        if bound != -1 and expanded >= bound:
+            return None
+        expanded += 1
+        for i, pos, new_t in _rewrites(t, automaton, rule_index):
+            if new_t in parents:
+                continue
+            parents[new_t] = (t, rule_list[i], pos)
+            if new_t == goal_term:
+                return list(reversed(_chain(parents, new_t)))
+            if max_variants is not None and len(parents) > max_variants:
+                return None
+            depths[new_t] = depths[t] + 1
+            heappush(queue, (heuristic(new_t, goal_term), depths[new_t], found, new_t))
+            found += 1
+    return None
+
+def narrow(term: Term, goal_term: Term, rules: RewriteSystem, bound: int = -1,
+           max_variants: Optional[int] = None, max_depth: Optional[int] = None,
+           processes: Optional[int] = None, search: Union[Search, str] = Search.BREADTH_FIRST,
+           heuristic: Callable[[Term, Term], float] = symbol_distance) \
     -> Optional[List[Tuple[RewriteRule, Position]]]:
     """
     Returns the sequence of rewrite rules necessary to rewrite one term to a goal term.
     If the term cannot be rewritten, this function will return None.
     A bound greater than -1 will set the function to stop
-    attempting to reach the goal after a certain number of steps.
+    attempting to reach the goal after a certain amount of searching.
 
     Parameters
     ----------
@@ -131,8 +366,36 @@ def narrow(term: Term, goal_term: Term, rules: RewriteSystem, bound: int = -1) \
     rules : RewriteSystem
       The rules from which to rewrite from.
     bound : int
-      The maximum number of times to attempt rewriting.
-      -1 indicates an infinite bound.
+      How much to search before giving up, -1 indicates an infinite bound.
+      Searching breadth-first, it is the number of variants compared
+      with the goal, the term itself included. Searching bidirectionally
+      or best-first, it is the number of terms whose rewrites are
+      computed, each of which may find many variants, so the same
+      bound searches further than breadth-first.
+    max_variants : int, optional
+      The maximum number of variants to keep in memory.
+    max_depth : int, optional
+      The maximum number of rewrite steps to search through.
+    processes : int, optional
+      The number of processes to expand the variants with
+      when searching breadth-first.
+    search : Search
+      The order in which to explore the variants.
+    heuristic : Callable[[Term, Term], float]
+      Estimates how far a term is from the goal, when searching
+      best-first. See size_difference and symbol_distance.
+
+    Notes
+    -----
+    Every search returns the steps as pairs of a rule and the position
+    it rewrites. Searching breadth-first finds one of the shortest sequences,
+    best-first finds one with few expansions. Searching bidirectionally
+    finishes the level where the two searches first meet and returns the
+    shortest meeting. Only the rules which don't lose variables of their
+    hypothesis can be applied backwards, the rest are only searched through
+    forwards. The sequence found is one of the shortest when every rule can
+    be applied backwards and no bound or budget stops the search within
+    that level, otherwise it may be longer.
 
     Examples
     --------
@@ -146,14 +409,23 @@ def narrow(term: Term, goal_term: Term, rules: RewriteSystem, bound: int = -1) \
     >>> r2 = RewriteRule(f(a, x), b)
     >>> term = f(a, f(b, b))
     >>> narrow(term, f(a,b), RewriteSystem({r1, r2}), -1)
-    [(f(x, x) → x, '2')]
+    [(f(x, x) → x, (2,))]
+    >>> narrow(term, f(a,b), RewriteSystem({r1, r2}), search="bidirectional")
+    [(f(x, x) → x, (2,))]
     """
-    variants = Variants(term, rules)
-    attempt = 1
-    for variant in variants:
-        if bound != -1 and attempt > bound:
-            break
-        if variant == goal_term:
-            return variants.tree[-1][variant]
-        attempt += 1
+    search = Search(search)
+    if search is not Search.BREADTH_FIRST and term == goal_term:
+        return []
+    if search is Search.BIDIRECTIONAL:
+        return _bidirectional(term, goal_term, rules, bound, max_variants, max_depth)
+    if search is Search.BEST_FIRST:
+        return _best_first(term, goal_term, rules, bound, max_variants, max_depth, heuristic)
+    with Variants(term, rules, max_variants, max_depth, processes) as variants:
+        attempt = 1
+        for variant in variants:
+            if bound != -1 and attempt > bound:
+                break
+            if variant == goal_term:
+                return variants.tree[-1][variant]
+            attempt += 1
     return None
@@ -0,0 +1,58 @@
+from symcollab.rewrite import *
+from symcollab.rewrite.forward_closure import *
+from symcollab.algebra import *
+import unittest
+
+class TestForwardClosure(unittest.TestCase):
+    def test_finite(self):
+        f = Function("f", 1)
+        g = Function("g", 1)
+        h = Function("h", 2)
+        i = Function("i", 1)
+        x = Variable("x")
+        a = Constant("a")
+        b = Constant("b")
+        e = Constant("e")
+        rs = RewriteSystem({RewriteRule(f(x), g(x)), RewriteRule(g(a), b)})
+        closure = forward_closure(rs, 2)
+        self.assertEqual(closure.rules, rs.rules | {RewriteRule(f(a), b)})
+        # Conclusions without non-variable positions never overlap
+        rs = RewriteSystem({RewriteRule(i(i(x)), x), RewriteRule(h(x, i(x)), e), RewriteRule(h(i(x), x), e)})
+        self.assertEqual(forward_closure(rs).rules, rs.rules)
+
+    def test_pairs(self):
+        # Every new rule is overlapped with every original rule
+        f = Function("f", 1)
+        g = Function("g", 1)
+        x = Variable("x")
+        a = Constant("a")
+        b = Constant("b")
+        c = Constant("c")
+        rs = RewriteSystem({RewriteRule(f(x), g(x)), RewriteRule(g(a), b), RewriteRule(g(b), c)})
+        fc = ForwardClosure(rs)
+        statistics = fc.step()
+        self.assertEqual((statistics.candidates, statistics.overlaps, statistics.new_rules), (2, 2, 2))
+        self.assertIs(fc.run(), fc.closure)
+        self.assertIn(RewriteRule(f(a), b), fc.closure.rules)
+        self.assertIn(RewriteRule(f(b), c), fc.closure.rules)
+
+    def test_infinite(self):
+        f = Function("f", 1)
+        g = Function("g", 1)
+        x = Variable("x")
+        rs = RewriteSystem({RewriteRule(f(g(x)), g(f(x)))})
+        fc = ForwardClosure(rs)
+        self.assertIsNone(fc.run(3))
+        self.assertEqual([s.iteration for s in fc.statistics], [1, 2, 3])
+        self.assertEqual([s.rules for s in fc.statistics], [2, 3, 4])
+        self.assertFalse(fc.saturated)
+        # Redundant overlaps are discarded
+        rule = RewriteRule(f(g(g(x))), g(g(f(x))))
+        index = DiscriminationTree()
+        for r in fc.closure.rules:
+            index.insert(r.hypothesis, r)
+        self.assertTrue(check_redundancy(rule, index, rs))
+        self.assertTrue(check_redundancy(RewriteRule(g(f(g(x))), x), DiscriminationTree(), rs))
+
+if __name__ == "__main__":
+    unittest.main()
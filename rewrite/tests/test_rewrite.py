@@ -15,7 +15,7 @@ class TestRewrite(unittest.TestCase):
         r = RewriteRule(f(y, g(x, a)), g(y, a))
 
         term = f(b, g(c, a))
-        self.assertEqual(r.apply(term)[''], g(b, a))
+        self.assertEqual(r.apply(term)[()], g(b, a))
 
         term = f(a,b)
         self.assertEqual(r.apply(term), None)
@@ -23,8 +23,110 @@ class TestRewrite(unittest.TestCase):
         print("Applying f(x, x) -> x to f(f(x, x), f(x, x))")
         term = f(f(x, x), f(x, x))
         r = RewriteRule(f(x, x), x)
-        self.assertEqual(r.apply(term)['1'], f(x, f(x, x)))
-        self.assertEqual(r.apply(term, '2'), f(f(x,x), x))
+        self.assertEqual(r.apply(term)[(1,)], f(x, f(x, x)))
+        self.assertEqual(r.apply(term, (2,)), f(f(x,x), x))
+
+    def test_match(self):
+        a = Constant("a")
+        x = Variable("x")
+        y = Variable("y")
+        f = Function("f", 2)
+        g = Function("g", 1)
+
+        sigma = match(f(x, g(y)), f(g(y), g(a)))
+        self.assertEqual(f(x, y) * sigma, f(g(y), a))
+        # Variables of the subject are not instantiated
+        self.assertIsNone(match(f(x, a), f(y, y)))
+        self.assertIsNone(match(f(x, x), f(a, y)))
+        self.assertIsNone(match(g(x), f(x, x)))
+        self.assertEqual(len(match(f(x, y), f(x, y))), 0)
+
+        # The rule keeps its variables when they overlap with the term
+        r = RewriteRule(g(x), f(x, x))
+        self.assertEqual(r.apply(g(x), ()), f(x, x))
+        self.assertEqual(r.hypothesis, g(x))
+
+    def test_normalize(self):
+        s = Function("s", 1)
+        plus = Function("plus", 2)
+        z = Constant("z")
+        x = Variable("x")
+        y = Variable("y")
+        rs = RewriteSystem({
+            RewriteRule(plus(z, y), y),
+            RewriteRule(plus(s(x), y), s(plus(x, y)))
+        })
+        two = s(s(z))
+        four = s(s(two))
+        term = plus(plus(two, two), x)
+        for strategy in Strategy:
+            self.assertEqual(rs.normalize(term, strategy), s(s(s(s(x)))))
+            self.assertEqual(rs.normalize(plus(two, two), strategy), four)
+            element, steps = normal(term, rs, strategy=strategy)
+            self.assertEqual(element, s(s(s(s(x)))))
+            self.assertEqual(len(steps), 8)
+        # The first step depends on the strategy
+        self.assertEqual(normal(term, rs, strategy=Strategy.OUTERMOST)[1][0][1], (1,))
+        self.assertEqual(normal(term, rs, strategy=Strategy.LEFTMOST_INNERMOST)[1][0][1], (1,))
+        self.assertEqual(normal(plus(two, plus(z, z)), rs, strategy=Strategy.OUTERMOST)[1][0][1], ())
+        self.assertEqual(normal(plus(two, plus(z, z)), rs, strategy="leftmost-innermost")[1][0][1], (2,))
+        self.assertIsNone(normal(term, rs, bound=3))
+
+        # Normal forms are forgotten once the rules change
+        rs.append(RewriteRule(s(s(z)), z))
+        self.assertEqual(rs.normalize(plus(two, two)), z)
+
+    def test_rules_copied(self):
+        f = Function("f", 1)
+        a = Constant("a")
+        b = Constant("b")
+        c = Constant("c")
+        rules = {RewriteRule(f(a), b)}
+        rs = RewriteSystem(rules)
+        self.assertEqual(rs.normalize(f(a)), b)
+        # Changing the given set, even keeping its size, doesn't change the system
+        rules.discard(RewriteRule(f(a), b))
+        rules.add(RewriteRule(f(a), c))
+        self.assertEqual(rs.normalize(f(a)), b)
+        self.assertIsInstance(rs.rules, frozenset)
+        rs = RewriteSystem(rules)
+        self.assertEqual(rs.normalize(f(a)), c)
+
+    def test_compile(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        rules = [
+            RewriteRule(f(x, x), x),
+            RewriteRule(f(g(x), y), y),
+            RewriteRule(f(g(a), x), a),
+            RewriteRule(g(g(x)), x)
+        ]
+        rs = RewriteSystem(set(rules))
+        automaton = rs.compile()
+        self.assertIs(rs.compile(), automaton)
+        # Agrees with matching each rule on its own
+        subjects = [f(a, a), f(a, b), f(g(a), g(a)), f(g(b), a), g(g(f(a, b))), g(a), x]
+        for subject in subjects:
+            found = {rule: sigma for rule, sigma in automaton.matches(subject)}
+            for rule in rules:
+                sigma = match(rule.hypothesis, subject)
+                if sigma is None:
+                    self.assertNotIn(rule, found)
+                else:
+                    self.assertEqual(rule.hypothesis * found[rule], subject)
+        # Bindings must respect sorts
+        n = Variable("n", Sort("nat"))
+        t = Constant("t", Sort("bool"))
+        self.assertIsNone(MatchingAutomaton([RewriteRule(g(n), n)]).rewrite_root(g(t)))
+        # Compiled again once the rules change
+        rs.append(RewriteRule(g(a), b))
+        self.assertIsNot(rs.compile(), automaton)
+        self.assertEqual(rs.compile().rewrite_root(g(a))[1], b)
+        self.assertEqual(rs.normalize(f(g(g(g(a))), b)), b)
 
 if __name__ == "__main__":
     unittest.main()
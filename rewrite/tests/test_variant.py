@@ -15,7 +15,101 @@ class TestVariant(unittest.TestCase):
         rs = RewriteSystem({r, r2})
         vt = Variants(term, rs)
         self.assertTrue(is_finite(vt, -1), True)
-        self.assertEqual(narrow(term, f(a,b), rs, -1)[0][1], '2')
+        self.assertEqual(narrow(term, f(a,b), rs, -1)[0][1], (2,))
+
+    def test_budgets(self):
+        s = Function("s", 1)
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        z = Constant("z")
+        # Infinitely many variants
+        rs = RewriteSystem({RewriteRule(s(x), s(s(x))), RewriteRule(f(x, y), f(y, x))})
+        term = f(s(z), z)
+        vt = Variants(term, rs, max_variants=20)
+        self.assertEqual(len(list(vt)), 20)
+        self.assertFalse(is_finite(vt))
+        vt = Variants(term, rs, max_depth=3)
+        variants = list(vt)
+        self.assertTrue(vt.truncated)
+        self.assertEqual(len(vt.tree), 4)
+        self.assertEqual(len(set(variants)), len(variants))
+        self.assertEqual(len(narrow(term, f(z, s(s(z))), rs, max_depth=3)), 2)
+        self.assertIsNone(narrow(term, f(z, s(s(s(s(z))))), rs, max_depth=3))
+        # A finite system is not truncated by a large enough depth
+        rs = RewriteSystem({RewriteRule(f(x, x), x)})
+        vt = Variants(f(f(z, z), f(z, z)), rs, max_depth=5)
+        self.assertTrue(is_finite(vt))
+
+    def test_processes(self):
+        s = Function("s", 1)
+        f = Function("f", 2)
+        x = Variable("x")
+        y = Variable("y")
+        z = Constant("z")
+        rs = RewriteSystem({RewriteRule(s(x), s(s(x))), RewriteRule(f(x, y), f(y, x))})
+        term = f(f(s(z), z), s(z))
+        serial = Variants(term, rs, max_depth=3)
+        with Variants(term, rs, max_depth=3, processes=2) as parallel:
+            self.assertEqual(list(parallel), list(serial))
+            self.assertEqual(parallel.tree, serial.tree)
+
+    def test_search(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        h = Function("h", 1)
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        a = Constant("a")
+        b = Constant("b")
+        rs = RewriteSystem({
+            RewriteRule(f(x, y), f(y, x)),
+            RewriteRule(f(f(x, y), z), f(x, f(y, z))),
+            RewriteRule(g(x), h(x)),
+            RewriteRule(h(x), g(g(x))),
+            RewriteRule(f(a, x), b)
+        })
+        term = f(f(g(a), b), f(a, h(b)))
+        goals = [f(h(h(b)), f(f(g(a), b), a)), f(b, f(g(a), b)), term]
+        for goal in goals:
+            shortest = len(narrow(term, goal, rs))
+            for search, heuristic in [("bidirectional", symbol_distance), (Search.BEST_FIRST, size_difference)]:
+                steps = narrow(term, goal, rs, search=search, heuristic=heuristic)
+                # Replaying the steps leads to the goal
+                t = term
+                for rule, pos in steps:
+                    t = rule.apply(t, pos)
+                self.assertEqual(t, goal)
+                if search == "bidirectional":
+                    self.assertEqual(len(steps), shortest)
+        steps = narrow(term, goals[1], rs, search="best-first", heuristic=symbol_distance)
+        self.assertEqual(len(steps), 2)
+        # Unreachable within the budgets
+        self.assertIsNone(narrow(term, goals[0], rs, max_depth=2, search="bidirectional"))
+        self.assertIsNone(narrow(term, goals[0], rs, bound=3, search="best-first"))
+        self.assertIsNone(narrow(a, b, RewriteSystem({RewriteRule(f(x, y), f(y, x))}), search="bidirectional"))
+
+    def test_bidirectional_shortest(self):
+        f = Function("f", 2)
+        g = Function("g", 1)
+        h = Function("h", 1)
+        x = Variable("x")
+        y = Variable("y")
+        a = Constant("a")
+        b = Constant("b")
+        # Every rule can be applied backwards
+        rs = RewriteSystem({
+            RewriteRule(g(x), h(x)),
+            RewriteRule(h(x), g(g(x))),
+            RewriteRule(g(g(x)), f(x, x)),
+            RewriteRule(f(x, y), f(y, x)),
+            RewriteRule(f(x, x), h(x))
+        })
+        term = f(g(a), h(b))
+        for goal in Variants(term, rs, max_variants=100):
+            steps = narrow(term, goal, rs, search="bidirectional")
+            self.assertEqual(len(steps), len(narrow(term, goal, rs)))
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,9 +7,9 @@ class Xor(Function):
         super().__init__("xor", 2)
 
     def __call__(self, *args):
-        term = XorTerm(self, (args[0], args[1]))
+        term = XorTerm.intern(self, (args[0], args[1]))
         for t in args[2:]:
-            term = XorTerm(self, (term, t))
+            term = XorTerm.intern(self, (term, t))
         return term
 
 xor = Xor()
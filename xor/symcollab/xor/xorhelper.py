@@ -1,5 +1,5 @@
 from copy import deepcopy
-from symcollab.algebra import Constant, Variable, FuncTerm, Equation, SubstituteTerm
+from symcollab.algebra import Constant, Variable, FuncTerm, Equation, SubstituteTerm, preorder
 from symcollab.Unification.unif import unif
 from .structure import Zero, XORTerm, Equations, Disequations, Disequation, is_zero
 from .xor import xor
@@ -16,12 +16,7 @@ def is_XOR_Term(t):
 
 def xor_to_list(t):
     #convert a xor-term to a list of terms
-    if(not is_xor_term(t)):
-        return [t]
-    else:
-        lst1 = xor_to_list(t.arguments[0])
-        lst2 = xor_to_list(t.arguments[1])
-        return lst1 + lst2
+    return [ti for ti in preorder(t, is_xor_term) if not is_xor_term(ti)]
 
 def simplify(lst):
     result = []